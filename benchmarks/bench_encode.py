@@ -0,0 +1,90 @@
+"""
+フレーム画像の保存・エンコード処理の時間を計測します。
+
+従来の経路 (float64 の画像から int64 の出力を作り、uint8 への変換と BGR→RGB 変換を行ってから
+Pillow でエンコード) と、現在の経路 (uint8 の出力を OpenCV で BGR のまま直接エンコード) を比較します。
+
+    python benchmarks/bench_encode.py --size 6000x4000 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.FrameMaker import FrameMaker
+from src.ImageHandler import ImageHandler
+
+
+def best_of(func, repeat: int) -> float:
+    """
+    func を repeat 回実行し、最短の実行時間 (秒) を返します。
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def legacy_encode(img: np.ndarray) -> bytes:
+    """
+    従来の経路: int64 の出力を uint8 に変換し、RGB に並べ替えてから Pillow でエンコードします。
+    """
+    rgb = cv2.cvtColor(img.astype(np.uint8), cv2.COLOR_BGR2RGB)
+    buffered = io.BytesIO()
+    # OpenCV の既定値と同じ品質でエンコードする
+    Image.fromarray(rgb).save(buffered, format="JPEG", quality=95)
+    return buffered.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark the frame encode path")
+    parser.add_argument("--size", default="6000x4000", help="input size WIDTHxHEIGHT")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per case")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    rng = np.random.default_rng(0)
+    # 乱数画像はエンコードが極端に遅くなるため、滑らかなグラデーションにノイズを加える
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    base = np.broadcast_to(gradient, (height, width, 3))
+    noise = rng.integers(0, 16, size=(height, width, 3))
+    source = np.clip(base + noise, 0, 255).astype(np.uint8)
+
+    float_fm = FrameMaker(
+        ImageHandler(fp="", array=source / 255.0), True, "#FFFFFF", False, False
+    )
+    uint8_handler = ImageHandler(fp="", array=source, uint8=True)
+    uint8_fm = FrameMaker(uint8_handler, True, "#FFFFFF", False, False)
+
+    legacy_output = float_fm.run().astype(int)
+    output = uint8_fm.run()
+    print(f"input {width}x{height}, output {output.shape[1]}x{output.shape[0]}")
+    print(f"  int64 output buffer : {legacy_output.nbytes / 2**20:8.1f} MiB")
+    print(f"  uint8 output buffer : {output.nbytes / 2**20:8.1f} MiB")
+
+    results = {
+        "convert (astype + cvtColor)": best_of(
+            lambda: cv2.cvtColor(legacy_output.astype(np.uint8), cv2.COLOR_BGR2RGB),
+            args.repeat,
+        ),
+        "legacy encode (Pillow)": best_of(lambda: legacy_encode(legacy_output), args.repeat),
+        "direct encode (cv2.imencode)": best_of(
+            lambda: uint8_handler.encode_image(output, ".jpg"), args.repeat
+        ),
+    }
+    for name, seconds in results.items():
+        print(f"  {name:<30}: {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+エンコードプロファイルごとの出力サイズとエンコード時間を計測します。
+
+    python benchmarks/bench_profiles.py --input photo.jpg --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.constants import ENCODE_PROFILES
+from src.FrameMaker import FrameMaker
+from src.ImageHandler import ImageHandler
+
+DEFAULT_INPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "tests", "assets", "test_image.png"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark the encoder profiles")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="input image")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per case")
+    parser.add_argument(
+        "--formats", default=".jpg,.png,.webp", help="comma separated output formats"
+    )
+    args = parser.parse_args()
+
+    handler = ImageHandler(fp=args.input, uint8=True)
+    output = FrameMaker(handler, True, "#FFFFFF", True, False).run()
+    print(f"output {output.shape[1]}x{output.shape[0]}")
+
+    for ext in args.formats.split(","):
+        for profile in ENCODE_PROFILES:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                encoded = handler.encode_image(output, ext, profile)
+                times.append(time.perf_counter() - start)
+            print(
+                f"  {ext:<5} {profile:<9}: {len(encoded) / 1024:10.1f} KiB "
+                f"{min(times) * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
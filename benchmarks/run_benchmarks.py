@@ -0,0 +1,215 @@
+"""
+ImageHandler の読み込み、FrameMaker.run、主要色の抽出の処理時間とピークメモリを計測します。
+
+生成した画像 (1, 12, 24, 50 MP の横長・縦長) を入力に、各処理の最短時間と
+tracemalloc によるピークメモリを JSON に書き出します。--compare に以前の結果を指定すると、
+しきい値を超えて遅くなった、またはメモリが増えたケースを表示して終了コード 1 で終了します。
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --output current.json --compare baseline.json
+    python benchmarks/run_benchmarks.py --sizes 1,12 --repeat 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.constants import GOLDEN_RATIO, SILVER_RATIO
+from src.FrameMaker import FrameMaker
+from src.ImageHandler import ImageHandler
+from src.ResultCache import ResultCache
+from src.WebviewInterface import API
+
+DEFAULT_SIZES = (1, 12, 24, 50)
+DEFAULT_THRESHOLD = 0.2
+# 横長の画像の縦横比 (3:2)。縦長の画像は幅と高さを入れ替える
+ASPECT = (3, 2)
+
+# FrameMaker.run のオプション (golden, golden_ratio, rounded, mc)
+FRAME_CASES = {
+    "golden": (True, GOLDEN_RATIO, False, False),
+    "silver": (True, SILVER_RATIO, False, False),
+    "custom": (True, 1.5, False, False),
+    "rounded": (True, GOLDEN_RATIO, True, False),
+    "maincolor": (True, GOLDEN_RATIO, False, True),
+}
+
+
+def generate_image(megapixels: int, portrait: bool) -> np.ndarray:
+    """
+    指定した画素数のテスト画像 (BGR、uint8) を生成します。
+    実際の写真に近いよう、グラデーションにいくつかの色の領域とノイズを加えます。
+    """
+    unit = (megapixels * 1_000_000 / (ASPECT[0] * ASPECT[1])) ** 0.5
+    width, height = int(unit * ASPECT[0]), int(unit * ASPECT[1])
+    if portrait:
+        width, height = height, width
+
+    rng = np.random.default_rng(0)
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:, :, 0] = np.linspace(40, 220, width, dtype=np.uint8)[np.newaxis, :]
+    img[:, :, 1] = np.linspace(200, 60, height, dtype=np.uint8)[:, np.newaxis]
+    img[:, :, 2] = 128
+    for color in rng.integers(0, 256, size=(6, 3)):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        radius = int(min(width, height) * rng.uniform(0.05, 0.2))
+        cv2.circle(img, (int(x), int(y)), radius, color.tolist(), -1)
+    # 行ごとにノイズを加え、全体の一時配列を作らない
+    for row in range(0, height, 512):
+        block = img[row : row + 512]
+        noise = rng.integers(0, 8, size=block.shape, dtype=np.uint8)
+        np.add(block, noise, out=block, casting="unsafe")
+    return img
+
+
+def measure(func, repeat: int) -> dict:
+    """
+    func の最短の実行時間 (秒) と、tracemalloc で計測したピークメモリ (バイト) を返します。
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+def run_benchmarks(sizes, repeat: int) -> dict:
+    """
+    全てのケースを計測し、ケース名をキーにした結果を返します。
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for megapixels in sizes:
+            for orientation in ("landscape", "portrait"):
+                img = generate_image(megapixels, orientation == "portrait")
+                prefix = f"{megapixels}mp-{orientation}"
+                path = os.path.join(tmp_dir, f"{prefix}.jpg")
+                cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+                with open(path, "rb") as f:
+                    data = f.read()
+                del img
+
+                # ケースはこの反復の中で計測するが、ループ変数は既定引数で束縛する
+                def load(path: str = path) -> ImageHandler:
+                    return ImageHandler(fp=path, uint8=True)
+
+                cases = {"load": load}
+                handler = load()
+                # run-maincolor はカラーバーの描画のみを計測し、主要色の抽出は maincolor-rgb で計測する
+                palette = handler.get_palette()
+                for name, (golden, ratio, rounded, mc) in FRAME_CASES.items():
+                    cases[f"run-{name}"] = lambda g=golden, r=ratio, rd=rounded, m=mc, h=handler, p=palette: (
+                        FrameMaker(h, g, "#FFFFFF", rd, m, golden_ratio=r, palette=p).run()
+                    )
+                # キャッシュせずに毎回デコードと主要色の抽出を行う
+                api = API(cache=ResultCache(max_bytes=0))
+                cases["maincolor-rgb"] = lambda api=api, data=data: (
+                    api.getMainColorRGBValueFromBytes(data)
+                )
+
+                for name, func in cases.items():
+                    key = f"{prefix}/{name}"
+                    results[key] = measure(func, repeat)
+                    print(
+                        f"{key:<32} {results[key]['seconds'] * 1000:10.1f} ms "
+                        f"{results[key]['peak_bytes'] / 2**20:10.1f} MiB",
+                        flush=True,
+                    )
+                # 次のサイズの画像を生成する前に、ケースが保持する画像を解放する
+                del cases, handler, palette
+    return results
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    以前の結果と比べて、処理時間またはピークメモリが threshold (割合) を超えて増えたケースを返します。
+    片方にしかないケースは比較しません。
+
+    Returns:
+        list[str]: 悪化したケースの説明のリスト。悪化がない場合は空のリスト。
+    """
+    regressions = []
+    for key, result in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                change = result[metric] / base[metric] - 1
+                regressions.append(
+                    f"{key} {metric}: {base[metric]:.4g} -> {result[metric]:.4g} "
+                    f"(+{change:.0%})"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="benchmark FrameMaker, ImageHandler and colorpick"
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="comma separated input sizes in megapixels (default: 1,12,24,50)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs per case")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file to write")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown / memory growth before failing (default: 0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run_benchmarks(sizes, args.repeat)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
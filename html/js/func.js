@@ -7,6 +7,9 @@ async function toBase64DataUri(file) {
 
 const state = {
     inputDataUrl: "",
+    inputBlobId: "",
+    blobServerUrl: "",
+    blobToken: "",
     objectUrl: "",
     mainColors: [],
     imageWidth: 0,
@@ -23,6 +26,86 @@ function hasPywebviewApi() {
     return Boolean(window.pywebview && window.pywebview.api);
 }
 
+function hasInputImage() {
+    return Boolean(state.objectUrl);
+}
+
+// Blob サーバーはこのページのオリジンにだけ CORS を許可し、X-Blob-Token ヘッダーのトークンを要求する
+async function getBlobServerUrl() {
+    if (!state.blobServerUrl && hasPywebviewApi() && window.pywebview.api.getBlobServer) {
+        const server = await window.pywebview.api.getBlobServer(window.location.origin);
+        state.blobServerUrl = server.url;
+        state.blobToken = server.token;
+    }
+    return state.blobServerUrl;
+}
+
+// 画像を Base64 にせずバイト列のまま Python 側へ送り、Blob ID を返す
+// 上限を超える (413) などで送れない場合は空文字列を返す
+async function uploadBlob(file) {
+    const serverUrl = await getBlobServerUrl();
+    if (!serverUrl) return "";
+
+    let response;
+    try {
+        response = await fetch(`${serverUrl}/blobs`, {
+            method: "POST",
+            headers: {
+                "Content-Type": file.type || "application/octet-stream",
+                "X-Blob-Token": state.blobToken,
+            },
+            body: file,
+        });
+    } catch (error) {
+        return "";
+    }
+    if (!response.ok) return "";
+    const { id } = await response.json();
+    return id;
+}
+
+// submitFrameJob で開始したジョブの終了待ち。Python 側から window.onFrameJobFinished で通知される
+const jobWaiters = new Map();
+const JOB_POLL_INTERVAL_MS = 500;
+
+window.onFrameJobFinished = (job) => {
+    const resolve = jobWaiters.get(job.id);
+    if (resolve) {
+        jobWaiters.delete(job.id);
+        resolve(job);
+    }
+};
+
+// 通知を受け取るまで待つ。通知を取りこぼした場合に備えて、一定間隔で pollJob も確認する
+// onProgress には確認のたびに処理中のジョブ (stage と fraction を含む) を渡す
+async function waitForJob(jobId, onProgress = () => {}) {
+    const notified = new Promise((resolve) => jobWaiters.set(jobId, resolve));
+    try {
+        while (true) {
+            const job = await window.pywebview.api.pollJob(jobId);
+            if (!["pending", "running"].includes(job.status)) {
+                return job;
+            }
+            onProgress(job);
+            const finished = await Promise.race([
+                notified,
+                new Promise((resolve) => setTimeout(() => resolve(null), JOB_POLL_INTERVAL_MS)),
+            ]);
+            if (finished) {
+                return finished;
+            }
+        }
+    } finally {
+        jobWaiters.delete(jobId);
+    }
+}
+
+function releaseBlob(blobId) {
+    if (blobId && hasPywebviewApi() && window.pywebview.api.releaseBlob) {
+        window.pywebview.api.releaseBlob(blobId);
+    }
+}
+
 function isMobileSaveContext() {
     if (navigator.userAgentData && navigator.userAgentData.mobile) {
         return true;
@@ -55,28 +138,43 @@ async function loadImageSize(src) {
     };
 }
 
-function getPreviewImageSize(frameRatio) {
-    if (!state.imageWidth || !state.imageHeight) {
-        return {
-            width: 100 / frameRatio,
-            height: 100 / frameRatio,
-        };
+// Python 側の FrameLayout (src/FrameLayout.py) と同じ計算。Python を使えないブラウザ版でのみ使う
+function computeFrameLayout(width, height, frameRatio, radius, maincolor) {
+    const side = Math.max(Math.floor(Math.max(width, height) * frameRatio), width, height);
+    const layout = {
+        side,
+        image: [Math.floor((side - width) / 2), Math.floor((side - height) / 2), width, height],
+        radius,
+        color_bar: null,
+        swatches: [],
+    };
+    if (maincolor) {
+        const pickWidth = Math.floor(side / 5);
+        const pickHeight = Math.floor((side * SIDE_MARGIN_RATIO) / 30);
+        const left = Math.floor((side - pickWidth * 5) / 2);
+        const top = side - pickHeight;
+        layout.color_bar = [left, top, pickWidth * 5, pickHeight];
+        for (let index = 0; index < 5; index += 1) {
+            layout.swatches.push([left + pickWidth * index, top, pickWidth, pickHeight]);
+        }
     }
+    return layout;
+}
 
-    const imageRatio = state.imageWidth / state.imageHeight;
-    if (state.imageWidth >= state.imageHeight) {
-        const width = 100 / frameRatio;
-        return {
+// 出力画像の配置を返す。pywebview 版では Python の FrameMaker と同じ計算 (API.getFrameLayout) を使う
+async function getFrameLayout(width, height) {
+    const { frameRatio, maincolor, radius } = getCurrentOptions();
+    if (hasPywebviewApi() && window.pywebview.api.getFrameLayout) {
+        return await window.pywebview.api.getFrameLayout(
             width,
-            height: width / imageRatio,
-        };
+            height,
+            frameRatio,
+            radius > 0,
+            maincolor,
+            radius
+        );
     }
-
-    const height = 100 / frameRatio;
-    return {
-        width: height * imageRatio,
-        height,
-    };
+    return computeFrameLayout(width, height, frameRatio, radius, maincolor);
 }
 
 function validateFrameRatio() {
@@ -95,7 +193,7 @@ function validateFrameRatio() {
     }
 
     ratioError.innerText = "";
-    saveButton.disabled = !state.inputDataUrl;
+    saveButton.disabled = !hasInputImage();
 }
 
 function getCurrentOptions() {
@@ -201,29 +299,27 @@ function extractMainColorsFromCanvas(image) {
     return colors;
 }
 
-async function getMainColors(inputDataUrl) {
-    if (hasPywebviewApi() && window.pywebview.api.getMainColorRGBValue) {
-        return await window.pywebview.api.getMainColorRGBValue(inputDataUrl);
+async function getMainColors() {
+    if (state.inputBlobId) {
+        return await window.pywebview.api.getMainColorRGBValueFromBlob(state.inputBlobId);
+    }
+    if (state.inputDataUrl && window.pywebview.api.getMainColorRGBValue) {
+        return await window.pywebview.api.getMainColorRGBValue(state.inputDataUrl);
     }
 
-    const image = await loadImageElement(inputDataUrl);
+    const image = await loadImageElement(state.objectUrl);
     return extractMainColorsFromCanvas(image);
 }
 
 async function createOutputCanvas() {
-    if (!state.inputDataUrl) {
+    if (!hasInputImage()) {
         throw new Error("No image has been selected");
     }
 
-    const { frameRatio, bgcolor, maincolor, radius } = getCurrentOptions();
-    const image = await loadImageElement(state.inputDataUrl);
-    const sourceWidth = image.naturalWidth;
-    const sourceHeight = image.naturalHeight;
-    const sideLength = Math.max(
-        Math.floor(Math.max(sourceWidth, sourceHeight) * frameRatio),
-        sourceWidth,
-        sourceHeight,
-    );
+    const { bgcolor } = getCurrentOptions();
+    const image = await loadImageElement(state.objectUrl);
+    const layout = await getFrameLayout(image.naturalWidth, image.naturalHeight);
+    const sideLength = layout.side;
 
     const canvas = document.createElement("canvas");
     canvas.width = sideLength;
@@ -233,26 +329,17 @@ async function createOutputCanvas() {
     ctx.fillStyle = bgcolor;
     ctx.fillRect(0, 0, sideLength, sideLength);
 
-    const x = Math.floor((sideLength - sourceWidth) / 2);
-    const y = Math.floor((sideLength - sourceHeight) / 2);
-    if (radius > 0) {
-        drawRoundedImage(ctx, image, x, y, sourceWidth, sourceHeight, radius);
+    const [x, y, width, height] = layout.image;
+    if (layout.radius > 0) {
+        drawRoundedImage(ctx, image, x, y, width, height, layout.radius);
     } else {
-        ctx.drawImage(image, x, y, sourceWidth, sourceHeight);
+        ctx.drawImage(image, x, y, width, height);
     }
 
-    if (maincolor && state.mainColors.length > 0) {
-        const pickWidth = Math.floor(sideLength / 5);
-        const pickHeight = Math.max(1, Math.floor((sideLength * SIDE_MARGIN_RATIO) / 30));
-        const startX = Math.floor((sideLength - pickWidth * 5) / 2);
+    if (layout.color_bar && state.mainColors.length > 0) {
         state.mainColors.slice(0, 5).forEach((color, index) => {
             ctx.fillStyle = `#${color}`;
-            ctx.fillRect(
-                startX + pickWidth * index,
-                sideLength - pickHeight,
-                pickWidth,
-                pickHeight,
-            );
+            ctx.fillRect(...layout.swatches[index]);
         });
     }
 
@@ -280,19 +367,29 @@ async function downloadOutputImage() {
     return blob;
 }
 
-function renderPreview() {
+async function renderPreview() {
     const { frameRatio, bgcolor, maincolor, radius } = getCurrentOptions();
     const previewFrame = document.getElementById("preview-frame");
     const previewImage = document.getElementById("preview-image");
     const colorBar = document.getElementById("maincolor-preview");
     const saveButton = document.getElementById("saveButton");
-    const imageSize = getPreviewImageSize(frameRatio);
+    // 画像が未選択の場合は正方形の画像として配置する
+    const layout = await getFrameLayout(state.imageWidth || 1000, state.imageHeight || 1000);
+    const percent = (value) => `${(value / layout.side) * 100}%`;
 
     previewFrame.style.setProperty("--frame-bg", bgcolor);
     previewFrame.style.setProperty("--frame-ratio", frameRatio);
-    previewFrame.style.setProperty("--image-width", `${imageSize.width}%`);
-    previewFrame.style.setProperty("--image-height", `${imageSize.height}%`);
-    previewFrame.style.setProperty("--image-radius", `${radius}px`);
+    previewFrame.style.setProperty("--image-width", percent(layout.image[2]));
+    previewFrame.style.setProperty("--image-height", percent(layout.image[3]));
+    previewFrame.style.setProperty(
+        "--image-radius",
+        `${(layout.radius / layout.side) * previewFrame.clientWidth}px`
+    );
+    if (layout.color_bar) {
+        colorBar.style.left = percent(layout.color_bar[0]);
+        colorBar.style.width = percent(layout.color_bar[2]);
+        colorBar.style.height = percent(layout.color_bar[3]);
+    }
     document.getElementById("corner-radius-value").innerText = `${radius} px`;
 
     if (state.objectUrl) {
@@ -311,7 +408,7 @@ function renderPreview() {
         colorBar.classList.remove("active");
     }
 
-    saveButton.disabled = !state.inputDataUrl;
+    saveButton.disabled = !hasInputImage();
     saveButton.innerText = "Save";
     resetSaveStatus();
 }
@@ -332,8 +429,16 @@ document.getElementById('inputpath').addEventListener('change', async (event) =>
     if (!input) return;
 
     state.originalFileName = input.name || "output";
-    const inputdata = await toBase64DataUri(input);
-    state.inputDataUrl = inputdata;
+    releaseBlob(state.inputBlobId);
+    state.inputBlobId = "";
+    state.inputDataUrl = "";
+    if (hasPywebviewApi()) {
+        state.inputBlobId = await uploadBlob(input);
+        if (!state.inputBlobId) {
+            // Blob サーバーを使えない場合は従来どおり data URL で渡す
+            state.inputDataUrl = await toBase64DataUri(input);
+        }
+    }
     if (state.objectUrl) {
         URL.revokeObjectURL(state.objectUrl);
     }
@@ -343,7 +448,7 @@ document.getElementById('inputpath').addEventListener('change', async (event) =>
     state.imageHeight = imageSize.height;
     renderPreview();
 
-    const colors = await getMainColors(inputdata);
+    const colors = await getMainColors();
     state.mainColors = colors || [];
 
     const colorOptions = document.getElementById('color-options');
@@ -384,7 +489,7 @@ document.getElementById("corner-radius").addEventListener("input", renderPreview
 document.getElementById("color-options").addEventListener("change", renderPreview);
 
 async function saveImage() {
-    if (!state.inputDataUrl) return;
+    if (!hasInputImage()) return;
 
     const saveButton = document.getElementById('saveButton');
     const spinner = document.getElementById('spinner');
@@ -396,7 +501,33 @@ async function saveImage() {
     spinner.classList.remove('hidden');
 
     let response = "";
-    if (hasPywebviewApi() && window.pywebview.api.saveFrameMakerFromWebview) {
+    if (state.inputBlobId && window.pywebview.api.submitFrameJob) {
+        // 保存はバックグラウンドのジョブで行い、処理中も UI を操作できるようにする
+        const jobId = await window.pywebview.api.submitFrameJob(
+            state.inputBlobId,
+            frameRatio,
+            bgcolor,
+            radius > 0,
+            maincolor,
+            radius,
+            true
+        );
+        const job = await waitForJob(jobId, ({ stage, fraction }) => {
+            if (stage) {
+                saveButton.innerText = `Saving... ${stage} ${Math.round(fraction * 100)}%`;
+            }
+        });
+        response = job.status === "done" ? job.result : "";
+    } else if (state.inputBlobId) {
+        response = await window.pywebview.api.saveFrameMakerFromBlob(
+            state.inputBlobId,
+            frameRatio,
+            bgcolor,
+            radius > 0,
+            maincolor,
+            radius
+        );
+    } else if (state.inputDataUrl && window.pywebview.api.saveFrameMakerFromWebview) {
         response = await window.pywebview.api.saveFrameMakerFromWebview(
             state.inputDataUrl,
             frameRatio,
@@ -428,6 +559,7 @@ async function saveImage() {
 }
 
 window.frameMakerWeb = {
+    computeFrameLayout,
     createOutputCanvas,
     canvasToBlob,
     getMainColors,
@@ -1,12 +1,39 @@
 import argparse
+import os
 
-from src.constants import MAX_FRAME_RATIO, MIN_FRAME_RATIO
-from src.WebviewInterface import API
+from src.batch import run_batch
+from src.constants import (
+    ENCODE_PROFILE,
+    ENCODE_PROFILES,
+    MAX_FRAME_RATIO,
+    METRICS_ENV,
+    MIN_FRAME_RATIO,
+)
 
 if __name__ == "__main__":
     PARSER = argparse.ArgumentParser()
-    PARSER.add_argument("input", help="input file name")
-    PARSER.add_argument("output", help="output file name (existed file is overriden)")
+    PARSER.add_argument("input", nargs="?", help="input file name")
+    PARSER.add_argument(
+        "output", nargs="?", help="output file name (existed file is overriden)"
+    )
+    PARSER.add_argument(
+        "--batch",
+        metavar="PATTERN",
+        default=None,
+        help="process every file matching a glob pattern or directory (e.g. 'in/**/*.jpg')",
+    )
+    PARSER.add_argument(
+        "--out-dir",
+        default=None,
+        help="output directory for --batch (up-to-date outputs are skipped)",
+    )
+    PARSER.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes for --batch (default: CPU count)",
+    )
     PARSER.add_argument(
         "-g",
         "--golden",
@@ -48,13 +75,52 @@ if __name__ == "__main__":
         default=False,
         help="put the five main color in the image",
     )
+    PARSER.add_argument(
+        "--strip-height",
+        type=int,
+        default=None,
+        help="write the output as PNG in strips of this many rows to bound memory use",
+    )
+    PARSER.add_argument(
+        "--profile",
+        choices=list(ENCODE_PROFILES),
+        default=ENCODE_PROFILE,
+        help=f"encoder settings for the output file (default: {ENCODE_PROFILE})",
+    )
+    PARSER.add_argument(
+        "--metrics",
+        nargs="?",
+        const="time",
+        choices=["time", "memory"],
+        default=None,
+        help="print per-stage wall and CPU time as a JSON line per image to stderr; "
+        f"'memory' also records allocations but slows KMeans (same as {METRICS_ENV})",
+    )
     ARGS = PARSER.parse_args()
+    if ARGS.batch is not None:
+        if ARGS.out_dir is None:
+            PARSER.error("--batch requires --out-dir")
+        if ARGS.input is not None or ARGS.output is not None:
+            PARSER.error("input/output cannot be used together with --batch")
+    elif ARGS.input is None or ARGS.output is None:
+        PARSER.error("input and output are required unless --batch is given")
+    if ARGS.jobs is not None and ARGS.jobs < 1:
+        PARSER.error("--jobs must be 1 or more")
+    if ARGS.strip_height is not None:
+        if ARGS.strip_height < 1:
+            PARSER.error("--strip-height must be 1 or more")
+        if ARGS.output is not None and not ARGS.output.lower().endswith(".png"):
+            PARSER.error("--strip-height requires a .png output")
     ratio_options = [ARGS.golden, ARGS.silver, ARGS.ratio is not None]
     if sum(bool(option) for option in ratio_options) > 1:
         PARSER.error("--golden, --silver, and --ratio cannot be used together")
     if ARGS.ratio is not None and not MIN_FRAME_RATIO <= ARGS.ratio <= MAX_FRAME_RATIO:
         PARSER.error(f"--ratio must be between {MIN_FRAME_RATIO} and {MAX_FRAME_RATIO}")
 
+    if ARGS.metrics:
+        # バッチのワーカープロセスにも引き継がれるよう、環境変数で有効にする
+        os.environ[METRICS_ENV] = ARGS.metrics
+
     frame_mode = (
         ARGS.ratio
         if ARGS.ratio is not None
@@ -64,6 +130,30 @@ if __name__ == "__main__":
         if ARGS.golden
         else "none"
     )
-    API().runFrameMaker(
-        ARGS.input, ARGS.output, frame_mode, ARGS.black, ARGS.rounded, ARGS.maincolor
-    )
+    if ARGS.batch is not None:
+        summary = run_batch(
+            ARGS.batch,
+            ARGS.out_dir,
+            frame_mode,
+            ARGS.black,
+            ARGS.rounded,
+            ARGS.maincolor,
+            jobs=ARGS.jobs,
+            strip_height=ARGS.strip_height,
+            profile=ARGS.profile,
+        )
+        print(summary.format())
+    else:
+        # GUI の依存を読み込まないよう、フレーム処理のモジュールだけをここで読み込む
+        from src.render import render_file
+
+        render_file(
+            ARGS.input,
+            ARGS.output,
+            frame_mode,
+            ARGS.black,
+            ARGS.rounded,
+            ARGS.maincolor,
+            strip_height=ARGS.strip_height,
+            profile=ARGS.profile,
+        )
@@ -21,4 +21,6 @@ window = webview.create_window(
     min_size=(600, 550),
 )
 api.set_window(window)
+# ウィンドウを閉じたら実行中のジョブを打ち切り、終了を待たずに済むようにする
+window.events.closed += api.shutdown
 webview.start(http_server=True, debug=DEBUG)
@@ -0,0 +1,47 @@
+import argparse
+import os
+
+from src.FrameService import FrameService, create_server
+
+if __name__ == "__main__":
+    PARSER = argparse.ArgumentParser(
+        description="persistent frame rendering service (POST /frame, GET /stats)"
+    )
+    PARSER.add_argument("--host", default="127.0.0.1", help="host to listen on")
+    PARSER.add_argument("--port", type=int, default=8765, help="port to listen on")
+    PARSER.add_argument(
+        "--unix-socket",
+        default=None,
+        help="listen on a Unix domain socket instead of TCP",
+    )
+    PARSER.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="number of worker threads (default: CPU count)",
+    )
+    PARSER.add_argument(
+        "--max-queue",
+        type=int,
+        default=None,
+        help="number of jobs allowed to wait before returning 503 (default: 4 x workers)",
+    )
+    ARGS = PARSER.parse_args()
+
+    SERVICE = FrameService(workers=ARGS.workers, max_queue=ARGS.max_queue)
+    SERVER = create_server(
+        SERVICE, host=ARGS.host, port=ARGS.port, unix_socket=ARGS.unix_socket
+    )
+    print(
+        f"Listening on {ARGS.unix_socket or f'http://{ARGS.host}:{SERVER.server_address[1]}'}"
+        f" ({SERVICE.workers} workers, queue {SERVICE.max_queue})"
+    )
+    try:
+        SERVER.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        SERVER.server_close()
+        SERVICE.shutdown()
+        if ARGS.unix_socket and os.path.exists(ARGS.unix_socket):
+            os.remove(ARGS.unix_socket)
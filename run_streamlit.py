@@ -1,12 +1,11 @@
 import base64
-import io
 import os
 
 import streamlit as st
 from dotenv import load_dotenv
-from PIL import Image
 
 from src.constants import MAX_FRAME_RATIO, MIN_FRAME_RATIO
+from src.Error import ReadError
 from src.WebviewInterface import API
 
 # 環境変数をロード
@@ -14,8 +13,13 @@ load_dotenv(dotenv_path="./.env")
 
 DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
+
 # APIインスタンスを作成
-api = API()
+# 再実行のたびに作り直さず、キャッシュ (デコード済み画像・主要色・処理結果) を使い回す
+@st.cache_resource
+def get_api() -> API:
+    return API()
+
 
 # Streamlitアプリの設定
 st.set_page_config(
@@ -24,6 +28,8 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+api = get_api()
+
 # タイトルを表示
 st.title("Frame Maker")
 
@@ -58,12 +64,12 @@ st.sidebar.subheader("背景色")
 bgcolor_options = {"White": "#FFFFFF", "Black": "#000000"}
 
 if uploaded_file:
-    img = Image.open(uploaded_file)
-    buffered = io.BytesIO()
-    img.save(buffered, format="JPEG")
-    img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    img_data_url = f"data:image/jpeg;base64,{img_base64}"
-    main_colors = api.getMainColorRGBValue(img_data_url)
+    # アップロードされたバイト列をそのまま渡す (同じ画像の主要色はキャッシュから返される)
+    img_bytes = uploaded_file.getvalue()
+    try:
+        main_colors = api.getMainColorRGBValueFromBytes(img_bytes)
+    except (ReadError, ValueError):
+        main_colors = []
     for _, color in enumerate(main_colors):
         bgcolor_options[f"#{color}"] = f"#{color}"
 
@@ -79,38 +85,32 @@ if uploaded_file:
         use_container_width=True,
     )
 
-    # 画像をBase64形式に変換
-    img = Image.open(uploaded_file)
-    buffered = io.BytesIO()
-    img.save(buffered, format="JPEG")
-    img_base64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    img_data_url = f"data:image/jpeg;base64,{img_base64}"
-
     # 実行ボタン
     if col[0].button("Run"):
         with st.spinner("処理中..."):
             # APIを呼び出して画像を処理
-            result_data_url = api.runFrameMakerFromWebview(
-                img_data_url,
-                frame_ratio,
-                bgcolor_to_pass,
-                True if radius > 0 else False,
-                maincolor,
-                radius,
-            )
-            if result_data_url:
-                # 処理結果を表示
-                col[1].image(
-                    result_data_url, caption="処理後の画像", use_container_width=True
+            # 表示するだけのため、元画像の解像度に関わらず縮小して処理したプレビューを使う
+            try:
+                result = api.previewFrameMakerFromBytes(
+                    img_bytes,
+                    frame_ratio,
+                    bgcolor_to_pass,
+                    True if radius > 0 else False,
+                    maincolor,
+                    radius,
                 )
-                col[1].success("処理が完了しました！")
-            else:
+            except (ReadError, ValueError):
                 col[1].error("エラーが発生しました。")
+            else:
+                # 処理結果を表示
+                col[1].image(result, caption="処理後の画像", use_container_width=True)
+                col[1].success("処理が完了しました！")
 
     # 保存ボタン
     if col[0].button("Save"):
         with col[0].spinner("保存中..."):
-            api.saveImage(img_data_url)
+            img_base64 = base64.b64encode(img_bytes).decode("utf-8")
+            api.saveImage(f"data:{uploaded_file.type};base64,{img_base64}")
             col[0].success("画像が保存されました！")
 
 # デバッグモードの表示
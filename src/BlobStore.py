@@ -0,0 +1,212 @@
+import hmac
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from src.constants import BLOB_STORE_MAX_BYTES, BLOB_UPLOAD_MAX_BYTES
+
+
+class BlobStore:
+    """
+    画像データをバイト列のまま保持するメモリ上のストア。
+    WebView との間で Base64 の data URL を使わずに画像を受け渡すために使用します。
+    合計サイズが上限を超えた場合は、古いものから削除します。
+    """
+
+    def __init__(self, max_bytes: int = BLOB_STORE_MAX_BYTES):
+        """
+        BlobStore クラスのコンストラクタ。
+
+        Args:
+            max_bytes (int, optional): 保持するデータの合計サイズの上限。
+                                       デフォルトは constants.BLOB_STORE_MAX_BYTES。
+        """
+        self.max_bytes = max_bytes
+        self._blobs = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, content_type: str = "application/octet-stream") -> str:
+        """
+        データを保存し、取り出し用の ID を返します。
+
+        Args:
+            data (bytes): 保存するデータ。
+            content_type (str, optional): データの MIME タイプ。
+
+        Returns:
+            str: 推測できないランダムな ID。
+        """
+        blob_id = uuid.uuid4().hex
+        data = bytes(data)
+        with self._lock:
+            self._blobs[blob_id] = (data, content_type)
+            self._size += len(data)
+            # 直前に追加したものは残し、古いものから削除する
+            while self._size > self.max_bytes and len(self._blobs) > 1:
+                _, (old, _) = self._blobs.popitem(last=False)
+                self._size -= len(old)
+        return blob_id
+
+    def get(self, blob_id: str) -> tuple[bytes, str]:
+        """
+        ID に対応するデータと MIME タイプを返します。
+
+        Raises:
+            KeyError: ID が存在しない場合 (削除済みの場合を含む)。
+        """
+        with self._lock:
+            return self._blobs[blob_id]
+
+    def delete(self, blob_id: str) -> None:
+        """
+        ID に対応するデータを削除します。存在しない場合は何もしません。
+        """
+        with self._lock:
+            entry = self._blobs.pop(blob_id, None)
+            if entry is not None:
+                self._size -= len(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+class BlobRequestHandler(BaseHTTPRequestHandler):
+    """
+    BlobStore の HTTP インターフェース。WebView のページとはポートが異なるため、
+    ページのオリジン (origin) にだけ CORS を許可します。
+    他のページから読み書きされないよう、全てのリクエストに X-Blob-Token ヘッダーで
+    セッションごとのトークン (token) を要求し、オリジンが異なるリクエストは 403 で拒否します。
+
+    - POST /blobs: 本文のバイト列を保存し、{"id": ...} を返します。
+      max_upload を超える場合は本文を読まずに 413 を返します。
+    - GET /blobs/<id>: 保存されたバイト列を返します。
+    - DELETE /blobs/<id>: 保存されたバイト列を削除します。
+    """
+
+    store: BlobStore = None
+    token: str = ""
+    origin: str = ""
+    max_upload: int = BLOB_UPLOAD_MAX_BYTES
+
+    def do_OPTIONS(self) -> None:
+        # プリフライトにはトークンが付かないため、オリジンだけを確認する
+        if self._check(token=False):
+            self._send(204, b"", "text/plain")
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/blobs":
+            self._send(404, b"not found", "text/plain")
+            return
+        if not self._check():
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self._send(400, b"invalid Content-Length", "text/plain")
+            return
+        if length > min(self.max_upload, self.store.max_bytes):
+            self.close_connection = True
+            self._send(413, b"blob too large", "text/plain")
+            return
+        content_type = self.headers.get("Content-Type", "application/octet-stream")
+        blob_id = self.store.put(self.rfile.read(length), content_type)
+        self._send(201, json.dumps({"id": blob_id}).encode(), "application/json")
+
+    def do_GET(self) -> None:
+        if not self._check():
+            return
+        blob_id = self._blob_id()
+        try:
+            data, content_type = self.store.get(blob_id)
+        except KeyError:
+            self._send(404, b"not found", "text/plain")
+        else:
+            self._send(200, data, content_type)
+
+    def do_DELETE(self) -> None:
+        if not self._check():
+            return
+        self.store.delete(self._blob_id())
+        self._send(204, b"", "text/plain")
+
+    def _check(self, token: bool = True) -> bool:
+        """
+        リクエストのオリジンとトークンを確認し、許可しない場合は 403 を返します。
+        Origin ヘッダーはブラウザ以外 (同じ端末のプロセスやテスト) からは送られないため、
+        ある場合だけ確認します。
+        """
+        origin = self.headers.get("Origin")
+        allowed = origin is None or (bool(self.origin) and origin == self.origin)
+        if allowed and token:
+            allowed = hmac.compare_digest(
+                self.headers.get("X-Blob-Token", "").encode(), self.token.encode()
+            )
+        if not allowed:
+            self._send(403, b"forbidden", "text/plain")
+        return allowed
+
+    def _blob_id(self) -> str:
+        path = urlsplit(self.path).path
+        return path[len("/blobs/") :] if path.startswith("/blobs/") else ""
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        if self.origin:
+            self.send_header("Access-Control-Allow-Origin", self.origin)
+            self.send_header(
+                "Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS"
+            )
+            self.send_header(
+                "Access-Control-Allow-Headers", "Content-Type, X-Blob-Token"
+            )
+            self.send_header("Vary", "Origin")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def start_blob_server(
+    store: BlobStore,
+    token: str,
+    origin: str = "",
+    host: str = "127.0.0.1",
+    port: int = 0,
+    max_upload: int = BLOB_UPLOAD_MAX_BYTES,
+):
+    """
+    BlobStore を公開する HTTP サーバーをバックグラウンドのスレッドで起動します。
+
+    Args:
+        store (BlobStore): 公開するストア。
+        token (str): リクエストの X-Blob-Token ヘッダーに要求するトークン。
+        origin (str, optional): CORS を許可するページのオリジン (例: "http://127.0.0.1:8000")。
+                                空の場合は Origin ヘッダーのあるリクエストを全て拒否します。
+        host (str, optional): 待ち受けるホスト。デフォルトは "127.0.0.1"。
+        port (int, optional): 待ち受けるポート。デフォルトは空いているポート。
+        max_upload (int, optional): アップロードできるデータのサイズの上限。
+                                    デフォルトは constants.BLOB_UPLOAD_MAX_BYTES。
+                                    ストアの max_bytes を超える場合は max_bytes が上限になります。
+
+    Returns:
+        ThreadingHTTPServer: 起動したサーバー。server_address で待ち受け先を取得できます。
+    """
+    handler = type(
+        "BoundBlobRequestHandler",
+        (BlobRequestHandler,),
+        {"store": store, "token": token, "origin": origin, "max_upload": max_upload},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -1,2 +1,29 @@
-class ReadError(Exception):
-    pass
+import threading
+
+
+class ReadError(Exception):
+    pass
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class CancelError(Exception):
+    pass
+
+
+def raise_if_cancelled(cancel: threading.Event | None) -> None:
+    """
+    キャンセルが要求されている場合に CancelError を送出します。
+    長い処理の区切りで呼び出し、不要になったジョブを途中で打ち切るために使います。
+
+    Args:
+        cancel (threading.Event, optional): セットされていればキャンセルとみなすイベント。
+                                            None の場合は何もしません。
+
+    Raises:
+        CancelError: cancel がセットされている場合。
+    """
+    if cancel is not None and cancel.is_set():
+        raise CancelError("Job was cancelled")
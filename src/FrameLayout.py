@@ -0,0 +1,90 @@
+from dataclasses import asdict, dataclass
+
+from src.constants import DEFAULT_RADIUS, GOLDEN_RATIO, SIDE_MARGIN_RATIO
+
+# 矩形は (x, y, 幅, 高さ) のタプルで表す
+Rect = tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class FrameLayout:
+    """
+    フレーム画像の配置 (画素を扱わない幾何情報のみ)。
+    FrameMaker の描画と WebView のプレビューが同じ値を使い、両者の配置がずれないようにします。
+
+    Attributes:
+        side (int): 出力する正方形画像の辺の長さ。
+        image (Rect): 元画像を貼り付ける矩形。
+        radius (int): 角丸の半径。角丸を使わない場合は 0。
+        color_bar (Rect | None): カラーバー全体の矩形。カラーバーを使わない場合は None。
+        swatches (tuple[Rect, ...]): カラーバーの 5 色それぞれの矩形 (左から順)。
+    """
+
+    side: int
+    image: Rect
+    radius: int
+    color_bar: Rect | None
+    swatches: tuple[Rect, ...]
+
+    def to_dict(self) -> dict:
+        """
+        WebView に返せるよう、辞書 (矩形はリスト) に変換します。
+        """
+        return asdict(self)
+
+
+def compute_frame_layout(
+    width: int,
+    height: int,
+    golden: bool,
+    golden_ratio: float = GOLDEN_RATIO,
+    rounded: bool = False,
+    radius: int = DEFAULT_RADIUS,
+    maincolor: bool = False,
+    side_margin_ratio: float = SIDE_MARGIN_RATIO,
+) -> FrameLayout:
+    """
+    元画像の大きさとオプションから、フレーム画像の配置を計算します。
+
+    Args:
+        width (int): 元画像の幅。
+        height (int): 元画像の高さ。
+        golden (bool): 比率フレームを適用するかどうか。
+        golden_ratio (float, optional): フレーム比率の値。デフォルトは constants.GOLDEN_RATIO。
+        rounded (bool, optional): 角丸フレームを適用するかどうか。
+        radius (int, optional): 角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+        maincolor (bool, optional): メインカラーバーを追加するかどうか。
+        side_margin_ratio (float, optional): サイドマージンの比率。デフォルトは constants.SIDE_MARGIN_RATIO。
+
+    Returns:
+        FrameLayout: 計算された配置。
+    """
+    if golden:
+        side = int(max(height, width) * golden_ratio)
+    else:
+        side = max(height, width)
+    side = max(side, height, width)
+
+    # 転置して配置してから戻す処理と同じ位置になるため、縦長・横長を区別せずに中央に配置する
+    image = ((side - width) // 2, (side - height) // 2, width, height)
+
+    color_bar = None
+    swatches = ()
+    if maincolor:
+        pickwidth = int(side // 5)
+        pickheight = int((side * side_margin_ratio) // 30)
+        # カラーバーは正方形画像の下部に中央揃えで配置する
+        left = (side - pickwidth * 5) // 2
+        top = side - pickheight
+        color_bar = (left, top, pickwidth * 5, pickheight)
+        swatches = tuple(
+            (left + pickwidth * i, top, pickwidth, pickheight) for i in range(5)
+        )
+
+    return FrameLayout(
+        side=side,
+        image=image,
+        radius=int(radius) if rounded else 0,
+        color_bar=color_bar,
+        swatches=swatches,
+    )
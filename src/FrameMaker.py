@@ -1,9 +1,23 @@
+import functools
+import threading
+from typing import TYPE_CHECKING
+
 import numpy as np
-from PIL import Image, ImageDraw
 
-from src.colorpick import getMainColorKmeans
-from src.constants import DEFAULT_RADIUS, GOLDEN_RATIO, SIDE_MARGIN_RATIO
+from src.constants import (
+    COLOR_METHOD,
+    DEFAULT_RADIUS,
+    GOLDEN_RATIO,
+    SIDE_MARGIN_RATIO,
+    STRIP_HEIGHT,
+)
+from src.FrameLayout import FrameLayout, Rect, compute_frame_layout
 from src.ImageHandler import ImageHandler
+from src.PngStripWriter import PngStripWriter
+from src.progress import BAR, ENCODE, MASK, PAD, ProgressCallback, report
+
+if TYPE_CHECKING:
+    from src.colorpick import Palette
 
 
 class FrameMaker:
@@ -22,6 +36,11 @@ class FrameMaker:
         radius: int = DEFAULT_RADIUS,
         golden_ratio: float = GOLDEN_RATIO,
         side_margin_ratio: float = SIDE_MARGIN_RATIO,
+        color_method: str = COLOR_METHOD,
+        palette: "Palette | None" = None,
+        color_workers: int | None = None,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
     ):
         """
         FrameMaker クラスのコンストラクタ。
@@ -32,19 +51,31 @@ class FrameMaker:
             bgcolor (str): フレームの背景色。
             rounded (bool): 角丸フレームを適用するかどうか。
             mc (bool): メインカラーバーを追加するかどうか。
-            radius (int, optional): 角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+            radius (int, optional): 元画像に対する角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+                                    縮小して読み込んだ画像では ImageHandler.scale に合わせて縮小します。
             golden_ratio (float, optional): フレーム比率の値。デフォルトは constants.GOLDEN_RATIO。
             side_margin_ratio (float, optional): サイドマージンの比率。デフォルトは constants.SIDE_MARGIN_RATIO。
+            color_method (str, optional): メインカラーの抽出方式。デフォルトは constants.COLOR_METHOD。
+            palette (Palette, optional): 計算済みの主要色。指定しない場合は ImageHandler から取得します。
+            color_workers (int, optional): 主要色の抽出に使用するスレッド数。デフォルトは CPU コア数。
+            cancel (threading.Event, optional): セットされると、run と write_strips を
+                                                次の区切りで CancelError により打ち切ります。
+            progress (ProgressCallback, optional): run と write_strips の各ステージ
+                                                   ("pad"、"mask"、"palette"、"bar"、write_strips では
+                                                   "encode") の進捗を受け取る関数。
+                                                   CancelError を送出すると処理を打ち切ります。
         """
         self.img = hdl.img
-        self.org_img = hdl.org_img
+        self.hdl = hdl
 
         self.height, self.width, _ = hdl.img.shape  # self.color は不要
 
         self.golden = golden
         self.bgcolor = bgcolor
         self.rounded = rounded
-        self.radius = radius
+        # プレビュー用に縮小した画像でも保存時と同じ見た目になるよう、半径を同じ倍率で縮小する
+        # (カラーバーとマージンは出力の辺の長さに比例するため調整は不要)
+        self.radius = radius if hdl.scale == 1 else max(1, round(radius * hdl.scale))
         self.mc = mc
         self.transpose = False
         self.is_square = self.height == self.width
@@ -52,88 +83,353 @@ class FrameMaker:
         self.is_width_base = False
         self.golden_ratio = golden_ratio
         self.side_margin_ratio = side_margin_ratio
+        self.color_method = color_method
+        self.palette = palette
+        self.color_workers = color_workers
+        self.cancel = cancel
+        self.progress = progress
 
-        self.roundmask = None
-        if self.rounded:
-            mask = Image.new("L", (self.width, self.height), 0)
-            draw = ImageDraw.Draw(mask)
-            draw.rounded_rectangle(
-                [(0, 0), (self.width, self.height)], radius=self.radius, fill=255
-            )
-            self.roundmask = np.array(mask) / 255.0
-            self.roundmask = self.roundmask[:, :, np.newaxis]
-
-    def run(self) -> np.ndarray:
+    def run(self, out: np.ndarray | None = None) -> np.ndarray:
         """
         フレーム処理を実行し、結果の画像を NumPy 配列として返します。
+        ImageHandler が uint8 モードの場合は uint8 パイプラインで処理します。
+        元画像はコピーせず、確保するのは出力画像のみです。
+
+        Args:
+            out (np.ndarray, optional): 結果を書き込む配列 (numpy.memmap など)。
+                                        形状は output_shape() と一致する必要があります。
 
         Returns:
-            np.ndarray: フレームが適用された画像データ (NumPy 配列)。
+            np.ndarray: フレームが適用された画像データ (uint8 の NumPy 配列)。out を指定した場合は out。
+
+        Raises:
+            ValueError: out の形状が出力画像と一致しない場合。
+            CancelError: cancel がセットされた場合、または progress が送出した場合。
         """
-        # 処理用の画像とサイズを一時変数にコピー
-        current_img = self.img.copy()
-        current_height, current_width, _ = current_img.shape
+        self._report(PAD, 0.0)
+        if out is not None and out.shape != self.output_shape():
+            raise ValueError(
+                f"Output array must have shape {self.output_shape()}: {out.shape}"
+            )
+        if self.img.dtype == np.uint8:
+            return self._run_uint8(out)
+
+        b, g, r = self._bgr()
+        layout = self.layout()
+
+        # 0-1 の float で合成してから 255 倍して切り捨てる従来の計算と同じ値になるよう、
+        # 背景色やカラーバーも一度 255 で割ってから 255 倍して切り捨てる
+        background_color = np.array([b, g, r]) / 255.0  # OpenCVはBGR順なので注意
+        # エンコーダーにそのまま渡せるよう、int64 ではなく uint8 の出力に直接書き込む
+        new_img = np.empty(self.output_shape(), dtype=np.uint8) if out is None else out
+        new_img[:] = (background_color * 255).astype(np.uint8)
+
+        region = new_img[_slices(layout.image)]
+        # 一時配列を作らずに 255 倍して切り捨てながら書き込む
+        np.multiply(self.img, 255, out=region, casting="unsafe")
+        self._report(PAD, 1.0)
 
         if self.rounded:
-            hex_color = self.bgcolor.lstrip('#')
-            r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-            background_color = np.array([b, g, r]) / 255.0
-            current_img = current_img * self.roundmask + background_color * (1 - self.roundmask)
-
-        # 縦長なら転置して横長にする
-        transposed_for_processing = False
-        if current_height > current_width:
-            current_img = current_img.transpose(1, 0, 2)
-            current_height, current_width, _ = current_img.shape
-            transposed_for_processing = True
-
-        # 新しい画像の辺の長さを計算
-        # 出力画像は常に正方形になるようにする
-        if self.golden:
-            # 黄金比を適用する場合、元の画像の長い辺を基準に黄金比を適用
-            target_side_length = int(max(self.height, self.width) * self.golden_ratio)
+            self._report(MASK, 0.0)
+            self._blend_corners(region, 0, (b, g, r))
+            self._report(MASK, 1.0)
+
+        if layout.color_bar is not None:
+            # カラーバーを新しい正方形画像の下部に中央揃えで直接描画
+            self._draw_color_bar(new_img[_slices(layout.color_bar)])
+
+        return new_img
+
+    def _run_uint8(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        uint8 のまま読み込み・パディング・貼り付け・角丸・カラーバー描画を行います。
+        float64 の中間配列を作らず、結果も uint8 で返します。
+
+        Args:
+            out (np.ndarray, optional): 結果を書き込む配列。指定しない場合は新たに確保します。
+
+        Returns:
+            np.ndarray: フレームが適用された画像データ (uint8 の NumPy 配列)。
+        """
+        b, g, r = self._bgr()
+        layout = self.layout()
+
+        if out is None:
+            new_img = np.empty(self.output_shape(), dtype=np.uint8)
         else:
-            # 黄金比を適用しない場合、元の画像の長い辺を基準にする
-            target_side_length = max(self.height, self.width)
+            new_img = out
+        new_img[:] = (b, g, r)  # OpenCVはBGR順なので注意
+
+        region = new_img[_slices(layout.image)]
+        region[:] = self.img
+        self._report(PAD, 1.0)
+
+        if self.rounded:
+            self._report(MASK, 0.0)
+            self._blend_corners(region, 0, (b, g, r))
+            self._report(MASK, 1.0)
+
+        if layout.color_bar is not None:
+            self._draw_color_bar(new_img[_slices(layout.color_bar)])
+
+        return new_img
+
+    def _palette(self) -> "Palette":
+        """
+        カラーバーに使う主要色を返します。指定されていない場合は ImageHandler のキャッシュを使います。
+        """
+        if self.palette is None:
+            self.palette = self.hdl.get_palette(
+                self.color_method, self.color_workers, self.cancel, self.progress
+            )
+        return self.palette
+
+    def _draw_color_bar(self, out: np.ndarray) -> None:
+        """
+        主要色のカラーバーを出力画像の領域に直接描画します。
+        colorpick はカラーバーを描画する場合にだけ読み込みます。
+        """
+        from src.colorpick import drawColorBar
+
+        palette = self._palette()
+        self._report(BAR, 0.0)
+        drawColorBar(palette, out)
+        self._report(BAR, 1.0)
 
-        # 新しい画像のサイズが元の画像を収めるのに十分であることを保証
-        target_side_length = max(target_side_length, current_height, current_width)
+    def _report(self, stage: str, fraction: float) -> None:
+        """
+        進捗を通知し、キャンセルが要求されていれば CancelError で打ち切ります。
+        """
+        report(self.progress, stage, fraction, self.cancel)
 
-        # 16進数カラーコードをRGBタプルに変換
+    def _bgr(self) -> tuple[int, int, int]:
+        """
+        背景色の16進数カラーコードを OpenCV の BGR 順のタプルに変換します。
+        """
         hex_color = self.bgcolor.lstrip('#')
         r, g, b = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        return b, g, r
+
+    def write_strips(
+        self, fp: str, strip_height: int = STRIP_HEIGHT, compression_level: int = 6
+    ) -> None:
+        """
+        フレーム処理の結果を横方向のストリップ単位で PNG ファイルに書き出します。
+        出力全体の配列は確保せず、各ストリップに重なる元画像の行だけを読み込むため、
+        メモリ使用量は出力サイズではなくストリップの大きさで決まります。
+
+        Args:
+            fp (str): 出力する PNG ファイルのパス。
+            strip_height (int, optional): 1 回に生成する行数。デフォルトは constants.STRIP_HEIGHT。
+            compression_level (int, optional): PNG (zlib) の圧縮レベル (0-9)。デフォルトは 6。
+
+        ストリップの生成と書き出しは交互に行うため、進捗は "encode" ステージとして
+        書き出した行の割合を通知します。
+
+        Raises:
+            CancelError: cancel がセットされた場合、または progress が送出した場合。
+        """
+        b, g, r = self._bgr()
+        layout = self.layout()
+        target_side_length = layout.side
+        sw, sh, _, _ = layout.image
+        if layout.color_bar is not None:
+            bar_left, bar_top, bar_width, _ = layout.color_bar
+            # 主要色はストリップの書き出しを始める前に求めておく
+            from src.colorpick import drawColorBar
+
+            palette = self._palette()
+
+        strip = np.empty((strip_height, target_side_length, 3), dtype=np.uint8)
+        with PngStripWriter(
+            fp, target_side_length, target_side_length, compression_level
+        ) as writer:
+            for top in range(0, target_side_length, strip_height):
+                self._report(ENCODE, top / target_side_length)
+                bottom = min(top + strip_height, target_side_length)
+                rows = strip[: bottom - top]
+                rows[:] = (b, g, r)
+
+                # ストリップに重なる元画像の行だけを読み込む
+                src_top = max(top, sh) - sh
+                src_bottom = min(bottom, sh + self.height) - sh
+                if src_top < src_bottom:
+                    region = rows[
+                        src_top + sh - top : src_bottom + sh - top,
+                        sw : sw + self.width,
+                    ]
+                    region[:] = self._source_rows_uint8(src_top, src_bottom)
+                    if self.rounded:
+                        self._blend_corners(region, src_top, (b, g, r))
+
+                if layout.color_bar is not None and bottom > bar_top:
+                    drawColorBar(
+                        palette,
+                        rows[max(bar_top, top) - top :, bar_left : bar_left + bar_width],
+                    )
+
+                writer.write_rows(rows)
+        self._report(ENCODE, 1.0)
+
+    def output_shape(self) -> tuple[int, int, int]:
+        """
+        出力画像の形状を返します。run に渡す出力配列の確保に使用します。
+
+        Returns:
+            tuple[int, int, int]: (高さ, 幅, 色チャンネル数)。
+        """
+        side = self.layout().side
+        return side, side, self.img.shape[2]
+
+    def layout(self) -> FrameLayout:
+        """
+        出力画像の辺の長さ、元画像とカラーバーの位置などの配置を返します。
+
+        Returns:
+            FrameLayout: 画素を扱わずに計算した配置。
+        """
+        return compute_frame_layout(
+            self.width,
+            self.height,
+            self.golden,
+            golden_ratio=self.golden_ratio,
+            rounded=self.rounded,
+            radius=self.radius,
+            maincolor=self.mc,
+            side_margin_ratio=self.side_margin_ratio,
+        )
+
+    def _source_rows_uint8(self, top: int, bottom: int) -> np.ndarray:
+        """
+        元画像の指定範囲の行を uint8 で返します。
+        float の元画像は、run と同じく 255 倍して切り捨てます。
+        """
+        rows = self.img[top:bottom]
+        if rows.dtype == np.uint8:
+            return rows
+        out = np.empty(rows.shape, dtype=np.uint8)
+        np.multiply(rows, 255, out=out, casting="unsafe")
+        return out
+
+    def _corner_patches(
+        self, bgr: tuple[int, int, int]
+    ) -> list[tuple[int, int, np.ndarray, np.ndarray]]:
+        """
+        角丸でブレンドが必要な領域と、そのアルファ・背景色の項を返します。
+        通常は四隅の (radius + 1) x (radius + 1) のパッチのみで、キャッシュを再利用します。
+
+        Returns:
+            list[tuple[int, int, np.ndarray, np.ndarray]]:
+                (元画像上の上端の行, 左端の列, アルファ, 背景色 * (255 - アルファ) + 127) のリスト。
+        """
+        size = self.radius + 1
+        if 2 * size <= min(self.height, self.width):
+            top_left, top_right, bottom_left, bottom_right = _corner_patches(
+                self.radius, bgr
+            )
+            return [
+                (0, 0, *top_left),
+                (0, self.width - size, *top_right),
+                (self.height - size, 0, *bottom_left),
+                (self.height - size, self.width - size, *bottom_right),
+            ]
+        # 画像が小さく四隅が重なる場合は画像全体のマスクを使う
+        return [(0, 0, *_blend_terms(self._round_mask(), bgr))]
+
+    def _round_mask(self) -> np.ndarray:
+        """
+        画像全体の角丸マスクを作成します。
+
+        Returns:
+            np.ndarray: 角丸マスク (uint8、0-255)。
+        """
+        from PIL import Image, ImageDraw
+
+        mask = Image.new("L", (self.width, self.height), 0)
+        draw = ImageDraw.Draw(mask)
+        draw.rounded_rectangle(
+            [(0, 0), (self.width, self.height)], radius=self.radius, fill=255
+        )
+        return np.array(mask)
+
+    def _blend_corners(
+        self, region: np.ndarray, top: int, bgr: tuple[int, int, int]
+    ) -> None:
+        """
+        出力画像に配置した元画像の四隅を、背景色とブレンドして角丸にします。
+        四隅のパッチのみを書き換えるため、処理量は半径の 2 乗に比例します。
+
+        Args:
+            region (np.ndarray): 元画像を配置した出力画像の領域 (元画像の top 行目から)。
+            top (int): region の先頭に対応する元画像の行。
+            bgr (tuple[int, int, int]): 背景色 (BGR 順)。
+        """
+        bottom = top + region.shape[0]
+        for y, x, alpha, background in self._corner_patches(bgr):
+            height, width = alpha.shape[:2]
+            patch_top = max(y, top)
+            patch_bottom = min(y + height, bottom)
+            if patch_top >= patch_bottom:
+                continue
+            rows = slice(patch_top - y, patch_bottom - y)
+            target = region[patch_top - top : patch_bottom - top, x : x + width]
+
+            if self.img.dtype == np.uint8:
+                # 固定小数点でブレンドする (アルファが 255 の画素は元の値のまま)
+                target[:] = (target * alpha[rows] + background[rows]) // 255
+            else:
+                # float パイプラインと同じ式でブレンドしてから 255 倍して切り捨てる
+                pixels = self.img[patch_top:patch_bottom, x : x + width]
+                ratio = alpha[rows] / 255.0
+                background_color = np.array(bgr) / 255.0
+                blended = pixels * ratio + background_color * (1 - ratio)
+                np.multiply(blended, 255, out=target, casting="unsafe")
+
+
+def _slices(rect: Rect) -> tuple[slice, slice]:
+    """
+    (x, y, 幅, 高さ) の矩形を、配列の行と列のスライスに変換します。
+    """
+    x, y, width, height = rect
+    return slice(y, y + height), slice(x, x + width)
+
+
+def _blend_terms(
+    mask: np.ndarray, bgr: tuple[int, int, int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    マスクから固定小数点ブレンド用のアルファと背景色の項を作成します。
+    """
+    alpha = mask.astype(np.uint16)[:, :, np.newaxis]
+    background = np.array(bgr, dtype=np.uint16) * (255 - alpha) + 127
+    alpha.flags.writeable = False
+    background.flags.writeable = False
+    return alpha, background
+
+
+@functools.lru_cache(maxsize=32)
+def _corner_patches(
+    radius: int, bgr: tuple[int, int, int]
+) -> tuple[tuple[np.ndarray, np.ndarray], ...]:
+    """
+    角丸の四隅のパッチを作成します。半径と背景色ごとにキャッシュします。
+    (2 * radius + 2) 四方の小さなマスクを描画し、その四隅を切り出すことで、
+    画像全体のマスクを描画した場合と同じパッチが得られます。
+
+    Returns:
+        tuple[tuple[np.ndarray, np.ndarray], ...]: 左上、右上、左下、右下の順の (アルファ, 背景色の項)。
+    """
+    from PIL import Image, ImageDraw
 
-        # 白枠をつけるか黒枠をつけるか
-        new_img = np.full(
-            (target_side_length, target_side_length, current_img.shape[2]),
-            (b, g, r),  # OpenCVはBGR順なので注意
-            dtype="float64"
-        ) / 255.0
-
-        # 画像を枠の中に配置する起点の計算
-        # current_imgの現在の形状（転置されている可能性のある形状）に基づいて中央に配置
-        sh = (target_side_length - current_height) // 2
-        sw = (target_side_length - current_width) // 2
-
-        new_img[sh : sh + current_height, sw : sw + current_width] = current_img
-
-        if transposed_for_processing:
-            new_img = new_img.transpose(1, 0, 2)
-
-        if self.mc:
-            # メインカラーバーの計算は元の画像サイズを基準にする
-            # 修正: new_imgの最終的な形状を考慮してpickwidthとpickheightを計算
-            # new_imgの形状は (height, width, color)
-            final_height, final_width, _ = new_img.shape
-            pickwidth = int(final_width // 5)
-            pickheight = int((final_height * self.side_margin_ratio) // 30)
-            picker = getMainColorKmeans(self.org_img, pickwidth, pickheight)
-
-            # カラーバーを新しい正方形画像の下部に中央揃えで配置
-            sw_for_color_bar = (final_width - pickwidth * 5) // 2
-            new_img[
-                final_height - pickheight : final_height,
-                sw_for_color_bar : sw_for_color_bar + pickwidth * 5,
-            ] = picker / 255
-
-        return (new_img * 255).astype(int)
+    size = radius + 1
+    canvas = 2 * size
+    mask = Image.new("L", (canvas, canvas), 0)
+    draw = ImageDraw.Draw(mask)
+    draw.rounded_rectangle([(0, 0), (canvas, canvas)], radius=radius, fill=255)
+    mask = np.array(mask)
+    return (
+        _blend_terms(mask[:size, :size], bgr),
+        _blend_terms(mask[:size, size:], bgr),
+        _blend_terms(mask[size:, :size], bgr),
+        _blend_terms(mask[size:, size:], bgr),
+    )
@@ -0,0 +1,312 @@
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.constants import DEFAULT_RADIUS, SERVICE_MAX_BODY_BYTES
+from src.Error import CancelError, QueueFullError, ReadError
+
+CONTENT_TYPES = {".jpg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+LATENCY_WINDOW = 1000
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "on", "yes")
+
+
+def parse_frame_options(query: str) -> dict:
+    """
+    クエリ文字列を API.runFrameMakerFromBytes のオプションに変換します。
+
+    Args:
+        query (str): "ratio=golden&bgcolor=%23FFFFFF&rounded=1" のようなクエリ文字列。
+
+    Returns:
+        dict: runFrameMakerFromBytes に渡すキーワード引数。
+
+    Raises:
+        ValueError: 値が不正な場合。
+    """
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    ext = "." + params.get("format", "jpg").lower().lstrip(".")
+    if ext == ".jpeg":
+        ext = ".jpg"
+    if ext not in CONTENT_TYPES:
+        raise ValueError(f"Unsupported output format: {ext}")
+    return {
+        "golden": params.get("ratio", "none"),
+        "bgcolor": params.get("bgcolor", "#FFFFFF"),
+        "rounded": _parse_bool(params.get("rounded", "false")),
+        "maincolor": _parse_bool(params.get("maincolor", "false")),
+        "radius": int(params.get("radius", DEFAULT_RADIUS)),
+        "ext": ext,
+        "profile": params.get("profile"),
+    }
+
+
+class FrameService:
+    """
+    フレーム処理のジョブを常駐プロセスで受け付けるクラス。
+    OpenCV や scikit-learn を読み込んだまま、上限付きのワーカープールでジョブを処理し、
+    待ち行列が上限に達した場合は QueueFullError で新しいジョブを拒否します。
+    """
+
+    def __init__(self, api=None, workers: int | None = None, max_queue: int | None = None):
+        """
+        FrameService クラスのコンストラクタ。
+
+        Args:
+            api (API, optional): ジョブの処理に使う API オブジェクト。デフォルトは、ワーカースレッドと
+                                 主要色の抽出のスレッドが CPU コア数を奪い合わないように
+                                 color_workers=1 とした新しい API。
+            workers (int, optional): ワーカースレッド数。デフォルトは CPU コア数。
+            max_queue (int, optional): 実行待ちにできるジョブ数の上限。デフォルトは workers の 4 倍。
+        """
+        if api is None:
+            from src.WebviewInterface import API
+
+            # ジョブ単位で並列に処理するため、主要色の抽出は各ジョブ 1 スレッドにする
+            api = API(color_workers=1)
+        self.api = api
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 4 if max_queue is None else max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="frame-worker"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        # 停止時にセットし、実行中のジョブを次の区切りで打ち切る
+        self._stopping = threading.Event()
+
+    def ensure_capacity(self) -> None:
+        """
+        新しいジョブを受け付けられるかを確認します。HTTP の本文を読み込む前に呼び出し、
+        拒否するジョブのためにメモリを確保しないようにします (受け付けは submit でも確認します)。
+
+        Raises:
+            QueueFullError: 実行待ちのジョブ数が上限に達している場合。
+        """
+        with self._lock:
+            self._check_capacity()
+
+    def _check_capacity(self) -> None:
+        # 実行中のジョブに加えて max_queue 個まで待たせる。self._lock を取得して呼び出す
+        if self._pending + self._running >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise QueueFullError("Frame job queue is full")
+
+    def submit(self, data: bytes, **options) -> Future:
+        """
+        フレーム処理のジョブを投入します。
+
+        Args:
+            data (bytes): エンコードされた入力画像データ。
+            **options: API.runFrameMakerFromBytes に渡すオプション。
+
+        Returns:
+            Future: エンコードされた処理済み画像データを返す Future。
+
+        Raises:
+            QueueFullError: 実行待ちのジョブ数が上限に達している場合。
+        """
+        with self._lock:
+            self._check_capacity()
+            self._pending += 1
+        submitted = time.perf_counter()
+        return self._executor.submit(self._run_job, submitted, data, options)
+
+    def _run_job(self, submitted: float, data: bytes, options: dict) -> bytes:
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        try:
+            result = self.api.runFrameMakerFromBytes(
+                data, cancel=self._stopping, **options
+            )
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+                self._latencies.append(time.perf_counter() - submitted)
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def stats(self) -> dict:
+        """
+        待ち行列の長さと、直近のジョブのレイテンシのパーセンタイルを返します。
+
+        Returns:
+            dict: queue_depth, running, completed, failed, rejected と
+                  latency_ms (p50, p90, p99) を含む辞書。
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "queue_depth": self._pending,
+                "running": self._running,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+        stats["latency_ms"] = {
+            name: _percentile(latencies, q) * 1000
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99))
+        }
+        return stats
+
+    def shutdown(self) -> None:
+        """
+        実行待ちのジョブを取り消し、実行中のジョブを打ち切って (CancelError) 終了を待ちます。
+        """
+        self._stopping.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """
+    ソート済みの値から最近接順位法でパーセンタイルを求めます。値がない場合は 0 を返します。
+    """
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+class FrameRequestHandler(BaseHTTPRequestHandler):
+    """
+    FrameService の HTTP インターフェース。
+
+    - POST /frame?ratio=golden&bgcolor=%23FFFFFF&rounded=1&radius=40&maincolor=0&format=jpg
+      本文にエンコードされた画像のバイト列を送ると、処理済みの画像のバイト列を返します。
+      format は jpg、png、webp、profile (fast、balanced、archival) でエンコード設定を選べます。
+      本文が max_body を超える場合は 413、待ち行列が上限に達している場合は 503 を、
+      本文を読み込まずに返します。
+    - GET /stats: 待ち行列の長さとレイテンシのパーセンタイルを JSON で返します。
+    - GET /health: 稼働確認用に "ok" を返します。
+    """
+
+    server_version = "FrameService/1.0"
+    service: FrameService = None
+    max_body: int = SERVICE_MAX_BODY_BYTES
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/stats":
+            self._send(200, json.dumps(self.service.stats()).encode(), "application/json")
+        elif path == "/health":
+            self._send(200, b"ok", "text/plain")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/frame":
+            self._send(404, b"not found", "text/plain")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self._send(400, b"invalid Content-Length", "text/plain")
+            return
+        # 読み込まない本文が残るため、応答後に接続を閉じる
+        if length > self.max_body:
+            self.close_connection = True
+            self._send(413, b"request body too large", "text/plain")
+            return
+        try:
+            self.service.ensure_capacity()
+        except QueueFullError as exc:
+            self.close_connection = True
+            self._send(503, str(exc).encode(), "text/plain", {"Retry-After": "1"})
+            return
+
+        data = self.rfile.read(length)
+        try:
+            options = parse_frame_options(url.query)
+            future = self.service.submit(data, **options)
+            result = future.result()
+        except (QueueFullError, CancelError) as exc:
+            self._send(503, str(exc).encode(), "text/plain", {"Retry-After": "1"})
+        except (ReadError, ValueError) as exc:
+            self._send(400, str(exc).encode(), "text/plain")
+        except Exception as exc:
+            # 応答を返さないとクライアントが待ち続けるため、想定外の例外も 500 で返す
+            self._send(500, (str(exc) or type(exc).__name__).encode(), "text/plain")
+        else:
+            self._send(200, result, CONTENT_TYPES[options["ext"]])
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, headers: dict | None = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix ソケットの場合 client_address はタプルではない
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> tuple[socket.socket, tuple[str, int]]:
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def create_server(
+    service: FrameService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: str | None = None,
+):
+    """
+    FrameService を公開する HTTP サーバーを作成します。
+    unix_socket を指定した場合は TCP の代わりに Unix ソケットで待ち受けます。
+
+    Args:
+        service (FrameService): ジョブを処理するサービス。
+        host (str, optional): 待ち受けるホスト。デフォルトは "127.0.0.1"。
+        port (int, optional): 待ち受けるポート。0 の場合は空いているポートを使います。
+        unix_socket (str, optional): 待ち受ける Unix ソケットのパス。
+
+    Returns:
+        ThreadingHTTPServer | ThreadingUnixHTTPServer: serve_forever で起動するサーバー。
+    """
+    handler = type("BoundFrameRequestHandler", (FrameRequestHandler,), {"service": service})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        return ThreadingUnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
@@ -1,54 +1,229 @@
+import io
+import os
+import threading
+from typing import TYPE_CHECKING
+
 import cv2
 import numpy as np
 
+from src.constants import (
+    ANALYSIS_MAX_SIDE,
+    COLOR_METHOD,
+    ENCODE_PROFILE,
+    ENCODE_PROFILES,
+)
 from src.Error import ReadError
+from src.progress import ProgressCallback
+
+if TYPE_CHECKING:
+    from src.colorpick import Palette
+
+# 縮小デコードの倍率と cv2.imread / cv2.imdecode のフラグ (倍率の大きい順)
+_REDUCED_READ_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+_JPEG_SAMPLING_FACTORS = {
+    "420": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+    "422": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_422,
+    "444": cv2.IMWRITE_JPEG_SAMPLING_FACTOR_444,
+}
+
+
+def encode_params(ext: str, profile: str = ENCODE_PROFILE) -> list[int]:
+    """
+    エンコードプロファイルから、出力形式に対応する cv2.imwrite / cv2.imencode のパラメータを作成します。
+    形式に関係しないパラメータ (PNG に対する JPEG の品質など) は含めません。
+
+    Args:
+        ext (str): 出力形式の拡張子 (".jpg"、".png"、".webp" など)。
+        profile (str, optional): constants.ENCODE_PROFILES のプロファイル名。
+                                 デフォルトは constants.ENCODE_PROFILE。
+
+    Returns:
+        list[int]: エンコードパラメータ。対応するパラメータがない形式では空のリスト。
+
+    Raises:
+        ValueError: プロファイル名が不正な場合。
+    """
+    try:
+        settings = ENCODE_PROFILES[profile]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported encode profile: {profile}") from exc
+
+    ext = ext.lower()
+    if ext in (".jpg", ".jpeg"):
+        return [
+            cv2.IMWRITE_JPEG_QUALITY, settings["jpeg_quality"],
+            cv2.IMWRITE_JPEG_OPTIMIZE, int(settings["jpeg_optimize"]),
+            cv2.IMWRITE_JPEG_PROGRESSIVE, int(settings["jpeg_progressive"]),
+            cv2.IMWRITE_JPEG_SAMPLING_FACTOR, _JPEG_SAMPLING_FACTORS[settings["jpeg_sampling"]],
+        ]
+    if ext == ".png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, settings["png_compression"]]
+    if ext == ".webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, settings["webp_quality"]]
+    return []
 
 
 class ImageHandler:
     """
     画像の読み込み、処理、保存を扱うクラス。
-    ファイルパスまたは WebView からの画像データをサポートします。
+    ファイルパス、WebView からの画像データ、デコード済みの配列やバッファをサポートします。
     """
 
-    def __init__(self, fp: str, webimg=None):
+    def __init__(
+        self,
+        fp: str,
+        webimg=None,
+        uint8: bool = False,
+        analysis_max_side: int = ANALYSIS_MAX_SIDE,
+        array=None,
+        shape: tuple[int, ...] | None = None,
+        channel_order: str = "BGR",
+        data: bytes | None = None,
+        max_side: int | None = None,
+    ):
         """
         ImageHandler クラスのコンストラクタ。
 
         Args:
             fp (str): 画像ファイルのパス。webimg が指定されない場合に使用されます。
+                      拡張子が .npy の場合はメモリマップで開き、コピーせずに使用します。
             webimg (PIL.Image.Image, optional): WebView からの PIL Image オブジェクト。
                                                 fp が指定されない場合に使用されます。
+            uint8 (bool, optional): True の場合、画像を 0-1 の float64 に変換せず
+                                    uint8 のまま保持します。FrameMaker は uint8 パイプラインで処理します。
+            analysis_max_side (int, optional): 色抽出用の縮小画像の長辺の最大値。
+                                               デフォルトは constants.ANALYSIS_MAX_SIDE。
+            array (optional): デコード済みの画像。NumPy 配列 (numpy.memmap を含む) または
+                              バッファプロトコルを持つオブジェクト (bytes, memoryview, mmap など)。
+                              コピーせずにそのまま使用します。fp と webimg が指定されない場合に使用されます。
+            shape (tuple[int, ...], optional): バッファを渡す場合の画像の形状 (高さ, 幅[, 3])。
+            channel_order (str, optional): .npy と array のチャンネル順 ("BGR" または "RGB")。
+                                           "RGB" の場合はコピーせずに BGR 順のビューに変換します。
+            data (bytes, optional): JPEG や PNG などにエンコードされた画像のバイト列。
+                                    fp と webimg が指定されない場合に使用されます。
+            max_side (int, optional): 指定した場合、長辺がこの値以下になるよう縮小して読み込みます。
+                                      JPEG は cv2.IMREAD_REDUCED_COLOR_2/4/8 で縮小したままデコードします。
+                                      プレビューの描画に使用し、元画像に対する倍率は scale に保持します。
         Raises:
-            ValueError: fp または webimg のどちらも指定されない場合。
+            ValueError: fp、webimg、data、array のいずれも指定されない場合。
         """
+        self.uint8 = uint8
+        self.channel_order = channel_order
+        self.max_side = max_side
+        # 縮小デコードした場合の元画像の (高さ, 幅)。デコード前に分かる場合のみ設定する
+        self._source_size = None
         if fp:
             self.img = self._read_image_from_path(fp)
         elif webimg is not None:
             self.img = self._read_image_from_webview(webimg)
+        elif data is not None:
+            self.img = self._read_image_from_bytes(data)
+        elif array is not None:
+            self.img = self._read_image_from_array(array, shape)
         else:
-            raise ValueError("Either fp or webimg must be provided.")
+            raise ValueError("Either fp, webimg, data or array must be provided.")
+
+        # 元画像の長辺に対する読み込んだ画像の長辺の比。縮小しない場合は 1.0
+        source_size = self._source_size or self.img.shape[:2]
+        self.img = self._fit_max_side(self.img)
+        self.scale = max(self.img.shape[:2]) / max(source_size)
 
-        self.org_img = self.img.copy()
+        # 元画像は書き換えない読み取り専用のビューとして 1 つだけ保持し、
+        # org_img もコピーせず同じ配列を参照する
+        self.img = self.img.view()
+        self.img.flags.writeable = False
+        self.org_img = self.img
         self.height, self.width, _ = self.img.shape  # self.color は不要
         self.fp = fp
+        self.analysis_max_side = analysis_max_side
+        self._analysis_img = None
+        self._palettes = {}
 
     def _read_image_from_path(self, fp: str) -> np.ndarray:
         """
         指定されたパスから画像を読み込み、NumPy 配列として返します。
+        .npy ファイルはメモリマップで開き、デコードやコピーを行いません。
 
         Args:
             fp (str): 画像ファイルのパス。
 
         Returns:
-            np.ndarray: 読み込まれた画像データ (NumPy 配列、0-1 の範囲に正規化)。
+            np.ndarray: 読み込まれた画像データ (NumPy 配列、0-1 の範囲に正規化。uint8 モードでは 0-255)。
 
         Raises:
             ReadError: 画像の読み込みに失敗した場合。
         """
-        img = cv2.imread(fp, cv2.IMREAD_COLOR)
+        if fp.lower().endswith(".npy"):
+            try:
+                img = np.load(fp, mmap_mode="r")
+            except (OSError, ValueError) as exc:
+                raise ReadError(f"Failed to read image from path: {fp}") from exc
+            return self._read_image_from_array(img, None)
+
+        img = cv2.imread(fp, self._read_flag(fp))
         if img is None:
             raise ReadError(f"Failed to read image from path: {fp}")
-        return img / 255.0
+        return self._normalize(img)
+
+    def _read_image_from_bytes(self, data: bytes) -> np.ndarray:
+        """
+        エンコードされた画像のバイト列をデコードし、NumPy 配列として返します。
+
+        Args:
+            data (bytes): エンコードされた画像データ。
+
+        Returns:
+            np.ndarray: デコードされた画像データ (NumPy 配列、0-1 の範囲に正規化。uint8 モードでは 0-255)。
+
+        Raises:
+            ReadError: 画像のデコードに失敗した場合。
+        """
+        flag = self._read_flag(io.BytesIO(data)) if self.max_side else cv2.IMREAD_COLOR
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+        if img is None:
+            raise ReadError("Failed to decode image data")
+        return self._normalize(img)
+
+    def _read_image_from_array(self, array, shape: tuple[int, ...] | None) -> np.ndarray:
+        """
+        デコード済みの配列またはバッファを、コピーせずに画像データとして扱います。
+        uint8 の配列は uint8 パイプライン、浮動小数点の配列は 0-1 の範囲として扱います。
+
+        Args:
+            array: NumPy 配列、またはバッファプロトコルを持つオブジェクト。
+            shape (tuple[int, ...] | None): バッファを渡す場合の画像の形状。
+
+        Returns:
+            np.ndarray: 画像データ (BGR 順のビュー)。
+
+        Raises:
+            ValueError: 形状、型、チャンネル順が不正な場合。
+        """
+        if isinstance(array, np.ndarray):
+            img = array
+        else:
+            if shape is None:
+                raise ValueError("shape is required when passing a raw buffer.")
+            img = np.frombuffer(array, dtype=np.uint8)
+            if len(shape) == 2:
+                shape = (*shape, 3)
+            img = img.reshape(shape)
+
+        if img.ndim != 3 or img.shape[2] != 3:
+            raise ValueError(f"Image array must have shape (height, width, 3): {img.shape}")
+        if img.dtype != np.uint8 and not np.issubdtype(img.dtype, np.floating):
+            raise ValueError(f"Unsupported image dtype: {img.dtype}")
+
+        if self.channel_order == "RGB":
+            img = img[:, :, ::-1]
+        elif self.channel_order != "BGR":
+            raise ValueError(f"Unsupported channel order: {self.channel_order}")
+        return img
 
     def _read_image_from_webview(self, webimg) -> np.ndarray:
         """
@@ -58,21 +233,100 @@ class ImageHandler:
             webimg (PIL.Image.Image): WebView からの PIL Image オブジェクト。
 
         Returns:
-            np.ndarray: 変換された画像データ (NumPy 配列、0-1 の範囲に正規化)。
+            np.ndarray: 変換された画像データ (NumPy 配列、0-1 の範囲に正規化。uint8 モードでは 0-255)。
         """
         img = np.array(webimg)
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR, dst=img)
+        return self._normalize(img)
+
+    def _read_flag(self, source) -> int:
+        """
+        max_side に対して縮小しすぎない最大の倍率で読み込むフラグを返します。
+        元画像の大きさはヘッダーのみから取得し、取得できない場合は等倍で読み込みます。
+
+        Args:
+            source: 画像ファイルのパス、またはバイト列を読み込むファイルオブジェクト。
+
+        Returns:
+            int: cv2.imread / cv2.imdecode に渡すフラグ。
+        """
+        if not self.max_side:
+            return cv2.IMREAD_COLOR
+        # Pillow はプレビューの縮小デコードでのみ必要なため、ここで読み込む
+        from PIL import Image, UnidentifiedImageError
+
+        try:
+            with Image.open(source) as img:
+                width, height = img.size
+        except (OSError, UnidentifiedImageError):
+            return cv2.IMREAD_COLOR
+
+        self._source_size = (height, width)
+        for factor, flag in _REDUCED_READ_FLAGS:
+            if max(height, width) // factor >= self.max_side:
+                return flag
+        return cv2.IMREAD_COLOR
+
+    def _fit_max_side(self, img: np.ndarray) -> np.ndarray:
+        """
+        max_side を指定した場合、長辺が max_side 以下になるよう面積平均で縮小します。
+        """
+        if not self.max_side or max(img.shape[:2]) <= self.max_side:
+            return img
+        scale = self.max_side / max(img.shape[:2])
+        size = (
+            max(1, round(img.shape[1] * scale)),
+            max(1, round(img.shape[0] * scale)),
+        )
+        return cv2.resize(np.ascontiguousarray(img), size, interpolation=cv2.INTER_AREA)
+
+    def _normalize(self, img: np.ndarray) -> np.ndarray:
+        """
+        デコード済みの uint8 画像を保持形式に変換します。
+        uint8 モードではそのまま返し、それ以外では 0-1 の float64 に正規化します。
+        """
+        if self.uint8:
+            return img
         return img / 255.0
 
-    def save_image(self, fp: str, img: np.ndarray) -> None:
+    def save_image(self, fp: str, img: np.ndarray, profile: str = ENCODE_PROFILE) -> None:
         """
         画像を指定されたパスに保存します。
 
         Args:
-            fp (str): 画像を保存するパス。
-            img (np.ndarray): 保存する画像データ (NumPy 配列)。
+            fp (str): 画像を保存するパス。拡張子から出力形式を決めます。
+            img (np.ndarray): 保存する画像データ (BGR 順の NumPy 配列)。
+            profile (str, optional): エンコードプロファイル ("fast"、"balanced"、"archival")。
+                                     デフォルトは constants.ENCODE_PROFILE。
+
+        Raises:
+            ValueError: プロファイル名が不正な場合。
         """
-        cv2.imwrite(fp, img, [cv2.IMWRITE_JPEG_QUALITY, 100])
+        ext = os.path.splitext(fp)[1]
+        cv2.imwrite(fp, _encodable(img), encode_params(ext, profile))
+
+    def encode_image(
+        self, img: np.ndarray, ext: str = ".jpg", profile: str = ENCODE_PROFILE
+    ) -> bytes:
+        """
+        画像を指定された形式でエンコードし、バイト列として返します。
+
+        Args:
+            img (np.ndarray): エンコードする画像データ (BGR 順の NumPy 配列)。
+            ext (str, optional): 出力形式の拡張子 (".jpg"、".png"、".webp" など)。デフォルトは ".jpg"。
+            profile (str, optional): エンコードプロファイル ("fast"、"balanced"、"archival")。
+                                     デフォルトは constants.ENCODE_PROFILE。
+
+        Returns:
+            bytes: エンコードされた画像データ。
+
+        Raises:
+            ValueError: プロファイル名が不正な場合、またはエンコードに失敗した場合。
+        """
+        ok, encoded = cv2.imencode(ext, _encodable(img), encode_params(ext, profile))
+        if not ok:
+            raise ValueError(f"Failed to encode image as {ext}")
+        return encoded.tobytes()
 
     def get_image_data(self) -> tuple[np.ndarray, int, int, int]:
         """
@@ -88,6 +342,68 @@ class ImageHandler:
         元の画像データ (処理前の画像) を返します。
 
         Returns:
-            np.ndarray: 元の画像データ (NumPy 配列)。
+            np.ndarray: 元の画像データ (読み取り専用の NumPy 配列)。
         """
         return self.org_img
+
+    def get_analysis_image(self) -> np.ndarray:
+        """
+        色抽出用に長辺を analysis_max_side 以下へ面積平均で縮小した画像を返します。
+        結果はキャッシュされ、元画像が十分小さい場合は元画像をそのまま返します。
+
+        Returns:
+            np.ndarray: 縮小された画像データ (NumPy 配列)。
+        """
+        if self._analysis_img is None:
+            scale = self.analysis_max_side / max(self.height, self.width)
+            if scale >= 1:
+                self._analysis_img = self.img
+            else:
+                size = (
+                    max(1, round(self.width * scale)),
+                    max(1, round(self.height * scale)),
+                )
+                self._analysis_img = cv2.resize(
+                    self.img, size, interpolation=cv2.INTER_AREA
+                )
+        return self._analysis_img
+
+    def get_palette(
+        self,
+        method: str = COLOR_METHOD,
+        workers: int | None = None,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> "Palette":
+        """
+        色抽出用の縮小画像から主要な色を抽出した Palette を返します。
+        結果は method ごとにキャッシュされ、背景色の候補とカラーバーで同じものを使います。
+
+        Args:
+            method (str, optional): 色抽出のバックエンド。デフォルトは constants.COLOR_METHOD。
+            workers (int, optional): 色抽出に使用するスレッド数。デフォルトは CPU コア数。
+            cancel (threading.Event, optional): セットされると、色抽出を途中で打ち切ります。
+            progress (ProgressCallback, optional): "palette" ステージの進捗を受け取る関数。
+                                                   キャッシュ済みの場合は通知しません。
+
+        Returns:
+            Palette: 主要な色。
+
+        Raises:
+            CancelError: cancel がセットされた場合。
+        """
+        if method not in self._palettes:
+            from src.colorpick import getMainColorPalette
+
+            self._palettes[method] = getMainColorPalette(
+                self.get_analysis_image(), method, workers, cancel, progress
+            )
+        return self._palettes[method]
+
+
+def _encodable(img: np.ndarray) -> np.ndarray:
+    """
+    OpenCV のエンコーダーにそのまま渡せる、C 連続の uint8 配列 (BGR 順) を返します。
+    FrameMaker の出力のように既に C 連続の uint8 であれば、コピーせずにそのまま返します。
+    """
+    return np.ascontiguousarray(img, dtype=np.uint8)
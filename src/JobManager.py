@@ -0,0 +1,175 @@
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.constants import JOB_HISTORY, JOB_WORKERS
+from src.Error import CancelError
+
+# ジョブの状態。pending と running 以外は終了済み
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+MISSING = "missing"
+
+
+@dataclass
+class _Job:
+    id: str
+    cancel: threading.Event = field(default_factory=threading.Event)
+    status: str = PENDING
+    result: object = None
+    error: str = ""
+    stage: str = ""
+    fraction: float = 0.0
+    future: Future | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "stage": self.stage,
+            "fraction": self.fraction,
+        }
+
+
+class JobManager:
+    """
+    時間のかかる処理をバックグラウンドのスレッドで実行し、ジョブ ID で状態を追跡するクラス。
+    WebView からの呼び出しをすぐに返し、処理中も UI が固まらないようにします。
+    終了済みのジョブは JOB_HISTORY 個まで保持し、古いものから削除します。
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        history: int = JOB_HISTORY,
+        on_finish: Callable[[dict], None] | None = None,
+    ):
+        """
+        JobManager クラスのコンストラクタ。
+
+        Args:
+            workers (int, optional): ワーカースレッド数。デフォルトは constants.JOB_WORKERS。
+            history (int, optional): 保持する終了済みジョブの数。デフォルトは constants.JOB_HISTORY。
+            on_finish (Callable[[dict], None], optional): ジョブの終了時に poll と同じ辞書を渡して
+                                                         呼び出す関数。ワーカースレッドから呼び出されます。
+        """
+        self.history = history
+        self._on_finish = on_finish
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="api-job"
+        )
+        self._jobs: OrderedDict[str, _Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args, **kwargs) -> str:
+        """
+        ジョブを投入し、すぐにジョブ ID を返します。
+        func にはキーワード引数 cancel (threading.Event) と progress (progress.ProgressCallback) を
+        追加して渡すため、func は処理の区切りで progress.report(progress, stage, fraction, cancel) を
+        呼び出してください。通知された最新のステージと進捗は poll で確認できます。
+
+        Returns:
+            str: 推測できないランダムなジョブ ID。
+        """
+        job = _Job(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _run(self, job: _Job, func: Callable, args: tuple, kwargs: dict) -> None:
+        with self._lock:
+            cancelled = job.cancel.is_set()
+            if not cancelled:
+                job.status = RUNNING
+        if cancelled:
+            # 実行待ちの間にキャンセルされたが、Future の取り消しが間に合わなかった場合
+            self._finish(job, CANCELLED)
+            return
+        try:
+            result = func(
+                *args,
+                cancel=job.cancel,
+                progress=lambda stage, fraction: self._progress(job, stage, fraction),
+                **kwargs,
+            )
+        except CancelError:
+            self._finish(job, CANCELLED)
+        except Exception as exc:
+            # ワーカースレッドの例外は呼び出し元に届かないため、ジョブの状態として返す
+            self._finish(job, FAILED, error=str(exc) or type(exc).__name__)
+        else:
+            self._finish(job, DONE, result=result)
+
+    def _progress(self, job: _Job, stage: str, fraction: float) -> None:
+        with self._lock:
+            job.stage = stage
+            job.fraction = fraction
+
+    def _finish(self, job: _Job, status: str, result=None, error: str = "") -> None:
+        with self._lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            finished = [
+                job_id
+                for job_id, other in self._jobs.items()
+                if other.status not in (PENDING, RUNNING)
+            ]
+            for job_id in finished[: max(0, len(finished) - self.history)]:
+                del self._jobs[job_id]
+            state = job.to_dict()
+        if self._on_finish is not None:
+            self._on_finish(state)
+
+    def poll(self, job_id: str) -> dict:
+        """
+        ジョブの状態を返します。
+
+        Returns:
+            dict: id, status ("pending"、"running"、"done"、"failed"、"cancelled")、
+                  result (done の場合の処理結果)、error (failed の場合のメッセージ)、
+                  stage と fraction (最後に通知されたステージとその進捗) を含む辞書。
+                  ID が存在しない場合 (削除済みの場合を含む) の status は "missing"。
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return _Job(job_id, status=MISSING).to_dict()
+            return job.to_dict()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        ジョブのキャンセルを要求します。実行待ちのジョブはすぐに、
+        実行中のジョブは次の区切りで打ち切られ、状態が "cancelled" になります。
+
+        Returns:
+            bool: キャンセルを要求できた場合は True。ジョブが存在しないか終了済みの場合は False。
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in (PENDING, RUNNING):
+                return False
+            job.cancel.set()
+            pending = job.status == PENDING
+        if pending and job.future.cancel():
+            self._finish(job, CANCELLED)
+        return True
+
+    def shutdown(self) -> None:
+        """
+        全てのジョブのキャンセルを要求し、実行中のジョブの終了を待ちます。
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,94 @@
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class PngStripWriter:
+    """
+    画像全体をメモリに置かずに、横方向のストリップ単位で PNG を書き出すクラス。
+    行は受け取った順に圧縮してファイルへ書き込みます。
+    """
+
+    def __init__(self, fp: str, width: int, height: int, compression_level: int = 6):
+        """
+        PngStripWriter クラスのコンストラクタ。
+
+        Args:
+            fp (str): 出力する PNG ファイルのパス。
+            width (int): 画像の幅。
+            height (int): 画像の高さ。
+            compression_level (int, optional): zlib の圧縮レベル (0-9)。デフォルトは 6。
+        """
+        self.fp = fp
+        self.width = width
+        self.height = height
+        self.compression_level = compression_level
+        self.rows_written = 0
+        self._file = None
+        self._compressor = None
+
+    def __enter__(self) -> "PngStripWriter":
+        self._file = open(self.fp, "wb")
+        self._file.write(PNG_SIGNATURE)
+        # 8bit RGB、圧縮方式 0、フィルタ方式 0、インターレースなし
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        )
+        self._compressor = zlib.compressobj(self.compression_level)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self.close()
+        finally:
+            self._file.close()
+
+    def write_rows(self, rows: np.ndarray) -> None:
+        """
+        ストリップを書き込みます。
+
+        Args:
+            rows (np.ndarray): 書き込む行 (n x width x 3 の uint8 配列、OpenCV と同じ BGR 順)。
+
+        Raises:
+            ValueError: 行の幅が異なる場合、または高さを超えて書き込もうとした場合。
+        """
+        count = rows.shape[0]
+        if rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"Rows must have shape (n, {self.width}, 3): {rows.shape}")
+        if self.rows_written + count > self.height:
+            raise ValueError("Too many rows written to PNG")
+
+        # 各行の先頭にフィルタ種別 0 (None) を付け、BGR を RGB に並べ替える
+        scanlines = np.empty((count, 1 + self.width * 3), dtype=np.uint8)
+        scanlines[:, 0] = 0
+        scanlines[:, 1:].reshape(count, self.width, 3)[:] = rows[:, :, ::-1]
+
+        data = self._compressor.compress(scanlines)
+        if data:
+            self._write_chunk(b"IDAT", data)
+        self.rows_written += count
+
+    def close(self) -> None:
+        """
+        残りの圧縮データと終端チャンクを書き込みます。
+
+        Raises:
+            ValueError: 書き込まれた行数が高さと一致しない場合。
+        """
+        if self.rows_written != self.height:
+            raise ValueError(
+                f"Expected {self.height} rows but {self.rows_written} were written"
+            )
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_chunk(self, kind: bytes, data: bytes) -> None:
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
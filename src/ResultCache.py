@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.constants import RESULT_CACHE_DISK_MAX_BYTES, RESULT_CACHE_MAX_BYTES
+
+# ディスクに保存する値の型と拡張子
+_DISK_SUFFIXES = {bytes: ".bin", list: ".json"}
+
+
+def content_hash(data: bytes) -> str:
+    """
+    入力データの内容から、キャッシュのキーに使うハッシュ値を求めます。
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _sizeof(value) -> int:
+    """
+    キャッシュの容量計算に使う値のおおよそのバイト数を返します。
+    """
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(sys.getsizeof(e) for e in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    入力データのハッシュと正規化したオプションをキーにした LRU キャッシュ。
+    デコード済みの画像、主要色、エンコード済みのフレーム画像を保持します。
+    メモリ上の合計サイズが上限を超えた場合は、最も古く使われたものから削除します。
+    disk_dir を指定した場合、バイト列とリストの値はディスクにも保存し、
+    メモリから削除された後やプロセスの再起動後も再利用します。
+    ディスク上の合計サイズが disk_max_bytes を超えた場合は、最終利用時刻 (mtime) の古いファイルから削除します。
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        disk_dir: str | None = None,
+        disk_max_bytes: int = RESULT_CACHE_DISK_MAX_BYTES,
+    ):
+        """
+        ResultCache クラスのコンストラクタ。
+
+        Args:
+            max_bytes (int, optional): メモリ上に保持する値の合計サイズの上限。
+                                       デフォルトは constants.RESULT_CACHE_MAX_BYTES。
+            disk_dir (str, optional): ディスクキャッシュのディレクトリ。デフォルトはディスクを使用しません。
+            disk_max_bytes (int, optional): ディスク上に保持するファイルの合計サイズの上限。
+                                            デフォルトは constants.RESULT_CACHE_DISK_MAX_BYTES。
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_size = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            # 以前のプロセスが書き込んだファイルも上限に含める
+            self._disk_size = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """
+        キーの要素 (種類、入力のハッシュ値、正規化したオプションなど) からキーを作成します。
+        """
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        キーに対応する値を返します。存在しない場合は None を返します。
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        """
+        値を保存します。上限を超える場合は古い値から削除します。
+        """
+        self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def _put_memory(self, key: str, value) -> None:
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._size -= old_size
+
+    def _disk_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.disk_dir, key + suffix)
+
+    def _read_disk(self, key: str):
+        if not self.disk_dir:
+            return None
+        try:
+            path = self._disk_path(key, ".bin")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    value = f.read()
+            else:
+                path = self._disk_path(key, ".json")
+                if not os.path.exists(path):
+                    return None
+                with open(path, encoding="utf-8") as f:
+                    value = json.load(f)
+            # 最終利用時刻を更新し、よく使うファイルを削除の対象から遠ざける
+            os.utime(path)
+        except FileNotFoundError:
+            # 読み込みの間に別のプロセスやスレッドが削除した場合
+            return None
+        return value
+
+    def _write_disk(self, key: str, value) -> None:
+        suffix = _DISK_SUFFIXES.get(type(value))
+        if not self.disk_dir or suffix is None:
+            return
+        path = self._disk_path(key, suffix)
+        # 書き込み途中のファイルを読まないよう、一時ファイルから置き換える
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if suffix == ".bin":
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+        size = os.path.getsize(tmp_path)
+        if size > self.disk_max_bytes:
+            os.remove(tmp_path)
+            return
+        try:
+            old_size = os.path.getsize(path)
+        except FileNotFoundError:
+            old_size = 0
+        os.replace(tmp_path, path)
+        with self._disk_lock:
+            self._disk_size += size - old_size
+            if self._disk_size > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _disk_files(self) -> list[tuple[str, int, float]]:
+        """
+        ディスクキャッシュのファイルの (パス, サイズ, mtime) を返します。書き込み途中の一時ファイルは含めません。
+        """
+        files = []
+        with os.scandir(self.disk_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(tuple(_DISK_SUFFIXES.values())):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _evict_disk(self) -> None:
+        # 同じディレクトリを別のプロセスと共有している場合に備えて、実際のファイルから数え直す。
+        # self._disk_lock を取得して呼び出す
+        files = sorted(self._disk_files(), key=lambda file: file[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._disk_size = total
+
+    def __len__(self) -> int:
+        return len(self._entries)
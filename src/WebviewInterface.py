@@ -1,63 +1,44 @@
 import base64
 import io
+import json
 import os
-from numbers import Real
+import secrets
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import cv2
 import numpy as np
-import webview
-from PIL import Image
 
-from src.colorpick import getMainColorRGBValue
+from src.BlobStore import BlobStore, start_blob_server
 from src.constants import (
+    COLOR_METHOD,
     DEFAULT_RADIUS,
-    GOLDEN_RATIO,
-    MAX_FRAME_RATIO,
-    MIN_FRAME_RATIO,
+    ENCODE_PROFILE,
+    ENCODE_PROFILES,
+    JOB_FINISHED_CALLBACK,
+    PREVIEW_ENCODE_PROFILE,
+    PREVIEW_MAX_SIDE,
+    RESULT_CACHE_DIR_ENV,
     SIDE_MARGIN_RATIO,
-    SILVER_RATIO,
 )
 from src.Error import ReadError
+from src.FrameLayout import compute_frame_layout
 from src.FrameMaker import FrameMaker
 from src.ImageHandler import ImageHandler
+from src.JobManager import JobManager
+from src.metrics import instrument
+from src.progress import DECODE, ENCODE, ProgressCallback, report
+from src.ratio import resolve_frame_ratio, validate_frame_ratio  # noqa: F401
+from src.render import render_file
+from src.ResultCache import ResultCache, content_hash
 
+if TYPE_CHECKING:
+    from PIL import Image
 
-def validate_frame_ratio(frame_ratio: float) -> float:
-    ratio = float(frame_ratio)
-    if not MIN_FRAME_RATIO <= ratio <= MAX_FRAME_RATIO:
-        raise ValueError(
-            f"Frame ratio must be between {MIN_FRAME_RATIO} and {MAX_FRAME_RATIO}: "
-            f"{ratio}"
-        )
-    return ratio
-
-
-def resolve_frame_ratio(frame_mode) -> tuple[bool, float]:
-    """
-    フレーム比率モードを FrameMaker に渡す boolean と比率値に変換します。
-    既存の boolean 入力は後方互換のため Golden として扱います。
-    """
-    if isinstance(frame_mode, Real) and not isinstance(frame_mode, bool):
-        return True, validate_frame_ratio(frame_mode)
-
-    if isinstance(frame_mode, str):
-        mode = frame_mode.lower()
-        if mode in ("none", "false", "off", ""):
-            return False, GOLDEN_RATIO
-        if mode == "golden":
-            return True, GOLDEN_RATIO
-        if mode == "silver":
-            return True, SILVER_RATIO
-        try:
-            return True, validate_frame_ratio(float(mode))
-        except ValueError as exc:
-            raise ValueError(f"Unsupported frame ratio mode: {frame_mode}") from exc
-
-    return bool(frame_mode), GOLDEN_RATIO
+    from src.colorpick import Palette
 
 
-def pillow_image_to_base64_string(img: Image) -> str:
+def pillow_image_to_base64_string(img: "Image.Image") -> str:
     """
     PIL Image オブジェクトを Base64 エンコードされた JPEG 文字列に変換します。
 
@@ -72,7 +53,7 @@ def pillow_image_to_base64_string(img: Image) -> str:
     return base64.b64encode(buffered.getvalue()).decode("utf-8")
 
 
-def base64_string_to_pillow_image(base64_str: str) -> Image.Image:
+def base64_string_to_pillow_image(base64_str: str) -> "Image.Image":
     """
     Base64 エンコードされた文字列を PIL Image オブジェクトに変換します。
 
@@ -82,10 +63,25 @@ def base64_string_to_pillow_image(base64_str: str) -> Image.Image:
     Returns:
         PIL.Image.Image: 変換された PIL Image オブジェクト。
     """
+    from PIL import Image
+
     return Image.open(
         io.BytesIO(base64.decodebytes(bytes(base64_str.split(",")[1], "utf-8"))))
 
 
+def base64_string_to_bytes(base64_str: str) -> bytes:
+    """
+    Base64 エンコードされた data URL をデコードし、画像ファイルのバイト列を返します。
+
+    Args:
+        base64_str (str): Base64 エンコードされた画像データ文字列 ("data:image/...;base64,...")。
+
+    Returns:
+        bytes: デコードされた画像ファイルのバイト列。
+    """
+    return base64.b64decode(base64_str.split(",")[-1])
+
+
 def get_save_path(base_filename: str, directory: str = ".") -> str:
     """
     指定されたディレクトリ内に、重複しないファイルパスを生成します。
@@ -116,8 +112,42 @@ class API:
     画像処理機能へのアクセスを提供します。
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cache: ResultCache | None = None,
+        color_workers: int | None = None,
+        encode_profile: str = ENCODE_PROFILE,
+    ):
+        """
+        API クラスのコンストラクタ。
+
+        Args:
+            cache (ResultCache, optional): デコード済みの画像、主要色、フレーム画像のキャッシュ。
+                                           デフォルトは環境変数 FRAMEMAKER_CACHE_DIR を
+                                           ディスクキャッシュとする新しいキャッシュ。
+            color_workers (int, optional): 主要色の抽出に使用するスレッド数。デフォルトは CPU コア数。
+                                           複数のプロセスで並列に処理する場合は 1 を指定します。
+            encode_profile (str, optional): 保存と処理結果のエンコードプロファイル
+                                            ("fast"、"balanced"、"archival")。
+                                            デフォルトは constants.ENCODE_PROFILE。
+                                            プレビューは常に constants.PREVIEW_ENCODE_PROFILE を使います。
+
+        Raises:
+            ValueError: encode_profile が不正な場合。
+        """
         self._window = None
+        self._color_workers = color_workers
+        if encode_profile not in ENCODE_PROFILES:
+            raise ValueError(f"Unsupported encode profile: {encode_profile}")
+        self._encode_profile = encode_profile
+        self._blob_store = BlobStore()
+        self._blob_server = None
+        # Blob サーバーへのリクエストに要求するトークン。WebView のページにだけ渡す
+        self._blob_token = secrets.token_urlsafe(32)
+        if cache is None:
+            cache = ResultCache(disk_dir=os.getenv(RESULT_CACHE_DIR_ENV) or None)
+        self._cache = cache
+        self._jobs = JobManager(on_finish=self._notify_job)
 
     def set_window(self, window) -> None:
         self._window = window
@@ -128,6 +158,9 @@ class API:
             downloads_path.mkdir(parents=True, exist_ok=True)
             return get_save_path("output.jpg", str(downloads_path))
 
+        # pywebview はウィンドウがある場合だけ必要なため、ここで読み込む
+        import webview
+
         result = self._window.create_file_dialog(
             webview.SAVE_DIALOG,
             save_filename="output.jpg",
@@ -152,18 +185,62 @@ class API:
 
     def _save_frame_maker_to_path(
         self,
-        inputdata: str,
+        data: bytes,
         golden: bool | str,
         bgcolor: str,
         rounded: bool,
         maincolor: bool,
         save_path: str,
         radius: int = DEFAULT_RADIUS,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
     ) -> str:
-        webimg = base64_string_to_pillow_image(inputdata)
-        handler = ImageHandler(fp="", webimg=webimg)
+        digest = content_hash(data)
+        normalized_path = self._normalize_save_path(save_path)
+        with instrument("save", progress, output=normalized_path) as progress:
+            handler = self._load_handler(data, digest, cancel, progress)
+            fm = self._create_frame_maker(
+                handler,
+                data,
+                digest,
+                golden,
+                bgcolor,
+                rounded,
+                maincolor,
+                radius,
+                cancel,
+                progress,
+            )
+            result = fm.run()
+            report(progress, ENCODE, 0.0, cancel)
+            Path(normalized_path).parent.mkdir(parents=True, exist_ok=True)
+            handler.save_image(normalized_path, result, self._encode_profile)
+            report(progress, ENCODE, 1.0)
+        return normalized_path
+
+    def _create_frame_maker(
+        self,
+        handler: ImageHandler,
+        data: bytes,
+        digest: str,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
+        reduced: bool = False,
+    ) -> FrameMaker:
+        """
+        API のオプションから FrameMaker を作成します。
+        カラーバーには元画像から求めた (キャッシュ済みの) 主要色を使います。
+        reduced が True (handler がプレビュー用の縮小画像) の場合、キャッシュがなければ
+        元画像をデコードせず、handler の画像から主要色を抽出します。
+        cancel と progress は、主要色の抽出とフレーム処理の両方に渡します。
+        """
         use_ratio, frame_ratio = resolve_frame_ratio(golden)
-        fm = FrameMaker(
+        return FrameMaker(
             handler,
             use_ratio,
             bgcolor,
@@ -172,12 +249,151 @@ class API:
             radius=radius,
             golden_ratio=frame_ratio,
             side_margin_ratio=SIDE_MARGIN_RATIO,
+            palette=(
+                self._load_palette(
+                    data,
+                    digest,
+                    cancel=cancel,
+                    progress=progress,
+                    handler=handler if reduced else None,
+                )
+                if maincolor
+                else None
+            ),
+            cancel=cancel,
+            progress=progress,
         )
-        result = fm.run()
-        normalized_path = self._normalize_save_path(save_path)
-        Path(normalized_path).parent.mkdir(parents=True, exist_ok=True)
-        handler.save_image(normalized_path, result)
-        return normalized_path
+
+    def _blob_data(self, blob_id: str) -> bytes:
+        try:
+            data, _ = self._blob_store.get(blob_id)
+        except KeyError as exc:
+            raise ReadError(f"Blob not found: {blob_id}") from exc
+        return data
+
+    def _load_handler(
+        self,
+        data: bytes,
+        digest: str | None = None,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> ImageHandler:
+        """
+        画像データをデコードした ImageHandler を返します。
+        デコード結果は入力のハッシュ値をキーにキャッシュし、同じ画像の再デコードを省きます。
+        progress には "decode" ステージの開始と終了を通知します。
+        """
+        report(progress, DECODE, 0.0, cancel)
+        key = ResultCache.make_key("image", digest or content_hash(data))
+        img = self._cache.get(key)
+        if img is None:
+            img = ImageHandler(fp="", data=data, uint8=True).get_org_image()
+            self._cache.put(key, img)
+        report(progress, DECODE, 1.0, cancel)
+        return ImageHandler(fp="", array=img, uint8=True)
+
+    def _load_palette(
+        self,
+        data: bytes,
+        digest: str | None = None,
+        method: str = COLOR_METHOD,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
+        handler: ImageHandler | None = None,
+    ) -> "Palette":
+        """
+        画像データの主要色を返します。背景色の候補とカラーバーで同じ結果を使えるよう、
+        入力のハッシュ値と method をキーにキャッシュします。
+        handler (縮小して読み込んだ画像) を指定した場合、キャッシュがなければ元画像をデコードせずに
+        handler の画像から抽出します。元画像の主要色とわずかに異なることがあるため、キャッシュしません。
+        """
+        digest = digest or content_hash(data)
+        key = ResultCache.make_key("palette", digest, method)
+        cached = self._cache.get(key)
+        if cached is not None:
+            from src.colorpick import Palette
+
+            return Palette(*(np.array(values) for values in cached))
+        if handler is not None:
+            with instrument("palette", progress, method=method) as progress:
+                return handler.get_palette(method, self._color_workers, cancel, progress)
+
+        with instrument("palette", progress, method=method) as progress:
+            palette = self._load_handler(data, digest, cancel, progress).get_palette(
+                method, self._color_workers, cancel, progress
+            )
+        # ディスクにも保存できるよう、リストに変換してキャッシュする
+        self._cache.put(
+            key,
+            [palette.centers.tolist(), palette.order.tolist(), palette.weights.tolist()],
+        )
+        return palette
+
+    def getBlobServer(self, origin: str = "") -> dict:
+        """
+        画像をバイト列のまま受け渡すための Blob サーバーの URL とトークンを返します。
+        サーバーは最初の呼び出し時に起動し、その時の origin (WebView のページの
+        window.location.origin) にだけ CORS を許可します。
+        他のページからは js_api を呼び出せないため、トークンを知るのは WebView のページだけです。
+
+        Args:
+            origin (str, optional): CORS を許可するページのオリジン。
+
+        Returns:
+            dict: url (Blob サーバーのベース URL。例: "http://127.0.0.1:54321") と
+                  token (リクエストの X-Blob-Token ヘッダーに付けるトークン) を含む辞書。
+                  POST {url}/blobs で画像をアップロードし、GET {url}/blobs/<id> で取得します。
+        """
+        if self._blob_server is None:
+            self._blob_server = start_blob_server(self._blob_store, self._blob_token, origin)
+        host, port = self._blob_server.server_address[:2]
+        return {"url": f"http://{host}:{port}", "token": self._blob_token}
+
+    def releaseBlob(self, blob_id: str) -> None:
+        """
+        不要になった Blob を削除します。
+        """
+        self._blob_store.delete(blob_id)
+
+    def getFrameLayout(
+        self,
+        width: int,
+        height: int,
+        golden: bool | str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+    ) -> dict:
+        """
+        画像の大きさとオプションから、フレーム画像の配置を返します。
+        画素を扱わないため、プレビューの更新のたびに呼び出しても負荷はほとんどありません。
+
+        Args:
+            width (int): 元画像の幅。
+            height (int): 元画像の高さ。
+            golden (bool | str): 比率フレームを適用するか、比率モード。
+            rounded (bool): 角丸フレームを適用するかどうか。
+            maincolor (bool): メインカラーバーを追加するかどうか。
+            radius (int, optional): 角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+
+        Returns:
+            dict: 出力の辺の長さ "side"、元画像の矩形 "image"、角丸の半径 "radius"、
+                  カラーバーの矩形 "color_bar" と各色の矩形 "swatches"。矩形は [x, y, 幅, 高さ]。
+
+        Raises:
+            ValueError: 比率モードが不正な場合。
+        """
+        use_ratio, frame_ratio = resolve_frame_ratio(golden)
+        return compute_frame_layout(
+            int(width),
+            int(height),
+            use_ratio,
+            golden_ratio=frame_ratio,
+            rounded=rounded,
+            radius=radius,
+            maincolor=maincolor,
+            side_margin_ratio=SIDE_MARGIN_RATIO,
+        ).to_dict()
 
     def runFrameMaker(
         self,
@@ -187,7 +403,8 @@ class API:
         black: bool,
         rounded: bool,
         maincolor: bool,
-    ) -> None:
+        strip_height: int | None = None,
+    ) -> bool:
         """
         指定されたファイルパスの画像にフレーム処理を適用し、結果を保存します。
 
@@ -198,27 +415,26 @@ class API:
             black (bool): 黒いフレームを適用するかどうか。
             rounded (bool): 角丸フレームを適用するかどうか。
             maincolor (bool): メインカラーバーを追加するかどうか。
+            strip_height (int, optional): 指定した場合、出力全体を確保せずに
+                                          この行数ずつ PNG として書き出します。
+
+        入力と出力には .npy ファイルも指定できます。.npy の入力はメモリマップで読み込み、
+        .npy の出力はエンコードせずに uint8 配列のまま書き込みます。
+
+        Returns:
+            bool: 保存に成功した場合は True。
         """
-        try:
-            handler = ImageHandler(fp=inputpath.replace("blob:", ""))
-            use_ratio, frame_ratio = resolve_frame_ratio(golden)
-            bgcolor = "#000000" if black else "#FFFFFF"
-            fm = FrameMaker(
-                handler,
-                use_ratio,
-                bgcolor,
-                rounded,
-                maincolor,
-                golden_ratio=frame_ratio,
-                side_margin_ratio=SIDE_MARGIN_RATIO,
-            )
-            result = fm.run()
-        except ReadError:
-            print("Read Error: File doesn't exist (unsupported japanese characters)")
-        except ValueError as exc:
-            print(exc)
-        else:
-            handler.save_image(outputpath, result)
+        return render_file(
+            inputpath,
+            outputpath,
+            golden,
+            black,
+            rounded,
+            maincolor,
+            strip_height=strip_height,
+            color_workers=self._color_workers,
+            profile=self._encode_profile,
+        )
 
     def runFrameMakerFromWebview(
         self,
@@ -244,20 +460,14 @@ class API:
             str: Base64 エンコードされた処理済み画像データ。
         """
         try:
-            webimg = base64_string_to_pillow_image(inputdata)
-            handler = ImageHandler(fp="", webimg=webimg)
-            use_ratio, frame_ratio = resolve_frame_ratio(golden)
-            fm = FrameMaker(
-                handler,
-                use_ratio,
+            result = self.runFrameMakerFromBytes(
+                base64_string_to_bytes(inputdata),
+                golden,
                 bgcolor,
                 rounded,
                 maincolor,
                 radius=radius,
-                golden_ratio=frame_ratio,
-                side_margin_ratio=SIDE_MARGIN_RATIO,
             )
-            result = fm.run()
         except ReadError:
             print("Read Error: File doesn't exist (unsupported japanese characters)")
             return ""
@@ -265,12 +475,227 @@ class API:
             print(exc)
             return ""
         else:
-            result = cv2.cvtColor(result.astype(np.uint8), cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(result)
-            data_url = "data:image/jpeg;base64," + pillow_image_to_base64_string(
-                pil_image
+            return "data:image/jpeg;base64," + base64.b64encode(result).decode("utf-8")
+
+    def runFrameMakerFromBytes(
+        self,
+        data: bytes,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+        ext: str = ".jpg",
+        profile: str | None = None,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> bytes:
+        """
+        エンコードされた画像のバイト列にフレーム処理を適用し、エンコードした結果を返します。
+        Base64 を経由しないため、常駐サービスなどバイナリを直接扱う呼び出し元で使用します。
+        結果は入力のハッシュ値と正規化したオプションをキーにキャッシュし、
+        同じ画像とオプションの組み合わせでは再計算しません。
+
+        Args:
+            data (bytes): エンコードされた入力画像データ (JPEG や PNG など)。
+            golden (bool | str): 比率フレームを適用するか、比率モード。
+            bgcolor (str): フレームの背景色。
+            rounded (bool): 角丸フレームを適用するかどうか。
+            maincolor (bool): メインカラーバーを追加するかどうか。
+            radius (int, optional): 角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+            ext (str, optional): 出力形式の拡張子。デフォルトは ".jpg"。
+            profile (str, optional): エンコードプロファイル。デフォルトは API の encode_profile。
+            cancel (threading.Event, optional): セットされると、次の区切りで処理を打ち切ります。
+            progress (ProgressCallback, optional): 各ステージ ("decode"、"palette"、"pad"、"mask"、
+                                                   "bar"、"encode") の進捗を受け取る関数。
+                                                   キャッシュ済みの結果を返す場合は通知しません。
+
+        Returns:
+            bytes: エンコードされた処理済み画像データ。
+
+        Raises:
+            ReadError: 画像のデコードに失敗した場合。
+            ValueError: オプションが不正な場合、またはエンコードに失敗した場合。
+            CancelError: cancel がセットされた場合、または progress が送出した場合。
+        """
+        digest = content_hash(data)
+        profile = profile or self._encode_profile
+        use_ratio, frame_ratio = resolve_frame_ratio(golden)
+        key = ResultCache.make_key(
+            "frame",
+            digest,
+            use_ratio,
+            frame_ratio,
+            bgcolor.upper(),
+            bool(rounded),
+            int(radius) if rounded else 0,
+            bool(maincolor),
+            ext.lower(),
+            profile,
+        )
+        result = self._cache.get(key)
+        if result is None:
+            with instrument("frame", progress, ext=ext, profile=profile) as progress:
+                handler = self._load_handler(data, digest, cancel, progress)
+                fm = self._create_frame_maker(
+                    handler,
+                    data,
+                    digest,
+                    golden,
+                    bgcolor,
+                    rounded,
+                    maincolor,
+                    radius,
+                    cancel,
+                    progress,
+                )
+                frame = fm.run()
+                report(progress, ENCODE, 0.0, cancel)
+                result = handler.encode_image(frame, ext, profile)
+                report(progress, ENCODE, 1.0)
+            self._cache.put(key, result)
+        return result
+
+    def previewFrameMakerFromBytes(
+        self,
+        data: bytes,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+        max_side: int = PREVIEW_MAX_SIDE,
+    ) -> bytes:
+        """
+        プレビュー用に、出力の辺の長さが max_side 程度になる縮小画像でフレーム処理を行い、
+        JPEG にエンコードした結果を返します。JPEG は縮小したままデコードするため、
+        元画像の解像度が高くても処理時間はほとんど増えません。角丸の半径は縮小率に合わせて縮小するため、
+        保存する画像を縮小したものとほぼ同じ見た目になります。カラーバーには、主要色を取得済みであれば
+        元画像の主要色を使い、未取得の場合は元画像をデコードせず縮小画像から抽出します。
+
+        Args:
+            data (bytes): エンコードされた入力画像データ (JPEG や PNG など)。
+            golden (bool | str): 比率フレームを適用するか、比率モード。
+            bgcolor (str): フレームの背景色。
+            rounded (bool): 角丸フレームを適用するかどうか。
+            maincolor (bool): メインカラーバーを追加するかどうか。
+            radius (int, optional): 元画像に対する角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+            max_side (int, optional): プレビューの辺の長さの目安。デフォルトは constants.PREVIEW_MAX_SIDE。
+
+        Returns:
+            bytes: JPEG にエンコードされたプレビュー画像。
+
+        Raises:
+            ReadError: 画像のデコードに失敗した場合。
+            ValueError: オプションが不正な場合、またはエンコードに失敗した場合。
+        """
+        digest = content_hash(data)
+        use_ratio, frame_ratio = resolve_frame_ratio(golden)
+        key = ResultCache.make_key(
+            "preview",
+            digest,
+            int(max_side),
+            use_ratio,
+            frame_ratio,
+            bgcolor.upper(),
+            bool(rounded),
+            int(radius) if rounded else 0,
+            bool(maincolor),
+        )
+        result = self._cache.get(key)
+        if result is None:
+            # 出力の辺の長さは元画像の長辺の frame_ratio 倍になるため、その分小さく読み込む
+            source_max_side = max(1, int(max_side / frame_ratio)) if use_ratio else max_side
+            with instrument("preview", max_side=int(max_side)) as progress:
+                report(progress, DECODE, 0.0)
+                handler = ImageHandler(
+                    fp="", data=data, uint8=True, max_side=source_max_side
+                )
+                report(progress, DECODE, 1.0)
+                fm = self._create_frame_maker(
+                    handler,
+                    data,
+                    digest,
+                    golden,
+                    bgcolor,
+                    rounded,
+                    maincolor,
+                    radius,
+                    progress=progress,
+                    reduced=True,
+                )
+                frame = fm.run()
+                report(progress, ENCODE, 0.0)
+                result = handler.encode_image(frame, ".jpg", PREVIEW_ENCODE_PROFILE)
+                report(progress, ENCODE, 1.0)
+            self._cache.put(key, result)
+        return result
+
+    def previewFrameMakerFromBlob(
+        self,
+        blob_id: str,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+        max_side: int = PREVIEW_MAX_SIDE,
+    ) -> str:
+        """
+        Blob サーバーにアップロードされた画像のプレビューを作成し、結果を Blob として保存します。
+        保存には saveFrameMakerFromBlob を使い、元の解像度で処理します。
+
+        Returns:
+            str: プレビュー画像 (JPEG) の Blob ID。失敗した場合は空文字列。
+        """
+        try:
+            result = self.previewFrameMakerFromBytes(
+                self._blob_data(blob_id),
+                golden,
+                bgcolor,
+                rounded,
+                maincolor,
+                radius=radius,
+                max_side=max_side,
+            )
+        except (ReadError, ValueError) as exc:
+            print(exc)
+            return ""
+        return self._blob_store.put(result, "image/jpeg")
+
+    def runFrameMakerFromBlob(
+        self,
+        blob_id: str,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+    ) -> str:
+        """
+        Blob サーバーにアップロードされた画像にフレーム処理を適用し、結果を Blob として保存します。
+        runFrameMakerFromWebview と異なり、Base64 へのエンコードとデコードを行いません。
+
+        Args:
+            blob_id (str): アップロードされた入力画像の ID。
+            golden (bool | str): 比率フレームを適用するか、比率モード。
+            bgcolor (str): フレームの背景色。
+            rounded (bool): 角丸フレームを適用するかどうか。
+            maincolor (bool): メインカラーバーを追加するかどうか。
+            radius (int, optional): 角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+
+        Returns:
+            str: 処理済み画像 (JPEG) の Blob ID。失敗した場合は空文字列。
+        """
+        try:
+            data, _ = self._blob_store.get(blob_id)
+            result = self.runFrameMakerFromBytes(
+                data, golden, bgcolor, rounded, maincolor, radius=radius
             )
-            return data_url
+        except (KeyError, ReadError, ValueError) as exc:
+            print(exc)
+            return ""
+        return self._blob_store.put(result, "image/jpeg")
 
     def saveImage(self, inputdata: str) -> None:
         """
@@ -279,12 +704,13 @@ class API:
         Args:
             inputdata (str): Base64 エンコードされた画像データ。
         """
-        webimg = base64_string_to_pillow_image(inputdata)
+        handler = ImageHandler(fp="", data=base64_string_to_bytes(inputdata), uint8=True)
         # Use pathlib for cross-platform path handling
         downloads_path = Path.home() / "Downloads"
         downloads_path.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
         save_path = get_save_path("output.jpg", str(downloads_path))
-        webimg.save(save_path, "JPEG", quality=95)
+        # 他の保存処理と同じエンコードプロファイルで保存する
+        handler.save_image(save_path, handler.img, self._encode_profile)
 
     def saveFrameMakerFromWebview(
         self,
@@ -303,7 +729,7 @@ class API:
             if not save_path:
                 return "cancelled"
             return self._save_frame_maker_to_path(
-                inputdata,
+                base64_string_to_bytes(inputdata),
                 golden,
                 bgcolor,
                 rounded,
@@ -315,25 +741,219 @@ class API:
             print(exc)
             return ""
 
+    def saveFrameMakerFromBlob(
+        self,
+        blob_id: str,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+    ) -> str:
+        """
+        Blob サーバーにアップロードされた画像にフレーム処理を適用し、選択先に保存します。
+        """
+        try:
+            save_path = self._choose_save_path()
+            if not save_path:
+                return "cancelled"
+            return self._save_frame_maker_to_path(
+                self._blob_data(blob_id),
+                golden,
+                bgcolor,
+                rounded,
+                maincolor,
+                save_path,
+                radius=radius,
+            )
+        except (ReadError, ValueError) as exc:
+            print(exc)
+            return ""
+
+    def submitFrameJob(
+        self,
+        blob_id: str,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int = DEFAULT_RADIUS,
+        save: bool = False,
+    ) -> str:
+        """
+        Blob サーバーにアップロードされた画像のフレーム処理をバックグラウンドで開始し、
+        すぐにジョブ ID を返します。処理中も WebView の呼び出しが待たされません。
+        進捗は pollJob で確認でき、終了時には window.onFrameJobFinished(job) が呼び出されます
+        (job は pollJob と同じ形式)。
+
+        Args:
+            blob_id (str): アップロードされた入力画像の ID。
+            golden (bool | str): 比率フレームを適用するか、比率モード。
+            bgcolor (str): フレームの背景色。
+            rounded (bool): 角丸フレームを適用するかどうか。
+            maincolor (bool): メインカラーバーを追加するかどうか。
+            radius (int, optional): 角丸の半径。デフォルトは constants.DEFAULT_RADIUS。
+            save (bool, optional): True の場合は saveFrameMakerFromBlob と同様に選択先に保存し、
+                                   保存先のパス (キャンセル時は "cancelled") を結果にします。
+                                   False の場合は処理済み画像 (JPEG) の Blob ID を結果にします。
+
+        Returns:
+            str: ジョブ ID。
+        """
+        return self._jobs.submit(
+            self._frame_job, blob_id, golden, bgcolor, rounded, maincolor, radius, save
+        )
+
+    def _frame_job(
+        self,
+        blob_id: str,
+        golden: bool | str,
+        bgcolor: str,
+        rounded: bool,
+        maincolor: bool,
+        radius: int,
+        save: bool,
+        cancel: threading.Event | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> str:
+        data = self._blob_data(blob_id)
+        if save:
+            save_path = self._choose_save_path()
+            if not save_path:
+                return "cancelled"
+            return self._save_frame_maker_to_path(
+                data,
+                golden,
+                bgcolor,
+                rounded,
+                maincolor,
+                save_path,
+                radius=radius,
+                cancel=cancel,
+                progress=progress,
+            )
+        result = self.runFrameMakerFromBytes(
+            data,
+            golden,
+            bgcolor,
+            rounded,
+            maincolor,
+            radius=radius,
+            cancel=cancel,
+            progress=progress,
+        )
+        return self._blob_store.put(result, "image/jpeg")
+
+    def pollJob(self, job_id: str) -> dict:
+        """
+        submitFrameJob で開始したジョブの状態を返します。
+
+        Returns:
+            dict: id, status ("pending"、"running"、"done"、"failed"、"cancelled"、"missing")、
+                  result (done の場合の処理結果)、error (failed の場合のメッセージ)、
+                  stage と fraction (処理中のステージとその進捗) を含む辞書。
+        """
+        return self._jobs.poll(job_id)
+
+    def cancelJob(self, job_id: str) -> bool:
+        """
+        ジョブのキャンセルを要求します。実行中のジョブは、フレーム処理や主要色の抽出の
+        次の区切りで打ち切られます。
+
+        Returns:
+            bool: キャンセルを要求できた場合は True。ジョブが存在しないか終了済みの場合は False。
+        """
+        return self._jobs.cancel(job_id)
+
+    def _notify_job(self, job: dict) -> None:
+        """
+        ジョブの終了を WebView に通知します。ウィンドウがない場合は何もしません。
+        """
+        if self._window is None:
+            return
+        script = (
+            f"window.{JOB_FINISHED_CALLBACK} && "
+            f"window.{JOB_FINISHED_CALLBACK}({json.dumps(job)})"
+        )
+        try:
+            self._window.evaluate_js(script)
+        except Exception as exc:
+            # ウィンドウを閉じた後の通知は失敗するが、結果は pollJob で取得できる
+            print(exc)
+
+    def shutdown(self) -> None:
+        """
+        実行中のジョブのキャンセルを要求して終了を待ち、Blob サーバーを停止します。
+        """
+        self._jobs.shutdown()
+        if self._blob_server is not None:
+            self._blob_server.shutdown()
+            self._blob_server.server_close()
+            self._blob_server = None
+
     def getMainColorRGBValue(
         self,
         inputdata: str,
+        method: str = COLOR_METHOD,
     ) -> list[str]:
         """
         Base64 エンコードされた画像データから主要な色の RGB 値を取得します。
 
         Args:
             inputdata (str): Base64 エンコードされた入力画像データ。
+            method (str, optional): 色抽出のバックエンド。デフォルトは constants.COLOR_METHOD。
         Returns:
             list[str]: 主要な色の RGB 値のリスト (例: ["RRGGBB", ...])。
         """
         try:
-            webimg = base64_string_to_pillow_image(inputdata)
-            handler = ImageHandler(fp="", webimg=webimg)
-            # FrameMakerのインスタンスは不要。直接colorpickの関数を呼び出す
-            result = getMainColorRGBValue(handler.org_img)
-            return result
+            return self.getMainColorRGBValueFromBytes(
+                base64_string_to_bytes(inputdata), method
+            )
         except ReadError:
             # Consider logging this error instead of printing
             print("Read Error: File doesn't exist (unsupported japanese characters)")
             return ""
+        except ValueError as exc:
+            print(exc)
+            return ""
+
+    def getMainColorRGBValueFromBlob(
+        self,
+        blob_id: str,
+        method: str = COLOR_METHOD,
+    ) -> list[str]:
+        """
+        Blob サーバーにアップロードされた画像から主要な色の RGB 値を取得します。
+
+        Args:
+            blob_id (str): アップロードされた入力画像の ID。
+            method (str, optional): 色抽出のバックエンド。デフォルトは constants.COLOR_METHOD。
+        Returns:
+            list[str]: 主要な色の RGB 値のリスト (例: ["RRGGBB", ...])。
+        """
+        try:
+            return self.getMainColorRGBValueFromBytes(self._blob_data(blob_id), method)
+        except (ReadError, ValueError) as exc:
+            print(exc)
+            return ""
+
+    def getMainColorRGBValueFromBytes(
+        self,
+        data: bytes,
+        method: str = COLOR_METHOD,
+    ) -> list[str]:
+        """
+        エンコードされた画像のバイト列から主要な色の RGB 値を取得します。
+        結果は入力のハッシュ値と method をキーにキャッシュし、カラーバーの描画でも同じ主要色を使います。
+
+        Args:
+            data (bytes): エンコードされた入力画像データ (JPEG や PNG など)。
+            method (str, optional): 色抽出のバックエンド。デフォルトは constants.COLOR_METHOD。
+        Returns:
+            list[str]: 主要な色の RGB 値のリスト (例: ["RRGGBB", ...])。カラーバーと同じ順に並びます。
+
+        Raises:
+            ReadError: 画像のデコードに失敗した場合。
+            ValueError: method が不正な場合。
+        """
+        return self._load_palette(data, method=method).hex_values()
@@ -0,0 +1,240 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.constants import ENCODE_PROFILE
+
+_GLOB_MAGIC = ("*", "?", "[")
+# ImageHandler で読み込める拡張子 (cv2.imread で読める画像と、メモリマップで開く .npy)
+_IMAGE_EXTENSIONS = (
+    ".jpg",
+    ".jpeg",
+    ".jpe",
+    ".png",
+    ".webp",
+    ".bmp",
+    ".tif",
+    ".tiff",
+    ".npy",
+)
+
+# ワーカープロセスで読み込んだ render_file と、主要色の抽出に使うスレッド数
+_worker_render = None
+_worker_color_workers = None
+
+
+@dataclass
+class BatchSummary:
+    """
+    バッチ処理の結果を集計するクラス。
+    """
+
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    input_bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def images_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.input_bytes / 1e6 / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format(self) -> str:
+        return (
+            f"{self.processed} processed, {self.skipped} skipped, "
+            f"{self.failed} failed in {self.elapsed:.2f}s "
+            f"({self.images_per_second:.2f} images/s, "
+            f"{self.megabytes_per_second:.2f} MB/s)"
+        )
+
+
+def _glob_base(pattern: str) -> Path:
+    """
+    glob パターンのうち、ワイルドカードを含まない先頭のディレクトリ部分を返します。
+    """
+    base = []
+    for part in Path(pattern).parts:
+        if any(magic in part for magic in _GLOB_MAGIC):
+            break
+        base.append(part)
+    if len(base) == len(Path(pattern).parts):
+        # ワイルドカードを含まない場合はファイルの親ディレクトリを基準にする
+        base = base[:-1]
+    return Path(*base) if base else Path(".")
+
+
+def collect_jobs(pattern: str, out_dir: str) -> list[tuple[str, str]]:
+    """
+    glob パターンまたはディレクトリに一致する入力ファイルと出力先のペアを列挙します。
+    出力先はパターンの基準ディレクトリからの相対パスを out_dir 以下に保ちます。
+    ImageHandler で読み込めない拡張子のファイルと、out_dir 以下のファイル (入力ディレクトリの中に
+    出力先がある場合の以前の出力) は含めません。
+
+    Args:
+        pattern (str): 入力ファイルの glob パターン ("**" 対応) またはディレクトリ。
+        out_dir (str): 出力先ディレクトリ。
+
+    Returns:
+        list[tuple[str, str]]: (入力パス, 出力パス) のリスト。
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*")
+    base = _glob_base(pattern)
+    out_root = Path(out_dir).resolve()
+    jobs = []
+    for inputpath in sorted(glob.glob(pattern, recursive=True)):
+        if not os.path.isfile(inputpath):
+            continue
+        if not inputpath.lower().endswith(_IMAGE_EXTENSIONS):
+            continue
+        if Path(inputpath).resolve().is_relative_to(out_root):
+            continue
+        relative = os.path.relpath(inputpath, base)
+        jobs.append((inputpath, os.path.join(out_dir, relative)))
+    return jobs
+
+
+def is_up_to_date(inputpath: str, outputpath: str) -> bool:
+    """
+    出力ファイルが存在し、空ではなく、入力ファイル以降に更新されているかを判定します。
+    """
+    try:
+        output_stat = os.stat(outputpath)
+    except FileNotFoundError:
+        return False
+    return (
+        output_stat.st_size > 0 and output_stat.st_mtime >= os.stat(inputpath).st_mtime
+    )
+
+
+def _init_worker(color_workers: int | None = None) -> None:
+    """
+    ワーカープロセスの初期化処理。
+    重いモジュールを一度だけ読み込み、ファイルごとの起動コストをなくします。
+
+    Args:
+        color_workers (int, optional): 主要色の抽出に使用するスレッド数。
+                                       プロセスを並列に動かす場合は 1 にしてコアの奪い合いを避けます。
+    """
+    global _worker_render, _worker_color_workers
+    from src.render import render_file
+
+    _worker_render = render_file
+    _worker_color_workers = color_workers
+
+
+def process_file(
+    inputpath: str,
+    outputpath: str,
+    frame_mode,
+    black: bool,
+    rounded: bool,
+    maincolor: bool,
+    strip_height: int | None = None,
+    profile: str = ENCODE_PROFILE,
+) -> tuple[str, int, bool]:
+    """
+    1 枚の画像にフレーム処理を適用して保存します。
+
+    Returns:
+        tuple[str, int, bool]: (入力パス, 入力ファイルのバイト数, 成功したかどうか)。
+    """
+    if _worker_render is None:
+        _init_worker()
+    try:
+        Path(outputpath).parent.mkdir(parents=True, exist_ok=True)
+        ok = _worker_render(
+            inputpath,
+            outputpath,
+            frame_mode,
+            black,
+            rounded,
+            maincolor,
+            strip_height=strip_height,
+            color_workers=_worker_color_workers,
+            profile=profile,
+        )
+    except Exception as exc:
+        # 1 枚の失敗でバッチ全体を止めない
+        print(f"{inputpath}: {exc}")
+        ok = False
+    return inputpath, os.path.getsize(inputpath), bool(ok)
+
+
+def run_batch(
+    pattern: str,
+    out_dir: str,
+    frame_mode,
+    black: bool,
+    rounded: bool,
+    maincolor: bool,
+    jobs: int | None = None,
+    strip_height: int | None = None,
+    profile: str = ENCODE_PROFILE,
+) -> BatchSummary:
+    """
+    パターンに一致する画像をワーカープールで一括処理します。
+    出力が最新のファイルはスキップします。
+
+    Args:
+        pattern (str): 入力ファイルの glob パターンまたはディレクトリ。
+        out_dir (str): 出力先ディレクトリ。
+        frame_mode: resolve_frame_ratio に渡す比率モード。
+        black (bool): 黒いフレームを適用するかどうか。
+        rounded (bool): 角丸フレームを適用するかどうか。
+        maincolor (bool): メインカラーバーを追加するかどうか。
+        jobs (int, optional): ワーカープロセス数。デフォルトは CPU コア数。
+        strip_height (int, optional): 指定した場合、各出力をこの行数ずつ PNG として書き出します。
+                                      出力ファイルの拡張子は .png になります。
+        profile (str, optional): エンコードプロファイル。デフォルトは constants.ENCODE_PROFILE。
+
+    Returns:
+        BatchSummary: 処理結果の集計。
+    """
+    summary = BatchSummary()
+    start = time.perf_counter()
+
+    pending = []
+    for inputpath, outputpath in collect_jobs(pattern, out_dir):
+        if strip_height:
+            outputpath = str(Path(outputpath).with_suffix(".png"))
+        if is_up_to_date(inputpath, outputpath):
+            summary.skipped += 1
+        else:
+            pending.append((inputpath, outputpath))
+
+    options = (frame_mode, black, rounded, maincolor, strip_height, profile)
+    jobs = jobs or os.cpu_count() or 1
+
+    def collect(result: tuple[str, int, bool]) -> None:
+        inputpath, size, ok = result
+        if ok:
+            summary.processed += 1
+            summary.input_bytes += size
+        else:
+            summary.failed += 1
+            print(f"Failed: {inputpath}")
+
+    if jobs == 1 or len(pending) <= 1:
+        for inputpath, outputpath in pending:
+            collect(process_file(inputpath, outputpath, *options))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(1,)
+        ) as pool:
+            futures = [
+                pool.submit(process_file, inputpath, outputpath, *options)
+                for inputpath, outputpath in pending
+            ]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    summary.elapsed = time.perf_counter() - start
+    return summary
@@ -1,31 +1,209 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 import cv2
 import numpy as np
+from threadpoolctl import threadpool_limits
+
+from src.constants import (
+    BRIGHTNESS_THRESHOLD,
+    COLOR_METHOD,
+    COLOR_METHODS,
+    HISTOGRAM_BITS,
+    KMEANS_CLUSTERS,
+    KMEANS_N_INIT,
+    MINIBATCH_SAMPLE_SIZE,
+    SATURATION_THRESHOLD,
+)
+from src.progress import PALETTE, ProgressCallback, report
+
+
+@dataclass(frozen=True)
+class Palette:
+    """
+    画像から抽出した主要色。1 枚の画像につき 1 回だけ計算し、
+    背景色の候補とカラーバーの両方で使い回します。
+    """
 
-from src.constants import BRIGHTNESS_THRESHOLD, KMEANS_CLUSTERS, SATURATION_THRESHOLD
+    # 主要色 (KMEANS_CLUSTERS x 3 の int 配列、画像と同じ BGR 順、クラスタの順)
+    centers: np.ndarray
+    # カラーバーに並べる順 (色相順) の centers のインデックス
+    order: np.ndarray
+    # 各主要色に割り当てられた画素の割合
+    weights: np.ndarray
 
-os.environ.setdefault("LOKY_MAX_CPU_COUNT", "1")
+    @property
+    def bar_colors(self) -> np.ndarray:
+        """
+        カラーバーに並べる順の主要色 (BGR 順) を返します。
+        """
+        return self.centers[self.order]
+
+    def hex_values(self) -> list[str]:
+        """
+        カラーバーに並べる順の主要色を "RRGGBB" 形式の文字列で返します。
+        """
+        return [f"{r:02x}{g:02x}{b:02x}" for b, g, r in self.bar_colors.tolist()]
 
 
 def _create_kmeans(n_clusters: int):
     from sklearn.cluster import KMeans
 
-    return KMeans(n_clusters=n_clusters, random_state=0, n_init=10)
+    return KMeans(n_clusters=n_clusters, random_state=0, n_init=KMEANS_N_INIT)
 
 
-def _get_cluster_centers(filtered_pixels: np.ndarray) -> np.ndarray:
-    if filtered_pixels.size == 0:
-        filtered_pixels = np.zeros((1, 3))
+def _create_minibatch_kmeans(n_clusters: int):
+    from sklearn.cluster import MiniBatchKMeans
+
+    return MiniBatchKMeans(
+        n_clusters=n_clusters, random_state=0, n_init=3, batch_size=4096
+    )
+
+
+def _resolve_workers(workers: int | None) -> int:
+    """
+    色抽出に使うスレッド数を返します。None の場合は CPU コア数を使います。
+    """
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def _fit_kmeans(
+    pixels: np.ndarray,
+    n_clusters: int,
+    workers: int,
+    sample_weight: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    KMeans (random_state=0, n_init=KMEANS_N_INIT) のクラスタ中心を求めます。
+    workers が 2 以上の場合は、同じ乱数列で初期値を順に作ってから各試行を並列に実行し、
+    慣性が最小の結果を選びます。結果は workers (2 以上) の値によらず同じですが、
+    sklearn の KMeans はデータの中心化や同じ慣性の試行の選び方が異なるため、
+    workers == 1 の結果とは同等の品質であってもビット単位で一致するとは限りません。
+    スレッド数の制限はプロセス全体の環境変数ではなく、この呼び出しの間だけ適用します。
+    """
+    if workers == 1:
+        with threadpool_limits(limits=1, user_api="openmp"):
+            cluster = _create_kmeans(n_clusters)
+            cluster.fit(pixels, sample_weight=sample_weight)
+        return cluster.cluster_centers_
+
+    from sklearn.cluster import KMeans, kmeans_plusplus
+
+    random_state = np.random.RandomState(0)
+    inits = [
+        kmeans_plusplus(
+            pixels, n_clusters, sample_weight=sample_weight, random_state=random_state
+        )[0]
+        for _ in range(KMEANS_N_INIT)
+    ]
+    # 試行の数より多いコアは各試行の OpenMP スレッドに割り当てる
+    threads_per_init = max(1, workers // KMEANS_N_INIT)
+
+    def fit(init: np.ndarray):
+        with threadpool_limits(limits=threads_per_init, user_api="openmp"):
+            return KMeans(n_clusters=n_clusters, init=init, n_init=1).fit(
+                pixels, sample_weight=sample_weight
+            )
+
+    with ThreadPoolExecutor(max_workers=min(workers, KMEANS_N_INIT)) as pool:
+        fits = list(pool.map(fit, inits))
+    return min(fits, key=lambda cluster: cluster.inertia_).cluster_centers_
+
+
+def _histogram_bins(filtered_pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ピクセルを各チャンネル HISTOGRAM_BITS ビットに量子化した 3 次元ヒストグラムを作成します。
+
+    Args:
+        filtered_pixels (np.ndarray): 0-1 の範囲のピクセルデータ (N x 3)。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (各ビンの平均色, 各ビンの画素数)。空のビンは含みません。
+    """
+    index = _pack_colors(filtered_pixels, HISTOGRAM_BITS)
+    bin_count = 1 << (3 * HISTOGRAM_BITS)
+    counts = np.bincount(index, minlength=bin_count)
+    occupied = np.flatnonzero(counts)
+    means = np.stack(
+        [
+            np.bincount(index, weights=filtered_pixels[:, c], minlength=bin_count)[occupied]
+            for c in range(3)
+        ],
+        axis=1,
+    ) / counts[occupied, np.newaxis]
+    return means, counts[occupied]
+
+
+def _fit_centers(
+    filtered_pixels: np.ndarray,
+    method: str,
+    workers: int,
+    unique_count: int | None = None,
+) -> np.ndarray:
+    """
+    指定されたバックエンドでクラスタ中心 (0-1 の範囲) を求めます。
+
+    Args:
+        filtered_pixels (np.ndarray): 0-1 の範囲のピクセルデータ (N x 3)。
+        method (str): "kmeans" / "histogram" / "minibatch" のいずれか。
+        workers (int): 使用するスレッド数。
+        unique_count (int, optional): filtered_pixels の色の種類の数。
+                                      計算済みの場合に指定すると、数え直しを省きます。
+
+    Returns:
+        np.ndarray: クラスタ中心 (最大 KMEANS_CLUSTERS 個)。
+    """
+    if method == "histogram":
+        # 量子化ヒストグラムのビンを画素数で重み付けして KMeans にかける
+        bins, weights = _histogram_bins(filtered_pixels)
+        return _fit_kmeans(
+            bins, min(KMEANS_CLUSTERS, len(bins)), workers, sample_weight=weights
+        )
 
-    unique_pixel_count = len(np.unique(filtered_pixels, axis=0))
-    cluster_count = min(KMEANS_CLUSTERS, unique_pixel_count)
+    if method == "minibatch":
+        # 決定的なサブサンプルに対して MiniBatchKMeans を実行する
+        if len(filtered_pixels) > MINIBATCH_SAMPLE_SIZE:
+            rng = np.random.default_rng(0)
+            sample = rng.choice(len(filtered_pixels), MINIBATCH_SAMPLE_SIZE, replace=False)
+            filtered_pixels = filtered_pixels[np.sort(sample)]
+        unique_pixel_count = _count_distinct_colors(filtered_pixels, KMEANS_CLUSTERS)
+        cluster = _create_minibatch_kmeans(min(KMEANS_CLUSTERS, unique_pixel_count))
+        with threadpool_limits(limits=workers, user_api="openmp"):
+            labels = cluster.fit_predict(filtered_pixels)
+        # ミニバッチの移動平均による誤差を除くため、割り当てられた画素の平均で中心を更新する
+        centers = cluster.cluster_centers_.copy()
+        for k in np.unique(labels):
+            centers[k] = filtered_pixels[labels == k].mean(axis=0)
+        return centers
+
+    if unique_count is None:
+        unique_count = _count_distinct_colors(filtered_pixels, KMEANS_CLUSTERS)
+    cluster_count = min(KMEANS_CLUSTERS, unique_count)
+
+    return _fit_kmeans(filtered_pixels, cluster_count, workers)
+
+
+def _get_cluster_centers(
+    filtered_pixels: np.ndarray,
+    method: str = COLOR_METHOD,
+    workers: int | None = None,
+    unique_count: int | None = None,
+) -> np.ndarray:
+    if method not in COLOR_METHODS:
+        raise ValueError(f"Unsupported color method: {method}")
 
-    cluster = _create_kmeans(cluster_count)
-    cluster.fit(filtered_pixels)
+    if filtered_pixels.size == 0:
+        filtered_pixels = np.zeros((1, 3))
+        unique_count = 1
 
-    cluster_centers_arr = cluster.cluster_centers_ * 255
+    workers = _resolve_workers(workers)
+    cluster_centers_arr = (
+        _fit_centers(filtered_pixels, method, workers, unique_count) * 255
+    )
     cluster_centers_arr = cluster_centers_arr.astype("int")
+    cluster_count = len(cluster_centers_arr)
 
     if cluster_count < KMEANS_CLUSTERS:
         padding = np.repeat(
@@ -38,81 +216,324 @@ def _get_cluster_centers(filtered_pixels: np.ndarray) -> np.ndarray:
     return cluster_centers_arr
 
 
-def _get_filtered_pixels(img: np.ndarray) -> np.ndarray:
+# 彩度・明度の 8 ビットの値 (0-255)
+_LEVELS = np.arange(256)
+# 24 ビットの色の種類の数と、色を数えるときに 1 回に走査するピクセル数 (最初の値と上限)
+_COLOR_SPACE = 1 << 24
+_COUNT_BLOCK = 1 << 10
+_COUNT_BLOCK_MAX = 1 << 16
+
+
+def _threshold_level(max_level: int, threshold: float) -> int:
     """
-    画像から彩度と明度に基づいてフィルタリングされたピクセルを取得します。
+    画像の最大値で正規化した値が threshold を超える、最小の 8 ビットの値を返します。
+    従来の (値 / 255) / (最大値 / 255) > threshold と同じ浮動小数点の式を 256 通りの値で評価するため、
+    境界の判定も一致します。該当する値がない場合は 256 を返します。
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        passed = np.flatnonzero(_LEVELS / 255 / (max_level / 255) > threshold)
+    return int(passed[0]) if len(passed) else 256
+
+
+def _pack_colors(pixels: np.ndarray, bits: int = 8) -> np.ndarray:
+    """
+    ピクセルの 3 チャンネルを、各チャンネル bits ビットに量子化して 1 つの整数にまとめます。
 
     Args:
-        img (np.ndarray): 処理する画像データ (NumPy 配列)。
+        pixels (np.ndarray): 0-1 の範囲のピクセルデータ、または uint8 のピクセルデータ (N x 3)。
+        bits (int, optional): 各チャンネルのビット数 (1-8)。デフォルトは 8 (24 ビットの色)。
 
     Returns:
-        np.ndarray: フィルタリングされたピクセルデータ。
+        np.ndarray: 各ピクセルの整数値 (uint32、N)。1 チャンネル目が上位のビットになります。
     """
-    cv2_img = img.reshape((img.shape[0] * img.shape[1], 3))
+    if pixels.dtype == np.uint8:
+        levels = pixels.astype(np.uint32)
+    else:
+        levels = np.rint(pixels * 255).astype(np.uint32)
+    levels >>= 8 - bits
+    return (levels[:, 0] << (2 * bits)) | (levels[:, 1] << bits) | levels[:, 2]
+
 
-    img_8bit = (img * 255).astype(np.uint8)
-    hsv_image = cv2.cvtColor(img_8bit, cv2.COLOR_BGR2HSV).reshape(
-        (img.shape[0] * img.shape[1], 3)
+def _count_distinct_colors(pixels: np.ndarray, stop_at: int | None = None) -> int:
+    """
+    ピクセルの色 (24 ビット) の種類の数を数えます。
+    2^24 個の真偽値の表に出現した色を記録しながら少しずつピクセルを走査し、
+    stop_at 種類に達した時点で打ち切ります。主要色の数を決めるだけなら、
+    通常の写真は最初のブロックで打ち切られます。重複を除いた色の表がない場合
+    (minibatch のサブサンプルや、unique_count を渡さない _fit_centers の呼び出し) に使います。
+
+    Args:
+        pixels (np.ndarray): 0-1 の範囲のピクセルデータ、または uint8 のピクセルデータ (N x 3)。
+        stop_at (int, optional): この数に達したら数えるのをやめます。デフォルトは最後まで数えます。
+
+    Returns:
+        int: 色の種類の数。stop_at を指定した場合は stop_at 以上で打ち切った値になることがあります。
+    """
+    seen = np.zeros(_COLOR_SPACE, dtype=bool)
+    distinct = 0
+    start, block = 0, _COUNT_BLOCK
+    while start < len(pixels):
+        keys = _pack_colors(pixels[start : start + block])
+        fresh = np.unique(keys[~seen[keys]])
+        seen[fresh] = True
+        distinct += len(fresh)
+        if stop_at is not None and distinct >= stop_at:
+            break
+        # 打ち切れなかった場合は、走査するピクセル数を増やしてループの回数を抑える
+        start += block
+        block = min(block * 2, _COUNT_BLOCK_MAX)
+    return distinct
+
+
+def _weighted_unique(filtered_pixels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    ピクセルを 24 ビットの整数にまとめ、重複を除いた色とその画素数 (色のヒストグラム) を求めます。
+    行単位の np.unique(axis=0) と異なり、1 次元の整数の並べ替えだけで済みます
+    (解析用の画像の画素数では、2^24 個のビンに対する np.bincount より高速です)。
+
+    Args:
+        filtered_pixels (np.ndarray): 0-1 の範囲のピクセルデータ (N x 3)。
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (重複を除いた色 (0-1 の範囲、U x 3), 各色の画素数)。
+    """
+    unique_keys, counts = np.unique(_pack_colors(filtered_pixels), return_counts=True)
+    colors = np.stack(
+        [(unique_keys >> 16) & 0xFF, (unique_keys >> 8) & 0xFF, unique_keys & 0xFF],
+        axis=1,
     )
-    hsv_image = hsv_image / 255
-    saturation_pixel = hsv_image[:, 1] / hsv_image[:, 1].max()
-    brightness_pixel = hsv_image[:, 2] / hsv_image[:, 2].max()
+    return colors / 255.0, counts
+
+
+def _get_filtered_pixels(
+    img: np.ndarray, weighted_unique: bool = False, out: np.ndarray | None = None
+):
+    """
+    画像から彩度と明度に基づいてフィルタリングされたピクセルを取得します。
+    しきい値は画像の彩度・明度の最大値から 8 ビットの整数で求め、HSV 画像に対する
+    cv2.inRange の 1 回の走査でマスクを作るため、浮動小数点の中間配列を作りません。
+
+    Args:
+        img (np.ndarray): 処理する画像データ (0-1 の float 配列 (float32 なども可)、または uint8 配列)。
+        weighted_unique (bool, optional): True の場合、重複を除いた色と各色の画素数を返します。
+        out (np.ndarray, optional): 結果を書き込む float64 の配列 (抽出される画素数以上の行 x 3)。
+                                    指定した場合は先頭から書き込み、そのビューを返します。
 
-    saturation_mask = saturation_pixel > SATURATION_THRESHOLD
-    brightness_mask = brightness_pixel > BRIGHTNESS_THRESHOLD
-    filtered_pixels = cv2_img[saturation_mask & brightness_mask]
+    Returns:
+        np.ndarray: フィルタリングされたピクセルデータ (0-1 の範囲)。
+        weighted_unique が True の場合は (重複を除いた色 (0-1 の範囲), 各色の画素数) のタプル。
+    """
+    pixels = img.reshape((img.shape[0] * img.shape[1], 3))
+
+    if img.dtype == np.uint8:
+        img_8bit = img
+    else:
+        img_8bit = (img * 255).astype(np.uint8)
+    hsv_image = cv2.cvtColor(img_8bit, cv2.COLOR_BGR2HSV)
+
+    saturation_min = _threshold_level(int(hsv_image[:, :, 1].max()), SATURATION_THRESHOLD)
+    brightness_min = _threshold_level(int(hsv_image[:, :, 2].max()), BRIGHTNESS_THRESHOLD)
+    if saturation_min > 255 or brightness_min > 255:
+        mask = np.zeros(len(pixels), dtype=bool)
+    else:
+        mask = cv2.inRange(
+            hsv_image, (0, saturation_min, brightness_min), (255, 255, 255)
+        ).reshape(-1).view(bool)
+
+    count = int(np.count_nonzero(mask))
+    if out is None:
+        out = np.empty((count, 3), dtype=np.float64)
+    filtered_pixels = out[:count]
+    if pixels.dtype == np.uint8:
+        np.divide(np.compress(mask, pixels, axis=0), 255.0, out=filtered_pixels)
+    elif pixels.dtype == np.float64:
+        np.compress(mask, pixels, axis=0, out=filtered_pixels)
+    else:
+        # np.compress の out は入力と同じ型が必要なため、float32 などは抽出後に変換して書き込む
+        filtered_pixels[:] = pixels[mask]
+
+    if weighted_unique:
+        return _weighted_unique(filtered_pixels)
     return filtered_pixels
 
 
-def getMainColorKmeans(img: np.ndarray, width: int, height: int) -> np.ndarray:
+def _pixel_weights(
+    colors: np.ndarray, counts: np.ndarray, centers: np.ndarray
+) -> np.ndarray:
     """
-    画像から主要な色を抽出し、それらを表すカラーバー画像を生成します。
-    KMeans クラスタリングを使用して色を特定します。
+    各色を最も近い主要色に割り当て、主要色ごとの画素の割合を求めます。
+    色は重複を除いたものを画素数で重み付けして扱うため、距離の計算は色の種類の数で済みます。
+    補完のために重複した主要色には、最初のものに割り当てて 0 を返します。
+    """
+    pixels = colors * 255
+    distances = np.stack([((pixels - c) ** 2).sum(axis=1) for c in centers], axis=1)
+    totals = np.bincount(distances.argmin(axis=1), weights=counts, minlength=len(centers))
+    return totals / max(totals.sum(), 1)
+
+
+def getMainColorPalette(
+    img: np.ndarray,
+    method: str = COLOR_METHOD,
+    workers: int | None = None,
+    cancel: threading.Event | None = None,
+    progress: ProgressCallback | None = None,
+) -> Palette:
+    """
+    画像から主要な色を抽出し、Palette として返します。
 
     Args:
         img (np.ndarray): 処理する画像データ (NumPy 配列)。
-        width (int): 生成するカラーバーの各色の幅。
-        height (int): 生成するカラーバーの高さ。
+        method (str, optional): 色抽出のバックエンド。getMainColorKmeans を参照。
+        workers (int, optional): 使用するスレッド数。getMainColorKmeans を参照。
+        cancel (threading.Event, optional): セットされると、次の区切りで処理を打ち切ります。
+        progress (ProgressCallback, optional): "palette" ステージの進捗を受け取る関数。
+                                               画素の選別後に 0.1、クラスタリング後に 0.9 を通知します。
 
     Returns:
-        np.ndarray: 主要な色を表すカラーバー画像データ (NumPy 配列)。
+        Palette: 主要な色、カラーバーに並べる順、各色の画素の割合。
+
+    Raises:
+        CancelError: cancel がセットされた場合、または progress が送出した場合。
     """
+    report(progress, PALETTE, 0.0, cancel)
     filtered_pixels = _get_filtered_pixels(img)
-
-    cluster_centers_arr = _get_cluster_centers(filtered_pixels)
+    # 主要色ごとの割合 (weights) には重複を除いた色の表が必ず必要なため、表を先に作り、
+    # その行数を色の種類の数として渡す (_count_distinct_colors で数え直さない)。
+    # 解析用の縮小画像では、表の作成は KMeans に比べて十分に短い
+    colors, counts = _weighted_unique(filtered_pixels)
+
+    report(progress, PALETTE, 0.1, cancel)
+    cluster_centers_arr = _get_cluster_centers(
+        filtered_pixels, method, workers, unique_count=len(colors)
+    )
+    report(progress, PALETTE, 0.9, cancel)
 
     hsv_centers = cv2.cvtColor(np.uint8([cluster_centers_arr]), cv2.COLOR_RGB2HSV)[0]
 
-    sorted_indices = np.argsort(hsv_centers[:, 0])
-    cluster_centers_arr = cluster_centers_arr[sorted_indices]
+    palette = Palette(
+        centers=cluster_centers_arr,
+        order=np.argsort(hsv_centers[:, 0]),
+        weights=_pixel_weights(colors, counts, cluster_centers_arr),
+    )
+    report(progress, PALETTE, 1.0, cancel)
+    return palette
+
+
+def getMainColorCenters(
+    img: np.ndarray,
+    method: str = COLOR_METHOD,
+    workers: int | None = None,
+    cancel: threading.Event | None = None,
+    progress: ProgressCallback | None = None,
+) -> np.ndarray:
+    """
+    画像から主要な色を抽出し、カラーバーに並べる順 (色相順) のクラスタ中心を返します。
+
+    Args:
+        img (np.ndarray): 処理する画像データ (NumPy 配列)。
+        method (str, optional): 色抽出のバックエンド。getMainColorKmeans を参照。
+        workers (int, optional): 使用するスレッド数。getMainColorKmeans を参照。
+        cancel (threading.Event, optional): 打ち切り用のイベント。getMainColorKmeans を参照。
+        progress (ProgressCallback, optional): 進捗を受け取る関数。getMainColorPalette を参照。
+
+    Returns:
+        np.ndarray: 主要な色 (KMEANS_CLUSTERS x 3 の int 配列、画像と同じチャンネル順)。
+    """
+    return getMainColorPalette(img, method, workers, cancel, progress).bar_colors
+
 
-    allwidth = width * KMEANS_CLUSTERS
+def getColorBar(palette: Palette, width: int, height: int) -> np.ndarray:
+    """
+    Palette の主要な色を並べたカラーバー画像を生成します。
 
-    picker = np.ones([height, allwidth, 3], dtype="int") * 255
+    Args:
+        palette (Palette): 主要な色。
+        width (int): 生成するカラーバーの各色の幅。
+        height (int): 生成するカラーバーの高さ。
 
-    for i, rgb_arr in enumerate(cluster_centers_arr):
-        color_img = np.ones([height, width, 3], dtype="int")
-        for j, rgb in enumerate(rgb_arr):
-            color_img[:, :, j] = np.ones([height, width], dtype="int") * rgb
+    Returns:
+        np.ndarray: 主要な色を表すカラーバー画像データ (NumPy 配列)。
+    """
+    picker = np.empty([height, width * KMEANS_CLUSTERS, 3], dtype="int")
+    return drawColorBar(palette, picker)
 
-        picker[:height, width * i : width * (i + 1)] = color_img
 
-    return picker
+def drawColorBar(palette: Palette, out: np.ndarray) -> np.ndarray:
+    """
+    Palette の主要な色を並べたカラーバーを、出力先の配列に直接書き込みます。
+    中間のカラーバー画像は作らず、各色をブロードキャストで代入します。
 
+    Args:
+        palette (Palette): 主要な色。
+        out (np.ndarray): 書き込み先 (高さ x 各色の幅 * KMEANS_CLUSTERS x 3 の配列)。
+                          出力画像の一部を切り出したビューをそのまま渡せます。
 
-def getMainColorRGBValue(img: np.ndarray) -> list[str]:
+    Returns:
+        np.ndarray: 書き込んだ out。
     """
-    画像から主要な色の RGB 値をリストとして取得します。
+    width = out.shape[1] // KMEANS_CLUSTERS
+    for i, color in enumerate(palette.bar_colors):
+        out[:, width * i : width * (i + 1)] = color
+    return out
+
+
+def getMainColorKmeans(
+    img: np.ndarray,
+    width: int,
+    height: int,
+    method: str = COLOR_METHOD,
+    workers: int | None = None,
+    cancel: threading.Event | None = None,
+    progress: ProgressCallback | None = None,
+) -> np.ndarray:
+    """
+    画像から主要な色を抽出し、それらを表すカラーバー画像を生成します。
     KMeans クラスタリングを使用して色を特定します。
 
     Args:
         img (np.ndarray): 処理する画像データ (NumPy 配列)。
+        width (int): 生成するカラーバーの各色の幅。
+        height (int): 生成するカラーバーの高さ。
+        method (str, optional): 色抽出のバックエンド。デフォルトは constants.COLOR_METHOD。
+            "kmeans": 全ピクセルに対する KMeans (従来の方式)。
+            "histogram": 量子化した 3 次元ヒストグラムのビンに対する重み付き KMeans。
+            "minibatch": 決定的なサブサンプルに対する MiniBatchKMeans。
+            "kmeans" との差は CIE76 の ΔE で "histogram" が概ね 2 以内、
+            サブサンプルを使う "minibatch" が概ね 7 以内です
+            ("minibatch" はまれに別の局所解に収束します)。
+        workers (int, optional): 使用するスレッド数。デフォルトは CPU コア数。
+            KMeans の初期値ごとの試行を並列に実行します。結果はスレッド数によらず同じです。
+            複数のプロセスで並列に処理する場合は 1 を指定します。
+        cancel (threading.Event, optional): セットされると、次の区切りで CancelError により打ち切ります。
+        progress (ProgressCallback, optional): 進捗を受け取る関数。getMainColorPalette を参照。
 
     Returns:
-        list[str]: 主要な色の RGB 値のリスト (例: ["RRGGBB", ...])。
+        np.ndarray: 主要な色を表すカラーバー画像データ (NumPy 配列)。
     """
-    filtered_pixels = _get_filtered_pixels(img)
+    palette = getMainColorPalette(img, method, workers, cancel, progress)
+    return getColorBar(palette, width, height)
 
-    cluster_centers_arr = _get_cluster_centers(filtered_pixels)
 
-    return [f"{e[0]:02x}{e[1]:02x}{e[2]:02x}" for e in cluster_centers_arr.tolist()]
+def getMainColorRGBValue(
+    img: np.ndarray,
+    method: str = COLOR_METHOD,
+    workers: int | None = None,
+    cancel: threading.Event | None = None,
+    progress: ProgressCallback | None = None,
+) -> list[str]:
+    """
+    画像から主要な色の RGB 値をリストとして取得します。
+    KMeans クラスタリングを使用して色を特定します。
+    色はカラーバーと同じ順に並びます。
+
+    Args:
+        img (np.ndarray): 処理する画像データ (NumPy 配列、BGR 順)。
+        method (str, optional): 色抽出のバックエンド。getMainColorKmeans を参照。
+        workers (int, optional): 使用するスレッド数。getMainColorKmeans を参照。
+        cancel (threading.Event, optional): 打ち切り用のイベント。getMainColorKmeans を参照。
+        progress (ProgressCallback, optional): 進捗を受け取る関数。getMainColorPalette を参照。
+
+    Returns:
+        list[str]: 主要な色の RGB 値のリスト (例: ["RRGGBB", ...])。
+    """
+    return getMainColorPalette(img, method, workers, cancel, progress).hex_values()
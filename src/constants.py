@@ -8,8 +8,65 @@ MIN_FRAME_RATIO = 1.0
 MAX_FRAME_RATIO = SQRT3_RATIO
 SIDE_MARGIN_RATIO = 0.309
 DEFAULT_RADIUS = 40
+STRIP_HEIGHT = 256
 
 # Colorpick Constants
 KMEANS_CLUSTERS = 5
+KMEANS_N_INIT = 10
 SATURATION_THRESHOLD = 0.5
 BRIGHTNESS_THRESHOLD = 0.5
+COLOR_METHOD = "kmeans"
+COLOR_METHODS = ("kmeans", "histogram", "minibatch")
+HISTOGRAM_BITS = 5
+MINIBATCH_SAMPLE_SIZE = 20000
+ANALYSIS_MAX_SIDE = 512
+
+# WebView Constants
+BLOB_STORE_MAX_BYTES = 256 * 1024 * 1024
+# Blob サーバーに 1 回でアップロードできるサイズの上限 (超える場合は 413)
+BLOB_UPLOAD_MAX_BYTES = 128 * 1024 * 1024
+# 常駐サービスの POST /frame で受け付ける本文のサイズの上限 (超える場合は 413)
+SERVICE_MAX_BODY_BYTES = 128 * 1024 * 1024
+RESULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+RESULT_CACHE_DIR_ENV = "FRAMEMAKER_CACHE_DIR"
+# ディスクキャッシュの合計サイズの上限 (超える場合は最終利用時刻の古いファイルから削除)
+RESULT_CACHE_DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024
+PREVIEW_MAX_SIDE = 1024
+# 設定するとジョブごとにステージ別の処理時間を標準エラー出力に書き出す環境変数 ("memory" でメモリも)
+METRICS_ENV = "FRAMEMAKER_METRICS"
+# 非同期ジョブのワーカースレッド数、保持する終了済みジョブの数、終了時に呼び出す JavaScript の関数名
+JOB_WORKERS = 2
+JOB_HISTORY = 32
+JOB_FINISHED_CALLBACK = "onFrameJobFinished"
+
+# Encoder Constants
+# JPEG の品質・最適化・プログレッシブ・クロマサブサンプリング、PNG の圧縮レベル、
+# WebP の品質 (100 を超える値は可逆圧縮) をまとめたプロファイル
+ENCODE_PROFILES = {
+    "fast": {
+        "jpeg_quality": 85,
+        "jpeg_optimize": False,
+        "jpeg_progressive": False,
+        "jpeg_sampling": "420",
+        "png_compression": 1,
+        "webp_quality": 80,
+    },
+    "balanced": {
+        "jpeg_quality": 92,
+        "jpeg_optimize": True,
+        "jpeg_progressive": False,
+        "jpeg_sampling": "420",
+        "png_compression": 3,
+        "webp_quality": 90,
+    },
+    "archival": {
+        "jpeg_quality": 100,
+        "jpeg_optimize": True,
+        "jpeg_progressive": True,
+        "jpeg_sampling": "444",
+        "png_compression": 9,
+        "webp_quality": 101,
+    },
+}
+ENCODE_PROFILE = "balanced"
+PREVIEW_ENCODE_PROFILE = "fast"
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from src.constants import METRICS_ENV
+from src.progress import ProgressCallback
+
+# tracemalloc はプロセス全体で 1 つのため、計測中のジョブの数を数えて最後のジョブで止める
+_tracing_lock = threading.Lock()
+_tracing_jobs = 0
+_tracing_started = False
+
+
+def metrics_mode() -> str:
+    """
+    環境変数 FRAMEMAKER_METRICS (constants.METRICS_ENV) で指定された計測の内容を返します。
+    main.py の --metrics はこの環境変数を設定するため、バッチのワーカープロセスにも引き継がれます。
+
+    Returns:
+        str: "memory" の場合は時間とメモリ、"time" の場合は時間のみ、無効な場合は空文字列。
+             メモリの計測 (tracemalloc) は Python の確保が多い KMeans などを数倍遅くするため、
+             "1" や "true" では時間のみを計測します。
+    """
+    value = os.getenv(METRICS_ENV, "").lower()
+    if value == "memory":
+        return "memory"
+    return "time" if value in ("1", "true", "on", "yes", "time") else ""
+
+
+def _start_tracing() -> None:
+    global _tracing_jobs, _tracing_started
+    with _tracing_lock:
+        if _tracing_jobs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_jobs += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_jobs, _tracing_started
+    with _tracing_lock:
+        _tracing_jobs -= 1
+        if _tracing_jobs == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class StageMetrics:
+    """
+    progress コールバックとして渡し、ステージごとの経過時間、CPU 時間、確保したメモリを記録するクラス。
+    各ステージの開始 (fraction 0.0) と終了 (1.0) の通知の間を 1 回の計測とし、
+    同じステージが複数回あれば合計します。受け取った通知はそのまま元の progress にも渡します。
+
+    CPU 時間はプロセス全体 (KMeans などのワーカースレッドを含む) の値、メモリは tracemalloc で
+    追跡できる確保 (NumPy と OpenCV の出力配列を含む) のピークです。
+    同時に実行している別のジョブの分も含まれることがあります。
+    """
+
+    def __init__(
+        self,
+        job: str,
+        progress: ProgressCallback | None = None,
+        trace_memory: bool = False,
+        **fields,
+    ):
+        """
+        StageMetrics クラスのコンストラクタ。
+
+        Args:
+            job (str): ジョブの種類 (ログの "job" の値)。
+            progress (ProgressCallback, optional): 通知を転送する元の progress。
+            trace_memory (bool, optional): 各ステージの alloc_bytes を記録するかどうか。
+                                           tracemalloc による追跡は呼び出し元で開始します。
+            **fields: ログに追加する値 (入力ファイルのパスなど)。
+        """
+        self.job = job
+        self.trace_memory = trace_memory
+        self.fields = fields
+        self.stages: dict[str, dict] = {}
+        self.error = ""
+        self._progress = progress
+        self._open: dict[str, tuple[float, float, int]] = {}
+        self._started = (time.perf_counter(), time.process_time())
+        self._finished: tuple[float, float] | None = None
+
+    def __call__(self, stage: str, fraction: float) -> None:
+        if fraction == 0.0 and stage not in self._open:
+            current = 0
+            if self.trace_memory:
+                current = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            self._open[stage] = (time.perf_counter(), time.process_time(), current)
+        elif fraction == 1.0 and stage in self._open:
+            wall, cpu, current = self._open.pop(stage)
+            record = self.stages.setdefault(stage, {"wall_ms": 0.0, "cpu_ms": 0.0})
+            record["wall_ms"] += (time.perf_counter() - wall) * 1000
+            record["cpu_ms"] += (time.process_time() - cpu) * 1000
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                record["alloc_bytes"] = max(record.get("alloc_bytes", 0), peak - current)
+        if self._progress is not None:
+            self._progress(stage, fraction)
+
+    def finish(self, error: str = "") -> None:
+        """
+        ジョブ全体の計測を終了します。
+
+        Args:
+            error (str, optional): ジョブが例外で終了した場合の例外の名前。
+        """
+        self.error = error
+        self._finished = (time.perf_counter(), time.process_time())
+
+    def to_dict(self) -> dict:
+        """
+        記録した値を、ログに書き出す辞書として返します。
+
+        Returns:
+            dict: job、fields の値、ジョブ全体の wall_ms と cpu_ms、error (失敗した場合)、
+                  ステージ名をキーにした stages ({"wall_ms", "cpu_ms"}、メモリを計測する場合は
+                  "alloc_bytes" も) を含む辞書。
+        """
+        finished = self._finished or (time.perf_counter(), time.process_time())
+        record = {"event": "metrics", "job": self.job, **self.fields}
+        record["wall_ms"] = (finished[0] - self._started[0]) * 1000
+        record["cpu_ms"] = (finished[1] - self._started[1]) * 1000
+        if self.error:
+            record["error"] = self.error
+        record["stages"] = self.stages
+        return record
+
+    def log_line(self) -> str:
+        """
+        1 行の JSON に変換した計測結果を返します。
+        """
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+
+@contextmanager
+def instrument(
+    job: str, progress: ProgressCallback | None = None, **fields
+) -> Iterator[ProgressCallback | None]:
+    """
+    計測が有効な場合だけ、ジョブの各ステージを計測して終了時に 1 行の JSON を標準エラー出力に書き出します。
+    無効な場合は progress をそのまま返すため、処理に加わるのは環境変数の確認のみです。
+    metrics_mode() が "memory" の場合は、計測中だけ tracemalloc を有効にします。
+    progress が既に StageMetrics の場合 (計測中のジョブの内側) も、二重に計測しません。
+
+        with instrument("render", progress, input=path) as progress:
+            FrameMaker(..., progress=progress).run()
+
+    Args:
+        job (str): ジョブの種類。
+        progress (ProgressCallback, optional): 呼び出し元の progress。
+        **fields: ログに追加する値。
+
+    Yields:
+        ProgressCallback | None: 処理に渡す progress。
+    """
+    mode = "" if isinstance(progress, StageMetrics) else metrics_mode()
+    if not mode:
+        yield progress
+        return
+
+    trace_memory = mode == "memory"
+    metrics = StageMetrics(job, progress, trace_memory, **fields)
+    if trace_memory:
+        _start_tracing()
+    try:
+        yield metrics
+    except BaseException as exc:
+        metrics.finish(type(exc).__name__)
+        raise
+    else:
+        metrics.finish()
+    finally:
+        if trace_memory:
+            _stop_tracing()
+        print(metrics.log_line(), file=sys.stderr, flush=True)
@@ -0,0 +1,41 @@
+import threading
+from collections.abc import Callable
+
+from src.Error import raise_if_cancelled
+
+# 進捗を通知する処理のステージ。実行されないステージ (角丸なしの mask など) は通知しない
+DECODE = "decode"  # 入力画像のデコード
+PAD = "pad"  # 出力画像の背景の塗りつぶしと元画像の貼り付け
+MASK = "mask"  # 角丸のマスクによる四隅のブレンド
+PALETTE = "palette"  # 主要色の抽出 (対象の画素の選別とクラスタリング)
+BAR = "bar"  # カラーバーの描画
+ENCODE = "encode"  # 出力画像のエンコードと保存
+STAGES = (DECODE, PAD, MASK, PALETTE, BAR, ENCODE)
+
+# progress(stage, fraction) の形で呼び出す関数。fraction はステージ内の進捗 (0.0-1.0)。
+# CancelError を送出すると、その場で処理を打ち切ります
+ProgressCallback = Callable[[str, float], None]
+
+
+def report(
+    progress: ProgressCallback | None,
+    stage: str,
+    fraction: float,
+    cancel: threading.Event | None = None,
+) -> None:
+    """
+    処理の区切りで進捗を通知し、キャンセルが要求されていれば打ち切ります。
+    各ステージは開始時に 0.0、終了時に 1.0 を通知し、長いステージはその間の値も通知します。
+
+    Args:
+        progress (ProgressCallback, optional): 進捗を受け取る関数。None の場合は通知しません。
+        stage (str): ステージ名 (STAGES のいずれか)。
+        fraction (float): ステージ内の進捗 (0.0-1.0)。
+        cancel (threading.Event, optional): セットされていればキャンセルとみなすイベント。
+
+    Raises:
+        CancelError: cancel がセットされている場合、または progress が送出した場合。
+    """
+    raise_if_cancelled(cancel)
+    if progress is not None:
+        progress(stage, fraction)
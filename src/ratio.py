@@ -0,0 +1,37 @@
+from numbers import Real
+
+from src.constants import GOLDEN_RATIO, MAX_FRAME_RATIO, MIN_FRAME_RATIO, SILVER_RATIO
+
+
+def validate_frame_ratio(frame_ratio: float) -> float:
+    ratio = float(frame_ratio)
+    if not MIN_FRAME_RATIO <= ratio <= MAX_FRAME_RATIO:
+        raise ValueError(
+            f"Frame ratio must be between {MIN_FRAME_RATIO} and {MAX_FRAME_RATIO}: "
+            f"{ratio}"
+        )
+    return ratio
+
+
+def resolve_frame_ratio(frame_mode) -> tuple[bool, float]:
+    """
+    フレーム比率モードを FrameMaker に渡す boolean と比率値に変換します。
+    既存の boolean 入力は後方互換のため Golden として扱います。
+    """
+    if isinstance(frame_mode, Real) and not isinstance(frame_mode, bool):
+        return True, validate_frame_ratio(frame_mode)
+
+    if isinstance(frame_mode, str):
+        mode = frame_mode.lower()
+        if mode in ("none", "false", "off", ""):
+            return False, GOLDEN_RATIO
+        if mode == "golden":
+            return True, GOLDEN_RATIO
+        if mode == "silver":
+            return True, SILVER_RATIO
+        try:
+            return True, validate_frame_ratio(float(mode))
+        except ValueError as exc:
+            raise ValueError(f"Unsupported frame ratio mode: {frame_mode}") from exc
+
+    return bool(frame_mode), GOLDEN_RATIO
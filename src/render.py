@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+
+from src.constants import ENCODE_PROFILE, ENCODE_PROFILES, SIDE_MARGIN_RATIO
+from src.Error import ReadError
+from src.FrameMaker import FrameMaker
+from src.ImageHandler import ImageHandler
+from src.metrics import instrument
+from src.progress import DECODE, ENCODE, ProgressCallback, report
+from src.ratio import resolve_frame_ratio
+
+
+def render_file(
+    inputpath: str,
+    outputpath: str,
+    golden: bool | str,
+    black: bool,
+    rounded: bool,
+    maincolor: bool,
+    strip_height: int | None = None,
+    color_workers: int | None = None,
+    profile: str = ENCODE_PROFILE,
+    cancel: threading.Event | None = None,
+    progress: ProgressCallback | None = None,
+) -> bool:
+    """
+    指定されたファイルパスの画像にフレーム処理を適用し、結果を保存します。
+    GUI の依存 (pywebview など) を読み込まないため、CLI やバッチ処理から使用します。
+
+    Args:
+        inputpath (str): 入力画像ファイルのパス。
+        outputpath (str): 出力画像を保存するパス。
+        golden (bool | str): 比率フレームを適用するか、比率モード。
+        black (bool): 黒いフレームを適用するかどうか。
+        rounded (bool): 角丸フレームを適用するかどうか。
+        maincolor (bool): メインカラーバーを追加するかどうか。
+        strip_height (int, optional): 指定した場合、出力全体を確保せずに
+                                      この行数ずつ PNG として書き出します。
+        color_workers (int, optional): 主要色の抽出に使用するスレッド数。デフォルトは CPU コア数。
+        profile (str, optional): エンコードプロファイル ("fast"、"balanced"、"archival")。
+                                 デフォルトは constants.ENCODE_PROFILE。
+        cancel (threading.Event, optional): セットされると、次の区切りで処理を打ち切ります。
+        progress (ProgressCallback, optional): 各ステージの進捗を受け取る関数。FrameMaker を参照。
+
+    入力と出力には .npy ファイルも指定できます。.npy の入力はメモリマップで読み込み、
+    .npy の出力はエンコードせずに uint8 配列のまま書き込みます。
+    環境変数 FRAMEMAKER_METRICS を設定すると、ステージごとの処理時間とメモリを
+    1 行の JSON として標準エラー出力に書き出します。
+
+    Returns:
+        bool: 保存に成功した場合は True。
+
+    Raises:
+        CancelError: cancel がセットされた場合、または progress が送出した場合。
+    """
+    with instrument("render", progress, input=inputpath, output=outputpath) as progress:
+        try:
+            if profile not in ENCODE_PROFILES:
+                raise ValueError(f"Unsupported encode profile: {profile}")
+            report(progress, DECODE, 0.0, cancel)
+            handler = ImageHandler(fp=inputpath.replace("blob:", ""), uint8=True)
+            report(progress, DECODE, 1.0, cancel)
+            use_ratio, frame_ratio = resolve_frame_ratio(golden)
+            bgcolor = "#000000" if black else "#FFFFFF"
+            fm = FrameMaker(
+                handler,
+                use_ratio,
+                bgcolor,
+                rounded,
+                maincolor,
+                golden_ratio=frame_ratio,
+                side_margin_ratio=SIDE_MARGIN_RATIO,
+                color_workers=color_workers,
+                cancel=cancel,
+                progress=progress,
+            )
+            if strip_height:
+                fm.write_strips(
+                    outputpath,
+                    strip_height,
+                    ENCODE_PROFILES[profile]["png_compression"],
+                )
+                return True
+            if outputpath.lower().endswith(".npy"):
+                # エンコードせず、メモリマップした .npy に直接書き込む
+                out = np.lib.format.open_memmap(
+                    outputpath, mode="w+", dtype=np.uint8, shape=fm.output_shape()
+                )
+                fm.run(out=out)
+                report(progress, ENCODE, 0.0, cancel)
+                out.flush()
+                report(progress, ENCODE, 1.0)
+                return True
+            result = fm.run()
+            report(progress, ENCODE, 0.0, cancel)
+        except ReadError:
+            print("Read Error: File doesn't exist (unsupported japanese characters)")
+            return False
+        except ValueError as exc:
+            print(exc)
+            return False
+        else:
+            handler.save_image(outputpath, result, profile)
+            report(progress, ENCODE, 1.0)
+            return True
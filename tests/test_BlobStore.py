@@ -0,0 +1,161 @@
+import base64
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.BlobStore import BlobStore, start_blob_server
+from src.WebviewInterface import API
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "test_image.png")
+PAGE_ORIGIN = "http://127.0.0.1:8000"
+
+
+@pytest.fixture
+def api():
+    api = API()
+    yield api
+    if api._blob_server is not None:
+        api._blob_server.shutdown()
+        api._blob_server.server_close()
+
+
+def request(url: str, method: str = "GET", data: bytes | None = None, **headers) -> int:
+    """
+    リクエストを送り、ステータスコードを返す。
+    """
+    req = urllib.request.Request(url, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def upload(url: str, token: str, data: bytes) -> str:
+    req = urllib.request.Request(
+        f"{url}/blobs",
+        data=data,
+        method="POST",
+        headers={"Content-Type": "image/png", "X-Blob-Token": token, "Origin": PAGE_ORIGIN},
+    )
+    with urllib.request.urlopen(req, timeout=10) as response:
+        assert response.headers["Access-Control-Allow-Origin"] == PAGE_ORIGIN
+        return json.loads(response.read())["id"]
+
+
+def test_blob_store_evicts_oldest_when_over_budget():
+    """
+    合計サイズが上限を超えると古い Blob から削除されることを確認する。
+    """
+    store = BlobStore(max_bytes=10)
+    first = store.put(b"123456")
+    second = store.put(b"abcdef")
+
+    with pytest.raises(KeyError):
+        store.get(first)
+    assert store.get(second) == (b"abcdef", "application/octet-stream")
+
+
+def test_run_frame_maker_from_blob_round_trip(api):
+    """
+    バイト列のままアップロードした画像を処理し、結果を Blob として取得できることを確認する。
+    """
+    with open(TEST_IMAGE, "rb") as f:
+        data = f.read()
+    source = cv2.imread(TEST_IMAGE)
+    server = api.getBlobServer(PAGE_ORIGIN)
+    url = server["url"]
+
+    blob_id = upload(url, server["token"], data)
+    result_id = api.runFrameMakerFromBlob(blob_id, "golden", "#FFFFFF", True, False)
+
+    req = urllib.request.Request(
+        f"{url}/blobs/{result_id}", headers={"X-Blob-Token": server["token"]}
+    )
+    with urllib.request.urlopen(req, timeout=10) as response:
+        assert response.headers["Content-Type"] == "image/jpeg"
+        result = cv2.imdecode(np.frombuffer(response.read(), np.uint8), cv2.IMREAD_COLOR)
+    assert result.shape[0] == result.shape[1] > max(source.shape[:2])
+
+    api.releaseBlob(result_id)
+    with pytest.raises(KeyError):
+        api._blob_store.get(result_id)
+
+
+def test_main_color_from_blob_matches_base64_path(api):
+    """
+    Blob 経由の主要色の取得結果が Base64 経由と一致することを確認する。
+    """
+    with open(TEST_IMAGE, "rb") as f:
+        data = f.read()
+    blob_id = api._blob_store.put(data, "image/png")
+    data_url = "data:image/png;base64," + base64.b64encode(data).decode()
+
+    assert api.getMainColorRGBValueFromBlob(blob_id) == api.getMainColorRGBValue(data_url)
+
+
+def test_missing_blob_returns_empty_result(api):
+    """
+    存在しない Blob ID を指定すると空の結果が返されることを確認する。
+    """
+    assert api.runFrameMakerFromBlob("missing", "golden", "#FFFFFF", False, False) == ""
+    assert api.getMainColorRGBValueFromBlob("missing") == ""
+
+
+def test_blob_server_rejects_other_origins_and_missing_token():
+    """
+    トークンのないリクエストと、WebView のページ以外のオリジンからのリクエストが
+    403 で拒否され、Blob の読み書きや削除ができないことを確認する。
+    """
+    store = BlobStore()
+    blob_id = store.put(b"secret", "image/png")
+    server = start_blob_server(store, "token", PAGE_ORIGIN)
+    url = "http://{}:{}".format(*server.server_address[:2])
+    try:
+        assert request(f"{url}/blobs/{blob_id}") == 403
+        assert request(f"{url}/blobs/{blob_id}", **{"X-Blob-Token": "wrong"}) == 403
+        assert (
+            request(
+                f"{url}/blobs/{blob_id}",
+                "DELETE",
+                Origin="http://evil.example",
+                **{"X-Blob-Token": "token"},
+            )
+            == 403
+        )
+        assert request(f"{url}/blobs", "OPTIONS", Origin="http://evil.example") == 403
+        assert request(f"{url}/blobs", "POST", b"data") == 403
+        assert request(f"{url}/blobs", "OPTIONS", Origin=PAGE_ORIGIN) == 204
+        assert request(f"{url}/blobs/{blob_id}", **{"X-Blob-Token": "token"}) == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(store) == 1
+
+
+def test_blob_server_rejects_uploads_over_limit():
+    """
+    上限を超えるアップロードは本文を保存せずに 413 で拒否されることを確認する。
+    上限はストアの max_bytes も超えない。
+    """
+    store = BlobStore(max_bytes=16)
+    server = start_blob_server(store, "token", max_upload=1024)
+    url = "http://{}:{}".format(*server.server_address[:2])
+    try:
+        status = request(f"{url}/blobs", "POST", b"x" * 17, **{"X-Blob-Token": "token"})
+        assert request(f"{url}/blobs", "POST", b"x" * 16, **{"X-Blob-Token": "token"}) == 201
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert status == 413
+    assert len(store) == 1
@@ -1,14 +1,17 @@
+import io
 import os
 import sys
+import tracemalloc
 
 import numpy as np
 import pytest
-from PIL import Image
+from PIL import Image, ImageDraw
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
 
 from src.constants import GOLDEN_RATIO, MAX_FRAME_RATIO, MIN_FRAME_RATIO, SILVER_RATIO
-from src.FrameMaker import FrameMaker
+from src.Error import CancelError
+from src.FrameMaker import FrameMaker, _corner_patches
 from src.ImageHandler import ImageHandler
 from src.WebviewInterface import (
     API,
@@ -462,3 +465,225 @@ def test_frame_maker_custom_background_color(sample_image_handler):
     # フレーム部分が赤であることを確認（例：角のピクセル）
     # OpenCVはBGR順なので、(0, 0, 255)が赤に対応
     assert np.all(result_img[0, 0] == [0, 0, 255])
+
+
+@pytest.fixture
+def random_image_pil():
+    # 乱数で 90x60 のカラー画像を生成
+    rng = np.random.default_rng(0)
+    img_array = rng.integers(0, 256, size=(60, 90, 3), dtype=np.uint8)
+    return Image.fromarray(img_array)
+
+
+@pytest.mark.parametrize("transpose", [False, True])
+@pytest.mark.parametrize("rounded", [False, True])
+@pytest.mark.parametrize("mc", [False, True])
+def test_frame_maker_uint8_matches_float(random_image_pil, transpose, rounded, mc):
+    """
+    uint8 パイプラインの出力が float パイプラインの出力と ±1 以内で一致することを確認する。
+
+    テスト対象機能: ImageHandler の uint8 モードと FrameMaker の uint8 パイプライン
+    期待結果: 出力が uint8 であり、形状が一致し、各画素の差が 1 以下であること。
+    """
+    webimg = random_image_pil.transpose(Image.Transpose.TRANSPOSE) if transpose else random_image_pil
+    options = {"golden": True, "bgcolor": "#1E90FF", "rounded": rounded, "mc": mc, "radius": 12}
+
+    float_result = FrameMaker(ImageHandler(fp="", webimg=webimg), **options).run()
+    uint8_result = FrameMaker(ImageHandler(fp="", webimg=webimg, uint8=True), **options).run()
+
+    assert uint8_result.dtype == np.uint8
+    assert uint8_result.shape == float_result.shape
+    assert np.abs(uint8_result.astype(int) - float_result).max() <= 1
+
+
+@pytest.mark.parametrize("uint8", [True, False])
+@pytest.mark.parametrize("rounded", [True, False])
+@pytest.mark.parametrize("transpose", [False, True])
+def test_frame_maker_write_strips_matches_run(
+    tmp_path, random_image_pil, transpose, rounded, uint8
+):
+    """
+    ストリップ単位で書き出した PNG が、run の結果と一致することを確認する。
+
+    テスト対象機能: FrameMaker の write_strips
+    期待結果: 角丸の有無、元画像が uint8 か float かに関係なく、メインカラーバーを含む出力が
+              ストリップの高さに関係なく run と同一であること。
+    """
+    webimg = random_image_pil.transpose(Image.Transpose.TRANSPOSE) if transpose else random_image_pil
+    if uint8:
+        handler = ImageHandler(fp="", webimg=webimg, uint8=True)
+    else:
+        # 255 倍すると整数にならない値を含む float の元画像 (float の .npy など)
+        pixels = np.random.default_rng(1).random((webimg.height, webimg.width, 3))
+        handler = ImageHandler(fp="", array=pixels)
+    fm = FrameMaker(
+        handler,
+        golden=True,
+        bgcolor="#1E90FF",
+        rounded=rounded,
+        mc=True,
+        radius=12,
+    )
+    expected = fm.run()
+    assert expected.dtype == np.uint8
+
+    for strip_height in (1, 7, 1000):
+        output_path = tmp_path / f"strips-{strip_height}.png"
+        fm.write_strips(str(output_path), strip_height)
+
+        assert np.array_equal(ImageHandler(fp=str(output_path), uint8=True).img, expected)
+
+
+def test_frame_maker_run_into_memmap_output(tmp_path, random_image_pil):
+    """
+    呼び出し側が用意したメモリマップ配列に結果が直接書き込まれることを確認する。
+
+    テスト対象機能: FrameMaker の run(out=...) と output_shape
+    期待結果: 戻り値が渡した配列そのものであり、内容が通常の run の結果と一致すること。
+    """
+    fm = FrameMaker(
+        ImageHandler(fp="", webimg=random_image_pil, uint8=True),
+        golden=True,
+        bgcolor="#FFFFFF",
+        rounded=True,
+        mc=False,
+    )
+    out = np.lib.format.open_memmap(
+        tmp_path / "out.npy", mode="w+", dtype=np.uint8, shape=fm.output_shape()
+    )
+
+    result = fm.run(out=out)
+
+    assert result is out
+    assert np.array_equal(out, fm.run())
+
+    with pytest.raises(ValueError):
+        fm.run(out=np.empty((1, 1, 3), dtype=np.uint8))
+
+
+@pytest.mark.parametrize("uint8", [False, True])
+def test_frame_maker_peak_memory_within_budget(uint8):
+    """
+    画像の読み込みからフレーム処理までのピークメモリが、入力 1 枚分と出力 1 枚分に収まることを確認する。
+
+    テスト対象機能: ImageHandler と FrameMaker のコピーを作らない処理
+    期待結果: tracemalloc で計測したピーク確保量が (入力 + 出力) の 1.15 倍以下であること。
+    """
+    tracemalloc.start()
+    try:
+        handler = ImageHandler(fp="tests/assets/test_image.png", uint8=uint8)
+        result = FrameMaker(
+            handler, golden=True, bgcolor="#FFFFFF", rounded=True, mc=False
+        ).run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak <= (handler.img.nbytes + result.nbytes) * 1.15
+
+
+@pytest.mark.parametrize("size", [(60, 90), (90, 60), (20, 30)])
+def test_frame_maker_rounded_corners_match_full_mask(random_image_pil, size):
+    """
+    四隅のパッチによる角丸が、画像全体のマスクで合成した結果と一致し、パッチが再利用されることを確認する。
+
+    テスト対象機能: FrameMaker の角丸処理 (四隅のパッチとキャッシュ)
+    期待結果: 元画像の領域が全体マスクでの合成結果と一致し、2 回目の処理でキャッシュが使われること。
+    """
+    height, width = size
+    webimg = random_image_pil.resize((width, height))
+    handler = ImageHandler(fp="", webimg=webimg, uint8=True)
+    mask = Image.new("L", (width, height), 0)
+    ImageDraw.Draw(mask).rounded_rectangle([(0, 0), (width, height)], radius=12, fill=255)
+    expected = np.where(np.array(mask)[:, :, np.newaxis] == 255, handler.img, [255, 144, 30])
+
+    fm = FrameMaker(handler, golden=False, bgcolor="#1E90FF", rounded=True, mc=False, radius=12)
+    result = fm.run()
+    hits = _corner_patches.cache_info().hits
+    fm.run()
+
+    sh = (result.shape[0] - height) // 2
+    sw = (result.shape[1] - width) // 2
+    assert np.array_equal(result[sh : sh + height, sw : sw + width], expected)
+    if 2 * (12 + 1) <= min(size):
+        assert _corner_patches.cache_info().hits > hits
+
+
+@pytest.mark.parametrize("size", [(60, 90), (90, 60)])
+def test_frame_layout_matches_rendered_output(random_image_pil, size):
+    """
+    API.getFrameLayout の配置が、FrameMaker の描画結果の元画像とカラーバーの位置と一致することを確認する。
+
+    テスト対象機能: FrameLayout (画素を扱わない配置の計算)
+    期待結果: 出力の辺の長さ、元画像の矩形、カラーバーの矩形が描画結果と一致すること。
+    """
+    height, width = size
+    handler = ImageHandler(fp="", webimg=random_image_pil.resize((width, height)), uint8=True)
+    result = FrameMaker(handler, golden=True, bgcolor="#000000", rounded=False, mc=True).run()
+
+    layout = API().getFrameLayout(width, height, "golden", False, True)
+
+    assert layout["side"] == result.shape[0] == result.shape[1]
+    x, y, w, h = layout["image"]
+    assert np.array_equal(result[y : y + h, x : x + w], handler.img)
+    left, top, bar_width, bar_height = layout["color_bar"]
+    assert top + bar_height == layout["side"]
+    assert [s[0] for s in layout["swatches"]] == [left + bar_width // 5 * i for i in range(5)]
+    # カラーバーは最下部の行に描画される
+    assert np.any(result[top:, left : left + bar_width] != 0)
+
+
+def test_frame_maker_float_output_is_encodable_uint8(sample_image_handler):
+    """
+    float パイプラインの出力も uint8 の C 連続配列で、コピーせずにエンコーダーへ渡せることを確認する。
+
+    テスト対象機能: FrameMaker.run の出力形式と ImageHandler のエンコード
+    期待結果: 出力が uint8 で、エンコード結果をデコードすると出力と一致すること。
+    """
+    result = FrameMaker(
+        sample_image_handler, golden=True, bgcolor="#000000", rounded=False, mc=False
+    ).run()
+
+    assert result.dtype == np.uint8
+    assert result.flags.c_contiguous
+    encoded = sample_image_handler.encode_image(result, ".png")
+    decoded = np.array(Image.open(io.BytesIO(encoded)))[:, :, ::-1]
+    assert np.array_equal(decoded, result)
+
+
+def test_frame_maker_reports_stages_and_stops_on_cancel(sample_image_handler_colored):
+    """
+    progress に各ステージの開始と終了が通知され、progress が CancelError を送出すると
+    処理が打ち切られることを確認する。
+
+    テスト対象機能: FrameMaker の progress オプション
+    期待結果: pad、mask、palette、bar の順に 0.0 から 1.0 まで通知され、
+              palette で打ち切るとカラーバーが描画されないこと。
+    """
+    events = []
+    fm = FrameMaker(
+        sample_image_handler_colored,
+        True,
+        "#FFFFFF",
+        True,
+        True,
+        progress=lambda stage, fraction: events.append((stage, fraction)),
+    )
+    fm.run()
+
+    boundaries = [stage for stage, fraction in events if fraction in (0.0, 1.0)]
+    assert boundaries == ["pad", "pad", "mask", "mask", "palette", "palette", "bar", "bar"]
+    assert all(0.0 <= fraction <= 1.0 for _, fraction in events)
+
+    def stop_at_palette(stage, fraction):
+        if stage == "palette":
+            raise CancelError(stage)
+        events.append((stage, fraction))
+
+    events.clear()
+    handler = ImageHandler(
+        fp="", array=sample_image_handler_colored.get_org_image(), uint8=True
+    )
+    with pytest.raises(CancelError):
+        FrameMaker(handler, True, "#FFFFFF", False, True, progress=stop_at_palette).run()
+    assert events == [("pad", 0.0), ("pad", 1.0)]
@@ -0,0 +1,231 @@
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.constants import SERVICE_MAX_BODY_BYTES
+from src.Error import QueueFullError
+from src.FrameService import FrameService, create_server
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "test_image.png")
+
+
+class BlockingAPI:
+    """
+    release されるまでジョブを完了させない API のダミー。
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def runFrameMakerFromBytes(self, data, **options):
+        self.release.wait(timeout=10)
+        return data
+
+
+@pytest.fixture
+def server():
+    service = FrameService(workers=2, max_queue=2)
+    httpd = create_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+    service.shutdown()
+
+
+def test_post_frame_returns_encoded_image(server):
+    """
+    POST /frame で画像を送ると、フレーム処理済みの画像が返され、統計に反映されることを確認する。
+    """
+    service, port = server
+    with open(TEST_IMAGE, "rb") as f:
+        body = f.read()
+    source = cv2.imread(TEST_IMAGE)
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/frame?ratio=golden&bgcolor=%23000000&format=png", body)
+    response = conn.getresponse()
+    result = response.read()
+
+    assert response.status == 200
+    assert response.getheader("Content-Type") == "image/png"
+    img = cv2.imdecode(np.frombuffer(result, np.uint8), cv2.IMREAD_COLOR)
+    assert img.shape[0] == img.shape[1] > max(source.shape[:2])
+
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    assert stats["completed"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["latency_ms"]["p50"] > 0
+    conn.close()
+
+
+def test_post_frame_rejects_invalid_image(server):
+    """
+    デコードできないデータを送ると 400 が返されることを確認する。
+    """
+    _, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/frame", b"not an image")
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+
+    assert response.status == 400
+
+
+def test_post_frame_rejects_invalid_content_length(server):
+    """
+    Content-Length が整数でない場合、応答を返さずに切断せず 400 が返されることを確認する。
+    """
+    _, port = server
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.putrequest("POST", "/frame")
+    conn.putheader("Content-Length", "abc")
+    conn.endheaders()
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+
+    assert response.status == 400
+
+
+def post_without_body(port: int, length: int) -> int:
+    """
+    本文を送らずに Content-Length だけを送り、ステータスコードを返す。
+    本文を読み込もうとするサーバーはタイムアウトまで応答しない。
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.putrequest("POST", "/frame")
+    conn.putheader("Content-Length", str(length))
+    conn.endheaders()
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status
+
+
+def test_post_frame_rejects_large_body_before_reading(server):
+    """
+    Content-Length が上限を超える場合、本文を読み込まずに 413 が返されることを確認する。
+    """
+    _, port = server
+
+    assert post_without_body(port, SERVICE_MAX_BODY_BYTES + 1) == 413
+
+
+def test_post_frame_returns_503_before_reading_when_full():
+    """
+    待ち行列が上限に達している場合、本文を読み込まずに 503 が返され、拒否として集計されることを確認する。
+    """
+    api = BlockingAPI()
+    service = FrameService(api=api, workers=1, max_queue=0)
+    httpd = create_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        running = service.submit(b"a")
+        status = post_without_body(httpd.server_address[1], 1000)
+    finally:
+        api.release.set()
+        httpd.shutdown()
+        httpd.server_close()
+        service.shutdown()
+
+    assert status == 503
+    assert running.result() == b"a"
+    assert service.stats()["rejected"] == 1
+
+
+class FailingAPI:
+    def runFrameMakerFromBytes(self, data, **options):
+        raise RuntimeError("unexpected failure")
+
+
+def test_post_frame_returns_500_for_unexpected_errors():
+    """
+    処理中に想定外の例外が発生した場合も 500 が返され、失敗として集計されることを確認する。
+    """
+    service = FrameService(api=FailingAPI(), workers=1)
+    httpd = create_server(service, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=30)
+        conn.request("POST", "/frame", b"data")
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        service.shutdown()
+
+    assert response.status == 500
+    assert body == b"unexpected failure"
+    assert service.stats()["failed"] == 1
+
+
+def test_default_api_uses_one_color_worker_per_job():
+    """
+    デフォルトの API は主要色の抽出を 1 スレッドで行い、ワーカースレッド数と掛け合わせて
+    CPU コア数を超えるスレッドを起動しないことを確認する。
+    """
+    service = FrameService(workers=2)
+    service.shutdown()
+
+    assert service.api._color_workers == 1
+
+
+def test_submit_raises_when_queue_is_full():
+    """
+    実行中と待ち行列のジョブ数が上限に達すると QueueFullError で拒否されることを確認する。
+    """
+    api = BlockingAPI()
+    service = FrameService(api=api, workers=1, max_queue=1)
+    try:
+        futures = [service.submit(b"a"), service.submit(b"b")]
+        with pytest.raises(QueueFullError):
+            service.submit(b"c")
+        assert service.stats()["rejected"] == 1
+    finally:
+        api.release.set()
+    assert [future.result() for future in futures] == [b"a", b"b"]
+    service.shutdown()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available")
+def test_unix_socket_health(tmp_path):
+    """
+    Unix ソケットで待ち受けた場合も HTTP で応答することを確認する。
+    """
+    path = str(tmp_path / "frame.sock")
+    service = FrameService(api=BlockingAPI(), workers=1)
+    httpd = create_server(service, unix_socket=path)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        client.sendall(b"GET /health HTTP/1.0\r\n\r\n")
+        response = b""
+        while chunk := client.recv(4096):
+            response += chunk
+        client.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        service.shutdown()
+
+    assert response.startswith(b"HTTP/1.0 200")
+    assert response.endswith(b"ok")
@@ -1,12 +1,13 @@
 import os
 import sys
 
+import cv2
 import numpy as np
 import pytest
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
 
-from src.ImageHandler import ImageHandler, ReadError
+from src.ImageHandler import ImageHandler, ReadError, encode_params
 
 
 @pytest.fixture
@@ -36,3 +37,117 @@ def test_read_image_from_path_not_found():
     """
     with pytest.raises(ReadError):
         ImageHandler(fp="tests/assets/not_found.png")
+
+
+def test_analysis_image_is_downscaled_and_cached():
+    """
+    色抽出用の縮小画像が長辺 analysis_max_side 以下になり、キャッシュされることを確認する。
+
+    テスト対象機能: ImageHandler の get_analysis_image
+    期待結果: 長辺が指定値に縮小され、縦横比が保たれ、2 回目の呼び出しで同じ配列が返ること。
+    """
+    handler = ImageHandler(fp="tests/assets/test_image.png", analysis_max_side=64)
+
+    analysis_img = handler.get_analysis_image()
+
+    assert max(analysis_img.shape[:2]) == 64
+    assert analysis_img.shape[0] / analysis_img.shape[1] == pytest.approx(
+        handler.height / handler.width, rel=0.05
+    )
+    assert handler.get_analysis_image() is analysis_img
+
+
+def test_read_npy_as_memmap_without_copy(tmp_path):
+    """
+    .npy ファイルがメモリマップで読み込まれ、コピーされないことを確認する。
+
+    テスト対象機能: ImageHandler の .npy 読み込み
+    期待結果: img が numpy.memmap であり、org_img が同じ配列を参照し、値が保存したものと一致すること。
+    """
+    pixels = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+    npy_path = tmp_path / "frame.npy"
+    np.save(npy_path, pixels)
+
+    handler = ImageHandler(fp=str(npy_path))
+
+    assert isinstance(handler.img, np.memmap)
+    assert handler.org_img is handler.img
+    assert np.array_equal(handler.img, pixels)
+
+
+def test_read_rgb_buffer_as_bgr_view():
+    """
+    RGB 順の生バッファが、コピーされずに BGR 順のビューとして扱われることを確認する。
+
+    テスト対象機能: ImageHandler の array / shape / channel_order オプション
+    期待結果: 画像がバッファとメモリを共有し、チャンネル順が反転していること。
+    """
+    rgb = np.arange(2 * 3 * 3, dtype=np.uint8).reshape(2, 3, 3)
+    buffer = bytearray(rgb.tobytes())
+
+    handler = ImageHandler(fp="", array=memoryview(buffer), shape=(2, 3), channel_order="RGB")
+
+    assert np.shares_memory(handler.img, np.frombuffer(buffer, dtype=np.uint8))
+    assert np.array_equal(handler.img, rgb[:, :, ::-1])
+
+
+def test_read_buffer_requires_shape():
+    """
+    生バッファを形状なしで渡した場合に ValueError が送出されることを確認する。
+    """
+    with pytest.raises(ValueError):
+        ImageHandler(fp="", array=b"\x00" * 12)
+
+
+def test_source_image_is_single_read_only_buffer(image_handler):
+    """
+    元画像が読み取り専用の 1 つの配列として保持され、org_img がコピーではないことを確認する。
+    """
+    assert not image_handler.img.flags.writeable
+    assert image_handler.get_org_image() is image_handler.img
+
+
+def test_reduced_decode_for_preview(tmp_path):
+    """
+    max_side を指定すると JPEG を縮小してデコードし、長辺が max_side 以下になることを確認する。
+    """
+    img = cv2.imread("tests/assets/test_image.png")
+    path = str(tmp_path / "input.jpg")
+    cv2.imwrite(path, img[:, :1500])
+    with open(path, "rb") as f:
+        data = f.read()
+
+    for handler in (
+        ImageHandler(fp=path, uint8=True, max_side=300),
+        ImageHandler(fp="", data=data, uint8=True, max_side=300),
+    ):
+        assert handler.img.shape == (300, 225, 3)
+        assert handler.scale == pytest.approx(300 / 2000)
+
+    full = ImageHandler(fp="", data=data, uint8=True)
+    assert full.img.shape == (2000, 1500, 3)
+    assert full.scale == 1.0
+
+
+def test_encode_params_match_output_format():
+    """
+    エンコードプロファイルから、出力形式に対応するパラメータだけが作られることを確認する。
+    """
+    assert encode_params(".png", "fast") == [cv2.IMWRITE_PNG_COMPRESSION, 1]
+    assert encode_params(".webp", "archival") == [cv2.IMWRITE_WEBP_QUALITY, 101]
+    jpeg = encode_params(".JPG", "archival")
+    assert jpeg[jpeg.index(cv2.IMWRITE_JPEG_QUALITY) + 1] == 100
+    with pytest.raises(ValueError):
+        encode_params(".jpg", "unknown")
+
+
+@pytest.mark.parametrize("ext", [".png", ".webp"])
+def test_save_image_with_lossless_profile(tmp_path, ext):
+    """
+    archival プロファイルの PNG と WebP が可逆で保存されることを確認する。
+    """
+    handler = ImageHandler(fp="tests/assets/test_image.png", uint8=True, max_side=200)
+    path = str(tmp_path / f"output{ext}")
+    handler.save_image(path, handler.img, "archival")
+
+    assert np.array_equal(cv2.imread(path), handler.img)
@@ -0,0 +1,150 @@
+import os
+import sys
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.Error import CancelError, raise_if_cancelled
+from src.FrameMaker import FrameMaker
+from src.ImageHandler import ImageHandler
+from src.JobManager import JobManager
+from src.progress import report
+from src.WebviewInterface import API
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "test_image.png")
+
+
+class FakeJobWindow:
+    def __init__(self, save_path):
+        self.save_path = save_path
+        self.scripts = []
+
+    def create_file_dialog(self, *args, **kwargs):
+        return (str(self.save_path),)
+
+    def evaluate_js(self, script):
+        self.scripts.append(script)
+
+
+def wait_for(manager: JobManager, job_id: str) -> dict:
+    for _ in range(500):
+        job = manager.poll(job_id)
+        if job["status"] not in ("pending", "running"):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job did not finish: {job}")
+
+
+def test_job_manager_reports_result_failure_and_cancel():
+    """
+    ジョブの結果、失敗、実行中のキャンセルが状態として返され、終了時に通知されることを確認する。
+
+    テスト対象機能: JobManager.submit / poll / cancel
+    期待結果: status がそれぞれ done、failed、cancelled になり、on_finish が 3 回呼ばれること。
+    """
+    finished = []
+    manager = JobManager(workers=2, on_finish=finished.append)
+    started = threading.Event()
+
+    def work(value, cancel=None, progress=None):
+        report(progress, "pad", 0.5, cancel)
+        if value is None:
+            raise ValueError("bad value")
+        if value == "wait":
+            started.set()
+            while True:
+                raise_if_cancelled(cancel)
+                threading.Event().wait(0.01)
+        return value * 2
+
+    done = manager.submit(work, 21)
+    failed = manager.submit(work, None)
+    running = manager.submit(work, "wait")
+    started.wait(5)
+    assert manager.poll(running)["status"] == "running"
+    assert manager.cancel(running)
+
+    assert wait_for(manager, done)["result"] == 42
+    assert wait_for(manager, failed) == {
+        "id": failed,
+        "status": "failed",
+        "result": None,
+        "error": "bad value",
+        "stage": "pad",
+        "fraction": 0.5,
+    }
+    assert wait_for(manager, running)["status"] == "cancelled"
+    assert not manager.cancel(running)
+    assert manager.poll("missing")["status"] == "missing"
+    manager.shutdown()
+    assert sorted(job["status"] for job in finished) == ["cancelled", "done", "failed"]
+
+
+def test_job_manager_keeps_limited_history():
+    """
+    終了済みのジョブは history 個までしか保持しないことを確認する。
+    """
+    manager = JobManager(workers=1, history=2)
+    job_ids = [manager.submit(lambda value, cancel=None, progress=None: value, i) for i in range(4)]
+    for job_id in job_ids[2:]:
+        wait_for(manager, job_id)
+    manager.shutdown()
+
+    assert [manager.poll(job_id)["status"] for job_id in job_ids] == [
+        "missing",
+        "missing",
+        "done",
+        "done",
+    ]
+
+
+def test_frame_maker_raises_when_cancelled():
+    """
+    キャンセルされたイベントを渡すと、フレーム処理と主要色の抽出が打ち切られることを確認する。
+    """
+    cancel = threading.Event()
+    cancel.set()
+    handler = ImageHandler(fp=TEST_IMAGE, uint8=True)
+
+    with pytest.raises(CancelError):
+        FrameMaker(handler, True, "#FFFFFF", True, True, cancel=cancel).run()
+    with pytest.raises(CancelError):
+        handler.get_palette(cancel=cancel)
+
+
+def test_submit_frame_job_saves_and_notifies_window(tmp_path):
+    """
+    submitFrameJob がすぐにジョブ ID を返し、バックグラウンドで保存と処理を行い、
+    終了時に WebView の onFrameJobFinished を呼び出すことを確認する。
+    """
+    save_target = tmp_path / "job-output.jpg"
+    api = API()
+    window = FakeJobWindow(save_target)
+    api.set_window(window)
+    with open(TEST_IMAGE, "rb") as f:
+        blob_id = api._blob_store.put(f.read(), "image/png")
+
+    save_job = api.submitFrameJob(blob_id, "golden", "#FFFFFF", True, True, save=True)
+    run_job = api.submitFrameJob(blob_id, "golden", "#FFFFFF", True, True)
+    missing_job = api.submitFrameJob("missing", "golden", "#FFFFFF", False, False)
+    saved = wait_for(api._jobs, save_job)
+    ran = wait_for(api._jobs, run_job)
+    missing = wait_for(api._jobs, missing_job)
+    api.shutdown()
+
+    assert saved["status"] == "done"
+    assert (saved["stage"], saved["fraction"]) == ("encode", 1.0)
+    assert saved["result"] == str(save_target)
+    assert os.path.exists(save_target)
+    data, content_type = api._blob_store.get(ran["result"])
+    assert content_type == "image/jpeg"
+    result = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    assert np.array_equal(result, cv2.imread(str(save_target)))
+    assert missing["status"] == "failed"
+    assert "missing" in missing["error"]
+    assert len(window.scripts) == 3
+    assert all(script.startswith("window.onFrameJobFinished") for script in window.scripts)
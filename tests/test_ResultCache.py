@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.constants import COLOR_METHOD
+from src.ResultCache import ResultCache, content_hash
+from src.WebviewInterface import API
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "test_image.png")
+
+
+@pytest.fixture
+def image_bytes():
+    with open(TEST_IMAGE, "rb") as f:
+        return f.read()
+
+
+def test_cache_evicts_least_recently_used_entry():
+    """
+    合計サイズが上限を超えると、最も古く使われた値から削除されることを確認する。
+    """
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    cache.get("a")
+    cache.put("c", b"9012")
+
+    assert cache.get("a") == b"1234"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"9012"
+
+
+def test_disk_tier_survives_new_cache(tmp_path):
+    """
+    ディスクキャッシュに保存した値を、別のキャッシュインスタンスから取得できることを確認する。
+    """
+    ResultCache(disk_dir=str(tmp_path)).put("frame", b"encoded")
+    ResultCache(disk_dir=str(tmp_path)).put("palette", ["ff0000", "00ff00"])
+
+    cache = ResultCache(disk_dir=str(tmp_path))
+    assert cache.get("frame") == b"encoded"
+    assert cache.get("palette") == ["ff0000", "00ff00"]
+
+
+def test_disk_tier_evicts_least_recently_used_files(tmp_path):
+    """
+    ディスク上の合計サイズが上限を超えると、最終利用時刻の古いファイルから削除されることを確認する。
+    """
+    cache = ResultCache(disk_dir=str(tmp_path), disk_max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    now = time.time()
+    os.utime(tmp_path / "a.bin", (now - 100, now - 100))
+    os.utime(tmp_path / "b.bin", (now - 50, now - 50))
+
+    # メモリにない値をディスクから読むと、最終利用時刻が更新される
+    assert ResultCache(disk_dir=str(tmp_path), disk_max_bytes=10).get("a") == b"1234"
+    cache.put("c", b"9012")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.bin", "c.bin"]
+    cache = ResultCache(disk_dir=str(tmp_path), disk_max_bytes=10)
+    assert cache.get("b") is None
+    assert cache.get("c") == b"9012"
+
+
+def test_repeated_frame_request_is_served_from_cache(image_bytes, monkeypatch):
+    """
+    同じ画像とオプションの 2 回目の処理がキャッシュから返され、
+    オプションを変えた場合は再計算されることを確認する。
+    処理時間ではなく、デコードとフレーム処理が呼び出された回数で確認する。
+    """
+    api = API(cache=ResultCache())
+    calls = []
+    load_handler = api._load_handler
+    monkeypatch.setattr(
+        api, "_load_handler", lambda *args: calls.append("decode") or load_handler(*args)
+    )
+    create_frame_maker = api._create_frame_maker
+    monkeypatch.setattr(
+        api,
+        "_create_frame_maker",
+        lambda *args: calls.append("frame") or create_frame_maker(*args),
+    )
+
+    first = api.runFrameMakerFromBytes(image_bytes, "golden", "#ffffff", True, True, 40)
+    assert calls.count("frame") == 1
+    first_calls = list(calls)
+    second = api.runFrameMakerFromBytes(image_bytes, "golden", "#FFFFFF", True, True, 40)
+
+    assert second == first
+    assert calls == first_calls
+    third = api.runFrameMakerFromBytes(image_bytes, "golden", "#000000", True, True, 40)
+    assert third != first
+    assert calls.count("frame") == 2
+
+
+def test_palette_is_cached_per_image(image_bytes):
+    """
+    主要色の抽出結果が画像ごとにキャッシュされることを確認する。
+    """
+    cache = ResultCache()
+    api = API(cache=cache)
+
+    colors = api.getMainColorRGBValueFromBytes(image_bytes)
+    misses = cache.misses
+    colors.append("000000")
+
+    assert api.getMainColorRGBValueFromBytes(image_bytes) == colors[:-1]
+    assert cache.misses == misses
+
+
+def test_color_bar_matches_suggested_colors(image_bytes):
+    """
+    背景色の候補として返した色が、カラーバーの画素と一致し、主要色が再計算されないことを確認する。
+    """
+    cache = ResultCache()
+    api = API(cache=cache)
+    colors = api.getMainColorRGBValueFromBytes(image_bytes)
+
+    misses = cache.misses
+    result = api.runFrameMakerFromBytes(
+        image_bytes, "golden", "#FFFFFF", False, True, ext=".png"
+    )
+    img = cv2.imdecode(np.frombuffer(result, np.uint8), cv2.IMREAD_COLOR)
+
+    side = img.shape[0]
+    pickwidth = side // 5
+    left = (side - pickwidth * 5) // 2
+    bar = [
+        "{2:02x}{1:02x}{0:02x}".format(*img[-1, left + pickwidth * i])
+        for i in range(len(colors))
+    ]
+    assert bar == colors
+    # フレーム画像のみ新たに計算される (主要色と画像のデコードはキャッシュから)
+    assert cache.misses == misses + 1
+
+
+def test_preview_is_reduced_and_matches_saved_colors(image_bytes):
+    """
+    プレビューが縮小して処理され、カラーバーが元画像の主要色と一致することを確認する。
+    """
+    api = API(cache=ResultCache())
+    colors = api.getMainColorRGBValueFromBytes(image_bytes)
+
+    preview = api.previewFrameMakerFromBytes(
+        image_bytes, "golden", "#FFFFFF", True, True, 40, max_side=400
+    )
+    img = cv2.imdecode(np.frombuffer(preview, np.uint8), cv2.IMREAD_COLOR)
+
+    side = img.shape[0]
+    assert img.shape[:2] == (side, side)
+    assert side <= 400
+    pickwidth = side // 5
+    left = (side - pickwidth * 5) // 2
+    # JPEG の誤差を許容して比較する
+    for i, color in enumerate(colors):
+        expected = [int(color[j : j + 2], 16) for j in (4, 2, 0)]
+        actual = img[-1, left + pickwidth * i + pickwidth // 2].astype(int)
+        assert np.abs(actual - expected).max() <= 8
+
+
+def test_preview_without_cached_palette_skips_full_decode(image_bytes, monkeypatch):
+    """
+    主要色が未取得の場合、プレビューは元画像をデコードせず縮小画像から主要色を抽出し、
+    その結果を元画像の主要色としてキャッシュしないことを確認する。
+    """
+    cache = ResultCache()
+    api = API(cache=cache)
+    monkeypatch.setattr(
+        api, "_load_handler", lambda *args, **kwargs: pytest.fail("full decode")
+    )
+
+    preview = api.previewFrameMakerFromBytes(
+        image_bytes, "golden", "#FFFFFF", False, True, max_side=400
+    )
+
+    assert cv2.imdecode(np.frombuffer(preview, np.uint8), cv2.IMREAD_COLOR) is not None
+    assert cache.get(ResultCache.make_key("palette", content_hash(image_bytes), COLOR_METHOD)) is None
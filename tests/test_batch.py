@@ -0,0 +1,71 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.batch import collect_jobs, is_up_to_date, run_batch
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "test_image.png")
+
+
+@pytest.fixture
+def input_tree(tmp_path):
+    # in/a.png, in/sub/b.png, in/sub/c.txt を作成
+    input_dir = tmp_path / "in"
+    (input_dir / "sub").mkdir(parents=True)
+    shutil.copy(TEST_IMAGE, input_dir / "a.png")
+    shutil.copy(TEST_IMAGE, input_dir / "sub" / "b.png")
+    (input_dir / "sub" / "c.txt").write_text("not an image")
+    return input_dir
+
+
+def test_collect_jobs_keeps_relative_layout(input_tree, tmp_path):
+    """
+    glob パターンに一致したファイルの出力先が、基準ディレクトリからの相対パスを保つことを確認する。
+    """
+    out_dir = tmp_path / "out"
+    jobs = collect_jobs(str(input_tree / "**" / "*.png"), str(out_dir))
+
+    assert jobs == [
+        (str(input_tree / "a.png"), str(out_dir / "a.png")),
+        (str(input_tree / "sub" / "b.png"), str(out_dir / "sub" / "b.png")),
+    ]
+
+
+def test_collect_jobs_from_directory_skips_non_images_and_outputs(input_tree):
+    """
+    ディレクトリを指定した場合、画像以外のファイル (sub/c.txt) と、入力ディレクトリの中にある
+    出力先の以前の出力を入力に含めないことを確認する。
+    """
+    out_dir = input_tree / "out"
+    out_dir.mkdir()
+    shutil.copy(TEST_IMAGE, out_dir / "a.png")
+
+    jobs = collect_jobs(str(input_tree), str(out_dir))
+
+    assert jobs == [
+        (str(input_tree / "a.png"), str(out_dir / "a.png")),
+        (str(input_tree / "sub" / "b.png"), str(out_dir / "sub" / "b.png")),
+    ]
+
+
+def test_run_batch_skips_up_to_date_outputs(input_tree, tmp_path):
+    """
+    バッチ処理で全ファイルが処理され、再実行時には最新の出力がスキップされることを確認する。
+    """
+    out_dir = tmp_path / "out"
+    pattern = str(input_tree / "**" / "*.png")
+
+    summary = run_batch(pattern, str(out_dir), "golden", False, False, False, jobs=1)
+
+    assert summary.processed == 2
+    assert summary.failed == 0
+    assert is_up_to_date(str(input_tree / "a.png"), str(out_dir / "a.png"))
+
+    summary = run_batch(pattern, str(out_dir), "golden", False, False, False, jobs=1)
+
+    assert summary.processed == 0
+    assert summary.skipped == 2
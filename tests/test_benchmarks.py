@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from benchmarks.run_benchmarks import compare_results, generate_image
+
+
+def test_compare_results_reports_regressions_beyond_threshold():
+    """
+    しきい値を超えて遅くなった、またはメモリが増えたケースだけが報告されることを確認する。
+    """
+    baseline = {
+        "1mp-landscape/load": {"seconds": 1.0, "peak_bytes": 100},
+        "1mp-landscape/run-golden": {"seconds": 1.0, "peak_bytes": 100},
+    }
+    current = {
+        "1mp-landscape/load": {"seconds": 1.1, "peak_bytes": 100},
+        "1mp-landscape/run-golden": {"seconds": 1.0, "peak_bytes": 150},
+        "1mp-landscape/run-silver": {"seconds": 9.0, "peak_bytes": 900},
+    }
+
+    regressions = compare_results(current, baseline, threshold=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("1mp-landscape/run-golden peak_bytes")
+
+
+def test_generate_image_orientation():
+    """
+    生成する画像の画素数と縦横の向きが指定どおりであることを確認する。
+    """
+    landscape = generate_image(1, portrait=False)
+    portrait = generate_image(1, portrait=True)
+
+    assert landscape.shape[1] > landscape.shape[0]
+    assert portrait.shape == (landscape.shape[1], landscape.shape[0], 3)
+    assert abs(landscape.shape[0] * landscape.shape[1] - 1_000_000) < 5_000
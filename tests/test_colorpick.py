@@ -0,0 +1,195 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.colorpick import (
+    _count_distinct_colors,
+    _get_filtered_pixels,
+    _threshold_level,
+    drawColorBar,
+    getColorBar,
+    getMainColorKmeans,
+    getMainColorPalette,
+    getMainColorRGBValue,
+)
+from src.constants import COLOR_METHODS, KMEANS_CLUSTERS, SATURATION_THRESHOLD
+from src.FrameMaker import FrameMaker
+from src.ImageHandler import ImageHandler
+
+
+@pytest.fixture
+def four_color_image():
+    # 4 色に塗り分けた 100x100 の画像 (BGR, 0-1)
+    img = np.zeros((100, 100, 3), dtype=np.uint8)
+    img[0:50, 0:50] = [0, 0, 255]
+    img[0:50, 50:100] = [0, 255, 0]
+    img[50:100, 0:50] = [255, 0, 0]
+    img[50:100, 50:100] = [0, 255, 255]
+    return img / 255.0
+
+
+@pytest.mark.parametrize("method", COLOR_METHODS)
+def test_main_color_methods_find_same_palette(four_color_image, method):
+    """
+    どの色抽出バックエンドでも、塗り分けられた 4 色が抽出されることを確認する。
+
+    テスト対象機能: getMainColorRGBValue の method オプション
+    期待結果: KMEANS_CLUSTERS 個の色が返り、その集合が元の 4 色 (RGB 順) と一致すること。
+    """
+    colors = getMainColorRGBValue(four_color_image, method)
+
+    assert len(colors) == KMEANS_CLUSTERS
+    assert set(colors) == {"ff0000", "00ff00", "0000ff", "ffff00"}
+
+
+def test_main_color_bar_shape_with_histogram(four_color_image):
+    """
+    histogram バックエンドでもカラーバーが指定サイズで生成されることを確認する。
+    """
+    picker = getMainColorKmeans(four_color_image, 10, 3, method="histogram")
+
+    assert picker.shape == (3, 10 * KMEANS_CLUSTERS, 3)
+
+
+def test_main_color_rejects_unknown_method(four_color_image):
+    """
+    未対応のバックエンドを指定した場合に ValueError が送出されることを確認する。
+    """
+    with pytest.raises(ValueError):
+        getMainColorRGBValue(four_color_image, "unknown")
+
+
+def test_palette_hex_values_match_color_bar(four_color_image):
+    """
+    UI に表示する 16 進数の色が、カラーバーの画素と同じ順・同じ値であることを確認する。
+    """
+    palette = getMainColorPalette(four_color_image)
+    picker = getColorBar(palette, 4, 2)
+
+    bar_hex = [
+        "{2:02x}{1:02x}{0:02x}".format(*picker[0, i * 4]) for i in range(KMEANS_CLUSTERS)
+    ]
+    assert palette.hex_values() == bar_hex
+
+
+def test_palette_weights_follow_pixel_counts(four_color_image):
+    """
+    各主要色の割合が画素数に比例し、補完で重複した色の割合が 0 になることを確認する。
+    """
+    palette = getMainColorPalette(four_color_image)
+
+    assert np.isclose(palette.weights.sum(), 1.0)
+    assert sorted(palette.weights.tolist()) == [0.0, 0.25, 0.25, 0.25, 0.25]
+
+
+def test_draw_color_bar_writes_into_view(four_color_image):
+    """
+    drawColorBar が出力画像のビューに直接書き込み、getColorBar と同じ画素になることを確認する。
+    """
+    palette = getMainColorPalette(four_color_image)
+    canvas = np.zeros((10, 60, 3), dtype=np.uint8)
+
+    view = canvas[7:10, 5:55]
+    assert drawColorBar(palette, view) is view
+
+    np.testing.assert_array_equal(canvas[7:10, 5:55], getColorBar(palette, 10, 3))
+    assert not canvas[:7].any()
+    assert not canvas[:, :5].any() and not canvas[:, 55:].any()
+
+
+@pytest.mark.parametrize("method", ["kmeans", "histogram"])
+def test_parallel_inits_match_serial_result(method):
+    """
+    KMeans の試行を並列に実行した結果がスレッド数によらず同じで、この画像ではスレッド数 1 の
+    場合とも同じ主要色になることを確認する。ビット単位の一致は保証されないため、主要色
+    (整数に丸めた値) で比較する。
+    """
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+    serial = getMainColorPalette(img, method, workers=1)
+    parallel = getMainColorPalette(img, method, workers=4)
+
+    np.testing.assert_array_equal(
+        parallel.centers, getMainColorPalette(img, method, workers=2).centers
+    )
+    np.testing.assert_array_equal(serial.centers, parallel.centers)
+
+
+def test_threshold_level_matches_float_comparison():
+    """
+    8 ビットの整数しきい値による判定が、最大値で正規化した浮動小数点の比較と一致することを確認する。
+
+    テスト対象機能: _threshold_level (彩度・明度のしきい値の整数化)
+    期待結果: 全ての最大値と値の組み合わせで判定が一致すること。
+    """
+    levels = np.arange(256)
+    for max_level in range(1, 256):
+        expected = levels / 255 / (max_level / 255) > SATURATION_THRESHOLD
+        actual = levels >= _threshold_level(max_level, SATURATION_THRESHOLD)
+        assert np.array_equal(actual[: max_level + 1], expected[: max_level + 1])
+
+
+def test_filtered_pixels_into_buffer_and_weighted_unique(four_color_image):
+    """
+    フィルタリングの結果を用意した配列に書き込めること、重複を除いた色と画素数を返せることを確認する。
+
+    テスト対象機能: _get_filtered_pixels の out と weighted_unique オプション
+    期待結果: out の先頭に結果が書き込まれ、4 色それぞれの画素数が 2500 であること。
+    """
+    img = (four_color_image * 255).astype(np.uint8)
+    buffer = np.full((img.shape[0] * img.shape[1], 3), -1.0)
+
+    filtered = _get_filtered_pixels(img, out=buffer)
+    colors, counts = _get_filtered_pixels(img, weighted_unique=True)
+
+    assert np.shares_memory(filtered, buffer)
+    assert np.array_equal(filtered, _get_filtered_pixels(img))
+    assert len(colors) == 4
+    assert counts.tolist() == [2500] * 4
+    assert np.array_equal(np.unique(filtered, axis=0), colors)
+
+
+def test_float32_image_matches_float64_palette(four_color_image):
+    """
+    float64 以外の浮動小数点の画像 (ImageHandler が受け付ける float32 の配列) からも
+    主要色を抽出でき、float64 の場合と同じ結果になることを確認する。
+
+    テスト対象機能: _get_filtered_pixels、getMainColorPalette、ImageHandler.get_palette、FrameMaker
+    期待結果: 例外が発生せず、抽出した画素と主要色が float64 の場合と一致すること。
+    """
+    img32 = four_color_image.astype(np.float32)
+    buffer = np.empty((img32.shape[0] * img32.shape[1], 3))
+
+    assert _get_filtered_pixels(img32).dtype == np.float64
+    assert np.array_equal(
+        _get_filtered_pixels(img32, out=buffer), _get_filtered_pixels(four_color_image)
+    )
+    expected = getMainColorPalette(four_color_image, workers=1)
+    assert np.array_equal(getMainColorPalette(img32, workers=1).centers, expected.centers)
+
+    handler = ImageHandler(fp="", array=img32)
+    assert np.array_equal(handler.get_palette(workers=1).centers, expected.centers)
+    frame = FrameMaker(handler, True, "#FFFFFF", False, True, color_workers=1).run()
+    assert frame.shape[0] == frame.shape[1]
+
+
+def test_count_distinct_colors_matches_unique_and_stops_early():
+    """
+    24 ビットの色の種類の数が np.unique(axis=0) と一致し、指定した数で打ち切れることを確認する。
+
+    テスト対象機能: _count_distinct_colors
+    期待結果: float・uint8 のどちらの入力でも種類の数が一致し、stop_at を指定すると全ては数えないこと。
+    """
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 32, size=(20000, 3), dtype=np.uint8) * 8
+    expected = len(np.unique(pixels, axis=0))
+
+    assert _count_distinct_colors(pixels) == expected
+    assert _count_distinct_colors(pixels / 255.0) == expected
+    assert KMEANS_CLUSTERS <= _count_distinct_colors(pixels, KMEANS_CLUSTERS) < expected
+    assert _count_distinct_colors(np.zeros((0, 3))) == 0
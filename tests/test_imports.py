@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# CLI のフレーム処理で読み込んではいけない重いモジュール
+GUI_ONLY_MODULES = ("webview", "PIL", "sklearn", "src.colorpick", "src.WebviewInterface")
+# src.render の読み込みにかかる時間の上限 (マイクロ秒)。現状は 0.2 秒程度
+IMPORT_TIME_BUDGET_US = 1_000_000
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """
+    python -X importtime の出力から、モジュールごとの累積読み込み時間 (マイクロ秒) を返します。
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_render_does_not_import_gui_modules():
+    """
+    CLI で使う src.render が GUI の依存を読み込まず、起動時間が上限以内であることを確認する。
+    """
+    times = import_times("-c", "import src.render")
+
+    assert not [name for name in GUI_ONLY_MODULES if name in times]
+    assert times["src.render"] < IMPORT_TIME_BUDGET_US
+
+
+def test_cli_does_not_import_gui_modules():
+    """
+    main.py の起動時に GUI の依存や色抽出のモジュールが読み込まれないことを確認する。
+    """
+    times = import_times("main.py", "--help")
+
+    assert "src.batch" in times
+    assert not [name for name in GUI_ONLY_MODULES if name in times]
+
+
+def test_frame_job_without_maincolor_skips_colorpick(tmp_path):
+    """
+    メインカラーも角丸も使わないフレーム処理では、colorpick と PIL が読み込まれないことを確認する。
+    """
+    image = os.path.join(PROJECT_ROOT, "tests", "assets", "test_image.png")
+    output = str(tmp_path / "output.png")
+    times = import_times("main.py", image, output, "-g")
+
+    assert os.path.exists(output)
+    assert "src.render" in times
+    assert not [name for name in GUI_ONLY_MODULES if name in times]
+
+
+def test_webview_interface_does_not_import_colorpick():
+    """
+    src.WebviewInterface の読み込み時に、sklearn を使う colorpick が読み込まれないことを確認する。
+    """
+    times = import_times("-c", "import src.WebviewInterface")
+
+    assert "src.WebviewInterface" in times
+    assert "src.colorpick" not in times
+    assert "sklearn" not in times
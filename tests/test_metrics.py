@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + "/..")
+
+from src.constants import METRICS_ENV
+from src.metrics import instrument
+from src.render import render_file
+from src.WebviewInterface import API
+
+TEST_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "test_image.png")
+
+
+def test_instrument_is_a_no_op_when_disabled(monkeypatch, capsys):
+    """
+    計測が無効な場合は progress をそのまま返し、何も書き出さないことを確認する。
+    """
+    monkeypatch.delenv(METRICS_ENV, raising=False)
+
+    def progress(stage, fraction):
+        pass
+
+    with instrument("render", progress) as wrapped:
+        assert wrapped is progress
+    with instrument("render") as wrapped:
+        assert wrapped is None
+    assert capsys.readouterr().err == ""
+
+
+def test_render_file_writes_stage_metrics(monkeypatch, capsys, tmp_path):
+    """
+    FRAMEMAKER_METRICS=memory の場合、1 枚ごとにステージ別の時間とメモリが
+    1 行の JSON として標準エラー出力に書き出され、元の progress にも通知が届くことを確認する。
+
+    テスト対象機能: metrics.instrument と render_file の計測
+    期待結果: decode、pad、mask、encode の wall_ms、cpu_ms、alloc_bytes が記録され、
+              計測後は tracemalloc が停止していること。
+    """
+    monkeypatch.setenv(METRICS_ENV, "memory")
+    events = []
+    output = str(tmp_path / "out.jpg")
+
+    assert render_file(
+        TEST_IMAGE,
+        output,
+        "golden",
+        False,
+        True,
+        False,
+        progress=lambda stage, fraction: events.append(stage),
+    )
+
+    lines = capsys.readouterr().err.strip().splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["job"] == "render"
+    assert record["output"] == output
+    assert list(record["stages"]) == ["decode", "pad", "mask", "encode"]
+    for stage in record["stages"].values():
+        assert stage["wall_ms"] >= 0
+        assert stage["cpu_ms"] >= 0
+        assert stage["alloc_bytes"] >= 0
+    # 出力画像の確保は pad ステージに含まれる
+    assert record["stages"]["pad"]["alloc_bytes"] > 0
+    assert set(events) == {"decode", "pad", "mask", "encode"}
+    assert not tracemalloc.is_tracing()
+
+
+def test_api_metrics_are_logged_once_per_job(monkeypatch, capsys):
+    """
+    FRAMEMAKER_METRICS=1 の場合、主要色の抽出を含むフレーム処理が 1 行にまとめて記録され、
+    メモリは計測しないことを確認する。
+    """
+    monkeypatch.setenv(METRICS_ENV, "1")
+    with open(TEST_IMAGE, "rb") as f:
+        data = f.read()
+
+    API().runFrameMakerFromBytes(data, "golden", "#FFFFFF", False, True)
+
+    lines = capsys.readouterr().err.strip().splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["job"] == "frame"
+    assert {"decode", "palette", "pad", "bar", "encode"} <= set(record["stages"])
+    assert all("alloc_bytes" not in stage for stage in record["stages"].values())